@@ -1,8 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+import io
+from dataclasses import dataclass, field, fields
 from enum import Enum, auto
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from TablaDeSimbolos import TablaDeSimbolos  
+from Nombres import Nombre, internar
+from Visitante import Visitante
+from Recorrido import DETENER, ejecutar, recorrer
 
 class Tipo(Enum):
     UINT = auto()
@@ -16,16 +20,23 @@ class Tipo(Enum):
     dataclass que contiene mensaje, linea y severidad; tiene __str__ que formatea E/W/I. 
     Lo que permite esa dataclass es contener la informacion de los errores y warnings que se van
     generando durante el analisis semantico.
+    index es la posicion del nodo en el fuente; la columna se resuelve al reportar (resolver_columna).
 '''
 @dataclass
 class Diagnostico:  
     mensaje: str
     linea: int = 0
     severidad: str = "ERROR"
+    index: Optional[int] = None
+    columna: int = 0
+    def resolver_columna(self, indice) -> None:
+        if self.index is not None and not self.columna:
+            self.columna = indice.columna(self.index)
     def __str__(self) -> str:
         pref = "E" if self.severidad.upper().startswith("E") else "W" if self.severidad.upper().startswith("W") else "I"
         if self.linea:
-            return f"[{pref}] L{self.linea}: {self.mensaje}"
+            col = f":C{self.columna}" if self.columna else ""
+            return f"[{pref}] L{self.linea}{col}: {self.mensaje}"
         return f"[{pref}] {self.mensaje}"
 
 '''
@@ -41,6 +52,7 @@ class Simbolo:
     nombre: str
     tipo: Tipo = Tipo.UNKNOWN
     linea: int = 0
+    index: Optional[int] = field(default=None, repr=False, compare=False)
 
 @dataclass
 class SimboloVariable(Simbolo):
@@ -58,6 +70,18 @@ class SimboloFuncion(Simbolo):
 
 '''
     La idea de la clase ambito es implmentar el name mangling y darle un nombre unico a cada variable segun su ambito. 
+
+    El analisis recorre el arbol en profundidad, asi que los ambitos abiertos en cada momento son
+    siempre el actual y sus ancestros. Todos los ambitos de un analisis comparten dos indices:
+        _visibles:  nombre de simbolo -> pila de los simbolos declarados con ese nombre en los
+                    ambitos abiertos (el de arriba es el mas interno).
+        _abiertos:  nombre de ambito -> pila de los ambitos abiertos con ese nombre.
+    declarar apila en _visibles y cerrar desapila lo que declaro el ambito, asi resolver y
+    ambito_visible son una busqueda en un diccionario en lugar de subir por la cadena de padres.
+    Por eso resolver se llama siempre desde el ambito mas interno abierto, y cada ambito que
+    se abre para un cuerpo (funcion, lambda) se cierra al terminar de visitarlo.
+    La ruta para el mangling ("global:funcion1:funcion2:...") se arma una vez, al crear el ambito.
+    Los nombres de simbolos y de ambitos son Nombre (internados, ver Nombres.py).
 '''
 class Ambito:
     #Constructor con especificacion en los parametros.
@@ -66,82 +90,161 @@ class Ambito:
     def __init__(self, padre: Optional['Ambito']=None, nombre: str="global"):
         self.padre = padre 
         self.simbolos: Dict[str, Simbolo] = {}  # Mapa de nombres se guarda clave nombre de la variable y valor Simbolo
+        if padre is None:
+            self._visibles: Dict[str, List[Simbolo]] = {}
+            self._abiertos: Dict[str, List[Ambito]] = {}
+        else:
+            self._visibles = padre._visibles
+            self._abiertos = padre._abiertos
+        self._nombre = ""
         self.nombre = nombre    # Nombre del ambito sea funcion do while etc.
 
+    @property
+    def nombre(self) -> str:
+        return self._nombre
+
+    @nombre.setter
+    def nombre(self, nombre: str) -> None:
+        # El ambito global se renombra con el nombre del programa antes de declarar nada en el
+        if self._nombre:
+            self._abiertos[self._nombre].remove(self)
+        self._nombre = nombre
+        self._abiertos.setdefault(nombre, []).append(self)
+        self._ruta = f"{self.padre._ruta if self.padre else ''}:{nombre}"
+
     '''
-        Genera un path unico para el ambito, la idea es que quede como "global:funcion1:funcion2:..."
+        Devuelve el path unico del ambito, la idea es que quede como ":global:funcion1:funcion2:..."
     '''
     def get_mangled_path(self) -> str:
-        partes = []
-        a = self
-        # Mientras haya un padre. 
-        while a is not None:
-            partes.append(a.nombre)
-            a = a.padre
-        return ":" + ":".join(reversed(partes)) # Reverse lo que hace es invertir la lista.
+        return self._ruta
+
+    # Nombre con mangling de un simbolo declarado en este ambito (por ejemplo X:PROG:F), internado
+    # como los demas para usarlo de clave en la tabla de simbolos.
+    def mangle(self, nombre: Nombre) -> Nombre:
+        return internar(f"{nombre}{self._ruta}")
     
 
     def declarar(self, sim: Simbolo, diag: List[Diagnostico]) -> bool:
         # Verificar si el nombre del simbolo existe en el diccionario/ambito actual
         # Para poder determinar si es redeclaracion o no.
         if sim.nombre in self.simbolos:
-            diag.append(Diagnostico(f"Identificador redeclarado: {sim.nombre}", sim.linea))
+            diag.append(Diagnostico(f"Identificador redeclarado: {sim.nombre}", sim.linea, index=sim.index))
             return False
         # Si no hay simbolo con ese nombre, lo agregamos.
         self.simbolos[sim.nombre] = sim
+        self._visibles.setdefault(sim.nombre, []).append(sim)
         return True
+
+    # Al terminar de visitar el cuerpo: sus simbolos y el propio ambito dejan de ser visibles.
+    def cerrar(self) -> None:
+        for nombre in self.simbolos:
+            pila = self._visibles[nombre]
+            pila.pop()
+            if not pila:
+                del self._visibles[nombre]
+        self._abiertos[self._nombre].pop()
     
     # Metodo que resuelve el alcance lexico devuelve un simbolo si lo encuentra o none si no existe. 
     def resolver(self, nombre: str) -> Optional[Simbolo]:
-        amb: Optional[Ambito] = self            #Se comienza buscando en el ambito actual y puede ser Optional porque puede no existir el simbolo.
-        while amb:                              #Mientras haya un ambito (no sea None)
-            if nombre in amb.simbolos:          # Si el nombre esta en los simbolos del ambito actual
-                return amb.simbolos[nombre]     # Devolvemos el simbolo encontrado
-            amb = amb.padre                     # Si no esta, subimos al ambito padre
-        return None
-
-# AST anotado. Cada nodo define hijos() para que el visitante recorra el arbol de forma uniforme.
+        pila = self._visibles.get(nombre)   # Declaraciones visibles de ese nombre, la mas interna arriba
+        return pila[-1] if pila else None
+
+    # El ambito abierto mas interno con ese nombre (el actual o un ancestro), para los IdCalificado.
+    def ambito_visible(self, nombre: str) -> Optional['Ambito']:
+        pila = self._abiertos.get(nombre)
+        return pila[-1] if pila else None
+
+def con_slots(cls):
+    '''
+        Rehace una dataclass con __slots__ (lo que hace dataclass(slots=True) desde Python 3.10;
+        el proyecto soporta 3.8). Los nodos no tienen __dict__: cada uno ocupa solo sus campos.
+        Los campos heredados ya tienen su slot en la clase base.
+    '''
+    heredados = {s for c in cls.__mro__[1:] for s in getattr(c, "__slots__", ())}
+    nombres = tuple(f.name for f in fields(cls))
+    propios = tuple(n for n in nombres if n not in heredados)
+    atributos = dict(cls.__dict__)
+    # Los valores por defecto ya estan en __init__; como atributos de clase taparian los slots
+    for nombre in nombres + ("__dict__", "__weakref__"):
+        atributos.pop(nombre, None)
+    atributos["__slots__"] = propios
+    nueva = type(cls)(cls.__name__, cls.__bases__, atributos)
+    nueva.__qualname__ = cls.__qualname__
+    return nueva
+
+# Formas de un campo en _HIJOS
+HIJO = 0              # el valor tal cual, aunque sea None
+HIJO_OPCIONAL = 1     # el valor, si hay uno
+HIJOS = 2             # cada elemento de una lista
+HIJOS_ARGUMENTOS = 3  # la expresion de cada tupla (expresion, nombre_formal)
+
+# AST anotado. Cada clase declara en _HIJOS que campos tienen hijos, para que los recorridos
+# bajen por el arbol de forma uniforme.
+@con_slots
 @dataclass
 class Nodo:
     '''
         tipo: se definira durante el analisis semantico.
         linea: linea del codigo fuente donde se encuentra el nodo.
-        metodo hijos: devuelve la lista de nodos hijos para recorrer el arbol.
+        index: posicion del primer token del nodo en el fuente (para la columna de los diagnosticos).
+        _HIJOS: tuplas (campo, forma), calculadas una vez por clase.
+        metodo iter_hijos: recorre los hijos leyendo esos campos, sin armar una lista.
+        metodo hijos: los mismos hijos en una lista nueva.
     '''
     tipo: Tipo = Tipo.UNKNOWN
     linea: int = 0
+    index: Optional[int] = field(default=None, repr=False, compare=False)
+    _HIJOS = ()
+
+    def iter_hijos(self) -> Iterator[Any]:
+        for campo, forma in self._HIJOS:
+            valor = getattr(self, campo)
+            if forma == HIJO:
+                yield valor
+            elif forma == HIJO_OPCIONAL:
+                if valor:
+                    yield valor
+            elif forma == HIJOS:
+                yield from valor
+            else:
+                for expresion, _ in valor:
+                    yield expresion
+
     def hijos(self) -> List[Nodo]:
-        return []
+        return list(self.iter_hijos())
     
 
+@con_slots
 @dataclass
 class ErrorNodo(Nodo):
     mensaje: str = ""
-    def hijos(self):
-        return []
 
+@con_slots
+@dataclass
+class SentenciaErronea(ErrorNodo):
+    '''
+        Lo que deja una regla de recuperacion de errores del parser en lugar de una sentencia
+        (por ejemplo ('if', condicion, ...)). El error ya lo reporto el parser: el semantico no
+        agrega otro ni baja a sus partes. Se muestra como lo devolvio la regla.
+    '''
+    valor: Any = None
+    def __repr__(self) -> str:
+        return repr(self.valor)
+
+@con_slots
 @dataclass
 class Programa(Nodo):
     nombre: str = "PROGRAM"
     cuerpo: "Bloque" = None  
-    def hijos(self) -> List[Nodo]:
-        return [self.cuerpo] if self.cuerpo else []
+    _HIJOS = (("cuerpo", HIJO_OPCIONAL),)
 
+@con_slots
 @dataclass
 class Bloque(Nodo): # Lista de sentencias dentro de {}.  Hay casos del parser que no devuelve un unico nodo sino un Nodo con nodos dentro como un if o funcion por ejemplo.
-    sentencias: List[Nodo] = field(default_factory=list)
-    def hijos(self) -> List[Nodo]:              
-        # Aplanar posibles listas anidadas provenientes del parser
-        planos: List[Nodo] = []                 #Lista para los nodos
-        for s in self.sentencias:               # Recorremos cada sentencia 
-            if isinstance(s, list):             # La sentencia puede ser una lista porque puede tener varias sentencias anidadas. 
-                for inner in s:                 # Recorremos cada elemento de la lista
-                    if isinstance(inner, Nodo): # Si el elemento es un nodo, lo agregamos a la lista de nodos planos
-                        planos.append(inner)    
-            elif isinstance(s, Nodo):           # Si la sentencia no es una lista, pero es un nodo, lo agregamos directamente
-                planos.append(s)
-        return planos
+    sentencias: List[Nodo] = field(default_factory=list)   # Plana: el parser la arma con _sentencias
+    _HIJOS = (("sentencias", HIJOS),)
 
+@con_slots
 @dataclass
 class DeclVar(Nodo):
     # Hay un unico tipo UINT 
@@ -149,9 +252,9 @@ class DeclVar(Nodo):
     # Lista de identificadores que se declaran uint A, B, C
     # Se guarda una lista porque en una línea puedes declarar varias
     ids: List["Identificador"] = field(default_factory=list)
-    def hijos(self) -> List[Nodo]:
-        return list(self.ids)
+    _HIJOS = (("ids", HIJOS),)
 
+@con_slots
 @dataclass
 class Identificador(Nodo):
     # El nombre del identificador 
@@ -159,13 +262,14 @@ class Identificador(Nodo):
     def __repr__(self) -> str:
         return f"ID({self.nombre})"
 
+@con_slots
 @dataclass
 class IdCalificado(Nodo):
     base: Identificador = None  
     atributo: Identificador = None          # Para los prefijados AA.BB
-    def hijos(self) -> List[Nodo]:
-        return [self.base, self.atributo]   
+    _HIJOS = (("base", HIJO), ("atributo", HIJO))
 
+@con_slots
 @dataclass
 class Literal(Nodo):
     '''
@@ -173,128 +277,108 @@ class Literal(Nodo):
     '''
     valor: Any = None
 # HABLAR CON RAMON CASO TRUNC.TXT y lambda.txt analizar el signo negativo en literales.
+@con_slots
 @dataclass
 class Unario(Nodo):
     op: str = "-"                                   # Un solo operando por ejemplo -5
     expr: Nodo = None                               
-    def hijos(self) -> List[Nodo]:                  # Devuelve la lista de hijos del nodo unario.
-        return [self.expr] if self.expr else []     # Retorna una lista con el nodo de la expresion por ejemplo Literal 5. Sino expr devuelve lista vacia.
+    _HIJOS = (("expr", HIJO_OPCIONAL),)             # El nodo de la expresion, por ejemplo Literal 5, si hay una.
+@con_slots
 @dataclass
 class Binario(Nodo):
     op: str = ""
     izq: Nodo = None  
     der: Nodo = None
-    def hijos(self) -> List[Nodo]:
-        return [self.izq, self.der]
+    _HIJOS = (("izq", HIJO), ("der", HIJO))
 
+@con_slots
 @dataclass
 class Asignacion(Nodo):
     destino: Union[Identificador, IdCalificado, None] = None # 
     expr: Nodo = None  
-    def hijos(self) -> List[Nodo]:
-        lista: List[Nodo] = []
-        if isinstance(self.destino, Nodo):  # Asegurarse de que destino es un Nodo
-            lista.append(self.destino)      # Agregar destino a la lista de hijos
-        if self.expr:                       # Verificar que expr no sea None
-            lista.append(self.expr)         # Agregar expr a la lista de hijos
-        return lista
+    _HIJOS = (("destino", HIJO_OPCIONAL), ("expr", HIJO_OPCIONAL))
 
+@con_slots
 @dataclass
 class MultiAsignacion(Nodo):
     destinos: List[Identificador] = field(default_factory=list)
     expresiones: List[Nodo] = field(default_factory=list)
-    def hijos(self) -> List[Nodo]:
-        return [*self.destinos, *self.expresiones]
-    '''
-        Aca tuvimos que usar * para poder devolver una lista unica con destinos y expresiones.
-        Esto es necesario porque en Python, al usar listas, no podemos simplemente concatenar dos listas
-        de forma directa en el retorno, ya que eso devolveria una lista de listas. Al usar * descomponemos
-        las listas en sus elementos individuales.
-    '''
+    _HIJOS = (("destinos", HIJOS), ("expresiones", HIJOS))   # Primero todos los destinos y despues todas las expresiones
 
+@con_slots
 @dataclass
 class Si(Nodo):
     condicion: Nodo = None          
     entonces: Bloque = None  
     sino: Optional[Bloque] = None   
-    def hijos(self) -> List[Nodo]:
-        lista = [self.condicion, self.entonces]
-        if self.sino:
-            lista.append(self.sino)
-        return lista
+    _HIJOS = (("condicion", HIJO), ("entonces", HIJO), ("sino", HIJO_OPCIONAL))
 
+@con_slots
 @dataclass
 class DoWhile(Nodo):
     cuerpo: Bloque = None  
     condicion: Nodo = None  
-    def hijos(self) -> List[Nodo]:
-        return [self.cuerpo, self.condicion]
+    _HIJOS = (("cuerpo", HIJO), ("condicion", HIJO))
 
+@con_slots
 @dataclass
 class Print(Nodo):
     expr: Nodo = None 
-    def hijos(self) -> List[Nodo]:
-        return [self.expr] if self.expr else [] #Si hay una expresion la devolvemos en lista
+    _HIJOS = (("expr", HIJO_OPCIONAL),)
 
+@con_slots
 @dataclass
 class Return(Nodo):
     expr: Optional[Nodo] = None
-    def hijos(self) -> List[Nodo]:
-        return [self.expr] if self.expr else [] #Si hay una expresion la devolvemos en lista
+    _HIJOS = (("expr", HIJO_OPCIONAL),)
 
+@con_slots
 @dataclass
 class Parametro(Nodo):
     nombre: str = ""            # Nombre del parametro
     por_ref: bool = False       # Indica si es por CVR o CV
     tipo: Tipo = Tipo.UNKNOWN   # Tipo del parametro
 
+@con_slots
 @dataclass
 class Invocacion(Nodo):
     nombre: str = ""
     argumentos: List[Tuple[Nodo, Optional[str]]] = field(default_factory=list)  # Lista de tuplas (expresion, nombre_formal)
-    def hijos(self) -> List[Nodo]:
-        return [e for (e, _) in self.argumentos]    # Devolvemos solo las expresiones, con el _ ignoramos el nombre formal. Mas tarde se validaran los nombres formales.
-                                                    # por ahora devolvemos una lista con expresiones.
+    _HIJOS = (("argumentos", HIJOS_ARGUMENTOS),)    # Solo las expresiones; los nombres formales se validan mas tarde.
 
+@con_slots
 @dataclass
 class Funcion(Nodo):
     nombre: str = ""
     params: List[Parametro] = field(default_factory=list)
     cuerpo: Bloque = None  
     retorno: Tipo = Tipo.UINT
-    def hijos(self) -> List[Nodo]:
-        '''
-            Hay que devolver parametros y luego el cuerpo. Pero los parametros estan en una lista que
-            tenemos que desempaquetar para devolverlos uno por uno y luego agregar el cuerpo.
-            El if dice que si el cuerpo existe lo agregamos al final, sino devolvemos solo los parametros.
-        '''
-        return [*self.params, self.cuerpo] if self.cuerpo else list(self.params)
+    _HIJOS = (("params", HIJOS), ("cuerpo", HIJO_OPCIONAL))  # Los parametros uno por uno y despues el cuerpo, si existe
 
+@con_slots
 @dataclass
 class Lambda(Nodo):
     parametro: Parametro = field(default_factory=Parametro)
     cuerpo: Nodo = None 
     argumento: Nodo = None  
-    def hijos(self):
-        return [self.parametro, self.cuerpo, self.argumento]
+    _HIJOS = (("parametro", HIJO), ("cuerpo", HIJO), ("argumento", HIJO))
 
+@con_slots
 @dataclass
 class Trunc(Nodo):
     expr: Nodo = None  
-    def hijos(self) -> List[Nodo]:
-        return [self.expr] if self.expr else []
+    _HIJOS = (("expr", HIJO_OPCIONAL),)
 
+@con_slots
 @dataclass
 class AuxiliarWasm(Nodo):
     """
     Nodo para representar una variable auxiliar de Wasm que contiene un resultado intermedio.
     Este nodo reemplaza a un subárbol ya procesado por el generador de código.
     """
-    nombre: str = "" # El nombre de la variable en Wasm, ej:$t0
+    nombre: int = 0 # El numero de la variable en Wasm, ej: 0 para $t0
     def __repr__(self) -> str:
-        return f"AuxWasm({self.nombre})"
-    def hijos(self) -> List[Nodo]:
-        return []
+        return f"AuxWasm($t{self.nombre})"
 
 @dataclass
 class ArbolSemantico: #contiene imprimir_arbol() para impresión legible y to_dot() para exportar a Graphviz/DOT
@@ -308,48 +392,73 @@ class ArbolSemantico: #contiene imprimir_arbol() para impresión legible y to_do
 
     '''
         Metodo para imprimir el arbol por consola.
+        Los limites (profundidad, max_nodos, funcion) son los de escribir_arbol.
     '''
-    def imprimir_arbol(self) -> str:
-        if not self.raiz:
-            return "(árbol vacío)"
-        lineas: List[str] = []
-
-        def rec(n: Any, pref: str = ""):
-            if n is None:
-                return
-            if isinstance(n, list):
-                for elem in n:
-                    rec(elem, pref)
-                return
+    def imprimir_arbol(self, **limites) -> str:
+        salida = io.StringIO()
+        self.escribir_arbol(salida, **limites)
+        return salida.getvalue()[:-1]
+
+    def escribir_arbol(self, archivo, profundidad: Optional[int] = None, max_nodos: Optional[int] = None,
+                       funcion: Optional[str] = None) -> int:
+        # Escribe el arbol linea por linea en archivo. profundidad: niveles que se muestran
+        # debajo de cada raiz; max_nodos: corta despues de esa cantidad de nodos; funcion:
+        # muestra solo las funciones con ese nombre. Devuelve cuantos nodos se escribieron.
+        raices = self._raices(funcion)
+        if raices is None:
+            archivo.write("(árbol vacío)\n" if funcion is None else f"(no hay ninguna función '{funcion}')\n")
+            return 0
+        escritos = 0
+        cortado = False
+
+        # Las listas no se imprimen: sus elementos quedan al mismo nivel que la lista
+        def entrar(n: Any, padre: Any, nivel: int):
+            nonlocal escritos, cortado
+            if max_nodos is not None and escritos >= max_nodos:
+                cortado = True
+                return DETENER
+            escritos += 1
+            pref = "  " * nivel
             if not isinstance(n, Nodo):
-                lineas.append(f"{pref}{n!r}")
+                archivo.write(f"{pref}{n!r}\n")
                 return
             info = f"{pref}{n.__class__.__name__}"
             if hasattr(n, "tipo") and isinstance(n.tipo, Tipo):
                 info += f" : {n.tipo.name}"
-            lineas.append(info)
-            for h in n.hijos():
-                rec(h, pref + "  ")
+            archivo.write(info + "\n")
+            if profundidad is not None and nivel >= profundidad:
+                if next(_hijos_impresos(n), None) is not None:
+                    archivo.write(f"{pref}  ...\n")
+                return False
+
+        for raiz in raices:
+            recorrer(raiz, _hijos_impresos, entrar)
+            if cortado:
+                archivo.write(f"... (se muestran {max_nodos} nodos)\n")
+                break
+        return escritos
 
-        rec(self.raiz)
-        return "\n".join(lineas)
-    
     '''
         Este metodo le cambia el formato al arbol y lo pasa a formato DOT para ver el arbol en la pagina web mencionada en el informe.
+        Los limites son los de escribir_dot.
     '''
-    def to_dot(self) -> str:
-        if not self.raiz:
-            return "digraph G {}"
-        lines = ["digraph G {", '  node [shape=box, fontname="Courier"];']
-        idx = 0
-        idmap: Dict[int, str] = {}
-        def nid(n: Nodo) -> str:
-            nonlocal idx
-            key = id(n)
-            if key not in idmap:
-                idx += 1
-                idmap[key] = f"n{idx}"
-            return idmap[key]
+    def to_dot(self, **limites) -> str:
+        salida = io.StringIO()
+        self.escribir_dot(salida, **limites)
+        return salida.getvalue()[:-1]
+
+    def escribir_dot(self, archivo, profundidad: Optional[int] = None, max_nodos: Optional[int] = None,
+                     funcion: Optional[str] = None) -> int:
+        # Mismos limites que escribir_arbol. Los nombres de los nodos (n1, n2, ...) salen de un
+        # contador en el orden del recorrido; solo se guarda el del camino actual (uno por nivel).
+        raices = self._raices(funcion, planas=False)
+        if raices is None:
+            archivo.write("digraph G {}\n")
+            return 0
+        archivo.write('digraph G {\n  node [shape=box, fontname="Courier"];\n')
+        contador = 0
+        camino: List[str] = []
+        cortado = False
         def label(n: Nodo) -> str:
             base = n.__class__.__name__
             if isinstance(n, Identificador):
@@ -365,59 +474,137 @@ class ArbolSemantico: #contiene imprimir_arbol() para impresión legible y to_do
             if hasattr(n, "tipo") and isinstance(n.tipo, Tipo):
                 base += f"\\n:{n.tipo.name}"
             return base
-        def rec(n: Any):
-            if n is None:
-                return
-            if isinstance(n, list):
-                for e in n:
-                    rec(e)
-                return
-            if not isinstance(n, Nodo):
+        # La arista padre -> hijo se escribe justo antes de bajar al hijo
+        def entrar(n: Any, padre: Any, nivel: int):
+            nonlocal contador, cortado
+            del camino[nivel:]
+            if not isinstance(n, Nodo) and not isinstance(padre, Nodo):
+                # Una lista suelta (la raiz) no se dibuja ni lleva nombre
+                camino.append(None)
                 return
-            lines.append(f'  {nid(n)} [label="{label(n)}"];')
-            for h in n.hijos():
-                if h is None:
-                    continue
-                if isinstance(h, list):
-                    for sub in h:
-                        if isinstance(sub, Nodo):
-                            lines.append(f"  {nid(n)} -> {nid(sub)};")
-                            rec(sub)
-                    continue
-                lines.append(f"  {nid(n)} -> {nid(h)};")
-                rec(h)
-        rec(self.raiz)
-        lines.append("}")
-        return "\n".join(lines)
+            if max_nodos is not None and contador >= max_nodos:
+                cortado = True
+                return DETENER
+            contador += 1
+            nid = f"n{contador}"
+            camino.append(nid)
+            if isinstance(padre, Nodo):
+                archivo.write(f"  {camino[nivel - 1]} -> {nid};\n")
+            if isinstance(n, Nodo):
+                archivo.write(f'  {nid} [label="{label(n)}"];\n')
+                if profundidad is not None and nivel >= profundidad:
+                    if next(_hijos_dot(n), None) is not None:
+                        archivo.write(f'  {nid}_mas [label="...", shape=none];\n  {nid} -> {nid}_mas;\n')
+                    return False
+        for raiz in raices:
+            recorrer(raiz, _hijos_dot, entrar)
+            if cortado:
+                archivo.write(f"  // ... (se muestran {max_nodos} nodos)\n")
+                break
+        archivo.write("}\n")
+        return contador
+
+    def _raices(self, funcion: Optional[str], planas: bool = True) -> Optional[Iterator[Any]]:
+        # Desde donde se empieza a escribir: la raiz (abierta si es una lista) o las funciones pedidas
+        if not self.raiz:
+            return None
+        if funcion is None:
+            return _planos([self.raiz]) if planas else iter([self.raiz])
+        encontradas = []
+        def entrar(n: Any, padre: Any, nivel: int):
+            if isinstance(n, Funcion) and str(n.nombre) == funcion:
+                encontradas.append(n)
+        for raiz in _planos([self.raiz]):
+            recorrer(raiz, _hijos_impresos, entrar)
+        return iter(encontradas) if encontradas else None
+
+def _planos(valores: Any) -> Iterator[Any]:
+    # Elementos de una lista con las listas anidadas abiertas y sin los None
+    pila = [iter(valores)]
+    while pila:
+        for v in pila[-1]:
+            if isinstance(v, list):
+                pila.append(iter(v))
+                break
+            if v is not None:
+                yield v
+        else:
+            pila.pop()
+
+def _hijos_impresos(n: Any) -> Iterator[Any]:
+    if isinstance(n, Nodo):
+        return _planos(n.iter_hijos())
+    return iter(())
+
+def _hijos_dot(n: Any) -> Iterator[Any]:
+    # De una lista de hijos solo se dibujan los nodos; una lista suelta (la raiz) se recorre entera
+    if isinstance(n, list):
+        yield from n
+        return
+    if not isinstance(n, Nodo):
+        return
+    for h in n.iter_hijos():
+        if h is None:
+            continue
+        if isinstance(h, list):
+            for sub in h:
+                if isinstance(sub, Nodo):
+                    yield sub
+        else:
+            yield h
 
 class ReglasTipos:  
     #Centraliza la logica de tipos.
     # Conjuntos de tipos
     num = {Tipo.UINT, Tipo.DFLOAT}
+    aritmeticos = ("+", "-", "*", "/")
+    comparaciones = ("==", "!=", "<", "<=", ">", ">=")
+
+    #Las reglas se evaluan una sola vez para cada combinacion y quedan en tablas (ver _armar_tablas).
+    _binario: Dict[Tuple[str, Tipo, Tipo], Tipo] = {}
+    _asignable: Dict[Tuple[Tipo, Tipo], bool] = {}
 
     #Metodo estatico porque no depende de ninguna instancia de la clase.
     @staticmethod
     def binario(op: str, t1: Tipo, t2: Tipo) -> Tipo:
         # Define el tipo resultante de una operacion binaria entre t1 y t2 con el operador op.
-        if op in {"+", "-", "*", "/"}:                                          #Reglas para operaciones aritmeticas                   
+        return ReglasTipos._binario.get((op, t1, t2), Tipo.UNKNOWN)
+    @staticmethod
+    def compatible_asignacion(dest: Tipo, src: Tipo) -> bool:                   #Reglas para compatibilidad de asignacion
+        return ReglasTipos._asignable.get((dest, src), dest == src)
+    @staticmethod
+    def es_numerico(t: Tipo) -> bool:                 #Verifica si el tipo es numerico
+        return t in ReglasTipos.num
+
+    @staticmethod
+    def _regla_binario(op: str, t1: Tipo, t2: Tipo) -> Tipo:
+        if op in ReglasTipos.aritmeticos:                                        #Reglas para operaciones aritmeticas
             if t1 in ReglasTipos.num and t2 in ReglasTipos.num:                 #Ambos son numeros
                 return Tipo.DFLOAT if Tipo.DFLOAT in (t1, t2) else Tipo.UINT
             return Tipo.UNKNOWN                                                 #Si no son numero error.
-        if op in {"==", "!=", "<", "<=", ">", ">="}:                            #Reglas para operaciones.
+        if op in ReglasTipos.comparaciones:                                     #Reglas para operaciones.
             if t1 in ReglasTipos.num and t2 in ReglasTipos.num:
                 return Tipo.BOOL
             return Tipo.UNKNOWN
         return Tipo.UNKNOWN
     @staticmethod
-    def compatible_asignacion(dest: Tipo, src: Tipo) -> bool:                   #Reglas para compatibilidad de asignacion
-        if dest == src:                                                         #Verifica si se puede asignar src a dest
+    def _regla_asignacion(dest: Tipo, src: Tipo) -> bool:                       #Verifica si se puede asignar src a dest
+        if dest == src:
             return True
         if dest == Tipo.DFLOAT and src == Tipo.UINT:
             return True
         return False
+
     @staticmethod
-    def es_numerico(t: Tipo) -> bool:                 #Verifica si el tipo es numerico
-        return t in {Tipo.UINT, Tipo.DFLOAT}
+    def _armar_tablas() -> None:
+        # Combinaciones que faltan en las tablas: binario da UNKNOWN y asignacion compara con ==
+        for t1 in Tipo:
+            for t2 in Tipo:
+                for op in ReglasTipos.aritmeticos + ReglasTipos.comparaciones:
+                    ReglasTipos._binario[(op, t1, t2)] = ReglasTipos._regla_binario(op, t1, t2)
+                ReglasTipos._asignable[(t1, t2)] = ReglasTipos._regla_asignacion(t1, t2)
+
+ReglasTipos._armar_tablas()
 
 class Mangler:
     _map_t: Dict[Tipo, str] = {
@@ -436,7 +623,7 @@ class Mangler:
         # Retornamos: Nombre__Parametros__Retorno
         return f"{nombre}__{modos}__{Mangler._map_t.get(ret,'X')}"
 
-class AnalisisSemantico:    
+class AnalisisSemantico(Visitante):
     #mantiene diag y tabla y expone analizar_entrada que convierte la salida del parser a AST y analizar que visita la raíz.
     def __init__(self, tabla: Optional[TablaDeSimbolos] = None) -> None:
         self.diag: List[Diagnostico] = []
@@ -455,8 +642,17 @@ class AnalisisSemantico:
         self._visitar(raiz, amb)        # Retornamos el arbol semantico con la raiz y los diagnosticos.
         return ArbolSemantico(raiz, self.diag)  
 
-    # Metodo recursivo que visita nodos del AST.
-    def _visitar(self, n: Any, amb: Ambito) -> Tipo:   
+    '''
+        Visita un nodo del AST y devuelve su tipo. El recorrido no usa recursion de Python:
+        cada metodo _v_ pide visitar un hijo con `t = yield hijo, amb` y Recorrido.ejecutar
+        lleva la pila de visitas pendientes. Asi un arbol muy profundo (una cadena larga de
+        sumas, muchos if anidados) no llega al limite de recursion.
+    '''
+    def _visitar(self, n: Any, amb: Ambito) -> Tipo:
+        return ejecutar(self._paso, n, amb, salir=self._anotar)
+
+    # Un paso del recorrido: el tipo de n, o un generador que visita los hijos.
+    def _paso(self, n: Any, amb: Ambito):
 
         # Caso base: si el nodo es None (ej: un else que no existe), devolvemos UNKNOWN.
         if n is None:
@@ -464,31 +660,47 @@ class AnalisisSemantico:
         
         # Si es una lista de nodos (ej sentencias en un bloque) visitamos cada uno.
         if isinstance(n, list):
-            ultimo = Tipo.VOID
-            for elem in n:
-                ultimo = self._visitar(elem, amb)
-            return ultimo
+            return self._visitar_lista(n, amb)
         
         # Si no es un nodo, no sabemos que hacer.
         if not isinstance(n, Nodo):
             return Tipo.UNKNOWN
         
         '''
-            En vez de hacer un if else para cada tipo de nodo, usamos una tecnica llamada reflexion
-            el codigo getattr busca si existe un metodo llamado _v_NombreDeLaClase y si existe lo llama.
+            En vez de hacer un if else para cada tipo de nodo, cada clase de nodo tiene su metodo
+            _v_NombreDeLaClase. metodo_para (Visitante) lo busca la primera vez que aparece la clase
+            y despues lo saca de una tabla indexada por la clase.
         '''
-        metodo = getattr(self, f"_v_{n.__class__.__name__}", None) # getattr le pregunta a la clase analisis semantico si tiene un metodo llamado _v_NombreDeLaClase
-        if metodo:                # Si existe el metodo, lo llamamos    
-            n.tipo = metodo(n, amb) # Anotamos el tipo devuelto por el metodo en el nodo
-        else:                       # Si no existe el metodo, visitamos recursivamente los hijos
-            for h in n.hijos():
-                self._visitar(h, amb)
-            n.tipo = getattr(n, "tipo", Tipo.UNKNOWN)
-        return n.tipo
+        try:
+            metodo = self._despacho[n.__class__]
+        except KeyError:
+            metodo = self.metodo_para(n.__class__)
+        if metodo:                    # Si existe el metodo, lo llamamos
+            return metodo(self, n, amb)
+        return self._visitar_hijos(n, amb) # Si no existe el metodo, visitamos los hijos
+
+    def _visitar_lista(self, n: list, amb: Ambito):
+        ultimo = Tipo.VOID
+        for elem in n:
+            ultimo = yield elem, amb
+        return ultimo
+
+    def _visitar_hijos(self, n: Nodo, amb: Ambito):
+        for h in n.iter_hijos():
+            yield h, amb
+        return getattr(n, "tipo", Tipo.UNKNOWN)
+
+    # Al terminar cada nodo anotamos en el el tipo que devolvio su metodo.
+    @staticmethod
+    def _anotar(args: Tuple[Any, Ambito], tipo: Tipo) -> Tipo:
+        n = args[0]
+        if isinstance(n, Nodo):
+            n.tipo = tipo
+        return tipo
 
     def _v_Bloque(self, n: Bloque, amb: Ambito) -> Tipo:
-        for s in n.hijos():  # ya aplanado
-            self._visitar(s, amb)
+        for s in n.sentencias:  # el parser ya las deja planas
+            yield s, amb
         return Tipo.VOID
 
     def _v_Programa(self, n: Programa, amb: Ambito) -> Tipo:
@@ -501,12 +713,16 @@ class AnalisisSemantico:
             self.tabla.asignar_tipo(n.nombre, "Identificador")
         if n.cuerpo:
             #usamos el mismo ambito global para el cuerpo
-            self._visitar(n.cuerpo, amb)
+            yield n.cuerpo, amb
         return Tipo.VOID
 
     
+    def _v_SentenciaErronea(self, n: SentenciaErronea, amb: Ambito) -> Tipo:
+        # El parser ya registro el error de sintaxis
+        return Tipo.UNKNOWN
+
     def _v_ErrorNodo(self, n: ErrorNodo, amb: Ambito) -> Tipo:
-        self.diag.append(Diagnostico(f"Nodo error: {n.mensaje}", getattr(n, 'linea', 0)))
+        self.diag.append(Diagnostico(f"Nodo error: {n.mensaje}", getattr(n, 'linea', 0), index=getattr(n, 'index', None)))
         n.tipo = Tipo.UNKNOWN
         return n.tipo
 
@@ -514,19 +730,20 @@ class AnalisisSemantico:
         # Nuevo ambito para cuerpo
         amb_l = Ambito(amb)
         amb_l.declarar(SimboloVariable(nombre=n.parametro.nombre, tipo=n.parametro.tipo), self.diag)
-        self._visitar(n.cuerpo, amb_l)
-        self._visitar(n.argumento, amb_l)
+        yield n.cuerpo, amb_l
+        yield n.argumento, amb_l
+        amb_l.cerrar()
         n.tipo = Tipo.VOID
         return n.tipo
 
 
     def _v_DeclVar(self, n: DeclVar, amb: Ambito) -> Tipo:
         for ident in n.ids:
-            sim = SimboloVariable(nombre=ident.nombre, tipo=n.tipo_decl, linea=ident.linea)
+            sim = SimboloVariable(nombre=ident.nombre, tipo=n.tipo_decl, linea=ident.linea, index=ident.index)
             if amb.declarar(sim, self.diag):
                 ident.tipo = n.tipo_decl  # anotar tipo en el nodo
                 if self.tabla:
-                    mangled = f"{ident.nombre}{amb.get_mangled_path()}" # para decir por ejemplo "var":PROG
+                    mangled = amb.mangle(ident.nombre) # para decir por ejemplo "var":PROG
                     #Si el lexico ya agrega variable, la migramos y evitamos duplicado
                     if not self.tabla.renombrar(ident.nombre, mangled):
                         self.tabla.agregar(mangled, n.tipo_decl, linea=ident.linea)
@@ -542,7 +759,7 @@ class AnalisisSemantico:
         sim = amb.resolver(n.nombre)
         if sim:
             return sim.tipo
-        self.diag.append(Diagnostico(f"Uso de identificador no declarado: '{n.nombre}'", n.linea))
+        self.diag.append(Diagnostico(f"Uso de identificador no declarado: '{n.nombre}'", n.linea, index=n.index))
         return Tipo.UNKNOWN
 
 
@@ -554,15 +771,13 @@ class AnalisisSemantico:
             n.base.tipo = sim_base.tipo
         
         #Buscamos un ambito visible cuyo nombre sea el prefijo (actual o ancestro)
-        amb_base: Optional[Ambito] = amb
-        while amb_base and amb_base.nombre != n.base.nombre:
-            amb_base = amb_base.padre
+        amb_base = amb.ambito_visible(n.base.nombre)
 
         if not amb_base:
             # El prefijo no es visible (no está en la cadena de ancestros)
             self.diag.append(Diagnostico(
                 f"Ámbito prefijado '{n.base.nombre}' no es visible desde el ambito actual o no existe.",
-                n.linea
+                n.linea, index=n.index
             ))
             return Tipo.UNKNOWN
             
@@ -571,7 +786,7 @@ class AnalisisSemantico:
         if not sim:
             self.diag.append(Diagnostico(
                 f"Identificador '{n.atributo.nombre}' no declarado en el ambito '{n.base.nombre}'.",
-                n.linea
+                n.linea, index=n.index
             ))
             return Tipo.UNKNOWN
         n.atributo.tipo = sim.tipo
@@ -589,42 +804,42 @@ class AnalisisSemantico:
 
 
     def _v_Unario(self, n: Unario, amb: Ambito) -> Tipo:
-        t = self._visitar(n.expr, amb)
+        t = yield n.expr, amb
         if n.op == "-" and t in {Tipo.UINT, Tipo.DFLOAT}:
             return t
         return Tipo.UNKNOWN
 
 
     def _v_Binario(self, n: Binario, amb: Ambito) -> Tipo:
-        t1 = self._visitar(n.izq, amb)
-        t2 = self._visitar(n.der, amb)
+        t1 = yield n.izq, amb
+        t2 = yield n.der, amb
         return ReglasTipos.binario(n.op, t1, t2)
 
 
     def _v_Asignacion(self, n: Asignacion, amb: Ambito) -> Tipo:
         # Visitar y anotar el tipo del destino y la expresion 
-        t_dest = self._visitar(n.destino, amb)
-        t_expr = self._visitar(n.expr, amb)
+        t_dest = yield n.destino, amb
+        t_expr = yield n.expr, amb
 
         if t_dest == Tipo.UNKNOWN:
             # El error ya fue reportado por _v_Identificador
             return Tipo.UNKNOWN
 
         if not ReglasTipos.compatible_asignacion(t_dest, t_expr):
-            self.diag.append(Diagnostico(f"No se puede asignar tipo {t_expr.name} a {t_dest.name}", n.linea))
+            self.diag.append(Diagnostico(f"No se puede asignar tipo {t_expr.name} a {t_dest.name}", n.linea, index=n.index))
             return Tipo.UNKNOWN
 
         return t_dest
 
     def _v_Print(self, n: Print, amb: Ambito) -> Tipo:
-        self._visitar(n.expr, amb)
+        yield n.expr, amb
         return Tipo.VOID
 
     def _v_Funcion(self, n: Funcion, amb: Ambito) -> Tipo:
         #Declaramos la funcion en el ambito actual
         params_sim = [SimboloParametro(nombre=p.nombre, tipo=p.tipo, por_ref=p.por_ref) for p in n.params]
-        mangled_fun = f"{n.nombre}{amb.get_mangled_path()}" 
-        sim_func = SimboloFuncion(nombre=n.nombre, tipo=n.retorno, linea=n.linea, params=params_sim, mangle=mangled_fun)
+        mangled_fun = amb.mangle(n.nombre)
+        sim_func = SimboloFuncion(nombre=n.nombre, tipo=n.retorno, linea=n.linea, index=n.index, params=params_sim, mangle=mangled_fun)
         if not amb.declarar(sim_func, self.diag):
             return Tipo.UNKNOWN # Error de redeclaracion
 
@@ -641,7 +856,7 @@ class AnalisisSemantico:
             if amb_func.declarar(sim_p, self.diag):
                 p.tipo = sim_p.tipo # Anotar nodo del parametro
                 if self.tabla:  #Para poner el tipo del parametro en la tabla de simbolos principal
-                    mangled_par = f"{p.nombre}{amb_func.get_mangled_path()}"  
+                    mangled_par = amb_func.mangle(p.nombre)
                     if not self.tabla.renombrar(p.nombre, mangled_par):
                         self.tabla.agregar(mangled_par, p.tipo, linea=n.linea)
                     self.tabla.asignar_tipo(mangled_par, p.tipo)
@@ -649,7 +864,8 @@ class AnalisisSemantico:
                     self.tabla.asignar_uso(mangled_par, uso)
 
         #Visitamos cuerpo de la función
-        self._visitar(n.cuerpo, amb_func)
+        yield n.cuerpo, amb_func
+        amb_func.cerrar()
         return n.retorno
 
 
@@ -661,7 +877,7 @@ class AnalisisSemantico:
 
     def _v_Return(self, n: Return, amb: Ambito) -> Tipo:
         if n.expr:
-            return self._visitar(n.expr, amb)
+            return (yield n.expr, amb)
         return Tipo.VOID
     
     
@@ -669,21 +885,21 @@ class AnalisisSemantico:
         #Verificamos si la funcion existe en el ambito
         sim = amb.resolver(n.nombre)
         if not sim:
-            self.diag.append(Diagnostico(f"Invocación a función no declarada: {n.nombre}", n.linea))
+            self.diag.append(Diagnostico(f"Invocación a función no declarada: {n.nombre}", n.linea, index=n.index))
             # Validar los argumentos para detectar errores anidados
             for arg, _formal in n.argumentos:
-                self._visitar(arg, amb)
+                yield arg, amb
             return Tipo.UNKNOWN
         # Vemos si el simbolo sea efectivamente una funcion
         if not isinstance(sim, SimboloFuncion):
-            self.diag.append(Diagnostico(f"'{n.nombre}' no es una funcion", n.linea))
+            self.diag.append(Diagnostico(f"'{n.nombre}' no es una funcion", n.linea, index=n.index))
             for arg, _formal in n.argumentos:
-                self._visitar(arg, amb)
+                yield arg, amb
             return Tipo.UNKNOWN
         sim_func: SimboloFuncion = sim  
 
         #Se reordenan los argumentos formales si se pasan en desorden
-        argumentos_reordenados = self._reordenar_argumentos(n.argumentos, sim_func.params, n.linea)
+        argumentos_reordenados = self._reordenar_argumentos(n.argumentos, sim_func.params, n.linea, n.index)
         if argumentos_reordenados is not None:
             n.argumentos = argumentos_reordenados
 
@@ -691,11 +907,11 @@ class AnalisisSemantico:
         if len(n.argumentos) != len(sim_func.params):
             self.diag.append(Diagnostico(
                 f"Invocacion a '{n.nombre}': se esperaban {len(sim_func.params)} argumentos, se recibieron {len(n.argumentos)}",
-                n.linea
+                n.linea, index=n.index
             ))
         # Validamos tipos de los argumentos y reglas CVR
         for i, (arg_expr, formal_nombre) in enumerate(n.argumentos):
-            tipo_arg = self._visitar(arg_expr, amb)
+            tipo_arg = yield arg_expr, amb
             
             if i < len(sim_func.params):
                 param_esperado = sim_func.params[i]
@@ -704,7 +920,8 @@ class AnalisisSemantico:
                     self.diag.append(Diagnostico(
                         f"El parametro '{param_esperado.nombre}' es de tipo CVR (entrada/salida) y requiere una variable, no una constante o expresion.",
                         n.linea,
-                        "ERROR"
+                        "ERROR",
+                        index=n.index
                     ))
                 #Verificamos compatibilidad de tipos
                 if not ReglasTipos.compatible_asignacion(param_esperado.tipo, tipo_arg):
@@ -712,11 +929,11 @@ class AnalisisSemantico:
                     msg += f"Se esperaba {param_esperado.tipo.name}, se recibio {tipo_arg.name}"
                     if param_esperado.tipo == Tipo.UINT and tipo_arg == Tipo.DFLOAT:
                         msg += " (use trunc(expr))"
-                    self.diag.append(Diagnostico(msg, n.linea))
+                    self.diag.append(Diagnostico(msg, n.linea, index=n.index))
         # Retornamos el tipo de retorno de la función
         return sim_func.tipo
 
-    def _reordenar_argumentos(self, argumentos: List, params: List, linea: int) -> Optional[List]:
+    def _reordenar_argumentos(self, argumentos: List, params: List, linea: int, index: Optional[int] = None) -> Optional[List]:
         # Si ningun argumento tiene nombre formal, no se reordena nada
         if not any(nombre for _, nombre in argumentos):
             return None
@@ -728,32 +945,36 @@ class AnalisisSemantico:
         resultado = [None] * len(params)
         for arg, nombre_formal in argumentos:
             if nombre_formal not in idx_por_nombre:
-                self.diag.append(Diagnostico(f"Parametro '{nombre_formal}' no existe", linea))
+                self.diag.append(Diagnostico(f"Parametro '{nombre_formal}' no existe", linea, index=index))
                 return None
             idx = idx_por_nombre[nombre_formal]
             if resultado[idx] is not None:
-                self.diag.append(Diagnostico(f"Parametro '{nombre_formal}' duplicado", linea))
+                self.diag.append(Diagnostico(f"Parametro '{nombre_formal}' duplicado", linea, index=index))
                 return None
             resultado[idx] = (arg, nombre_formal)
         
         #Se verifica que no falten argumentos
         for i, r in enumerate(resultado):
             if r is None:
-                self.diag.append(Diagnostico(f"Falta argumento para '{params[i].nombre}'", linea))
+                self.diag.append(Diagnostico(f"Falta argumento para '{params[i].nombre}'", linea, index=index))
                 return None
         
         return resultado
 
     def _v_Trunc(self, n: Trunc, amb: Ambito) -> Tipo:
-        t = self._visitar(n.expr, amb)
+        t = yield n.expr, amb
         if not ReglasTipos.es_numerico(t):
-            self.diag.append(Diagnostico("trunc() requiere expresion numerica.", n.linea))
+            self.diag.append(Diagnostico("trunc() requiere expresion numerica.", n.linea, index=n.index))
         return Tipo.UINT
     
 
     def _v_MultiAsignacion(self, n: MultiAsignacion, amb: Ambito) -> Tipo:
-        tipos_dest = [self._visitar(dest, amb) for dest in n.destinos]
-        tipos_expr = [self._visitar(expr, amb) for expr in n.expresiones]
+        tipos_dest = []
+        for dest in n.destinos:
+            tipos_dest.append((yield dest, amb))
+        tipos_expr = []
+        for expr in n.expresiones:
+            tipos_expr.append((yield expr, amb))
         num_dest = len(tipos_dest)
         num_expr = len(tipos_expr)
         if num_dest < num_expr:
@@ -761,14 +982,15 @@ class AnalisisSemantico:
             self.diag.append(Diagnostico(
                 f"Asignacion multiple: se descartan {sobrantes} expresiones sobrantes.",
                 n.linea,
-                "WARNING"
+                "WARNING",
+                index=n.index
             ))
             tipos_expr = tipos_expr[:num_dest]
         for i, (t_dest, t_expr) in enumerate(zip(tipos_dest, tipos_expr)):
             if not ReglasTipos.compatible_asignacion(t_dest, t_expr):
                 self.diag.append(Diagnostico(
                     f"Asignacion multiple, posicion {i+1}: no se puede asignar tipo {t_expr.name} a {t_dest.name}.",
-                    n.linea
+                    n.linea, index=n.index
                 ))
         return Tipo.VOID
 
@@ -776,11 +998,28 @@ class AnalisisSemantico:
 
         
 # Metodos para literales
-def lit_uint(valor: int, linea: int = 0) -> Literal:
-    return Literal(valor=int(valor), tipo=Tipo.UINT, linea=linea)
-
-def lit_dfloat(valor: float, linea: int = 0) -> Literal:
-    return Literal(valor=float(valor), tipo=Tipo.DFLOAT, linea=linea)
-
-def lit_string(valor: str, linea: int = 0) -> Literal:
-    return Literal(valor=str(valor), tipo=Tipo.STRING, linea=linea)
\ No newline at end of file
+'''
+    Un literal sin posicion es igual en todas sus apariciones de un arbol: con `compartidos` (el
+    diccionario del parser, que se vacia al terminar cada parseo) se usa un unico nodo por
+    (tipo, valor). El analisis semantico le vuelve a anotar el mismo tipo y el generador no lo
+    modifica, asi que compartirlo no cambia nada. La clave usa repr para no mezclar 0.0 con -0.0.
+    Sin `compartidos`, o con linea o posicion, el literal se crea cada vez.
+'''
+def literal(valor: Any, tipo: Tipo, linea: int = 0, index: Optional[int] = None,
+            compartidos: Optional[Dict[Tuple[Tipo, type, str], Literal]] = None) -> Literal:
+    if compartidos is None or linea or index is not None:
+        return Literal(valor=valor, tipo=tipo, linea=linea, index=index)
+    clave = (tipo, valor.__class__, repr(valor))
+    nodo = compartidos.get(clave)
+    if nodo is None:
+        nodo = compartidos[clave] = Literal(valor=valor, tipo=tipo)
+    return nodo
+
+def lit_uint(valor: int, linea: int = 0, compartidos=None) -> Literal:
+    return literal(int(valor), Tipo.UINT, linea, compartidos=compartidos)
+
+def lit_dfloat(valor: float, linea: int = 0, compartidos=None) -> Literal:
+    return literal(float(valor), Tipo.DFLOAT, linea, compartidos=compartidos)
+
+def lit_string(valor: str, linea: int = 0, compartidos=None) -> Literal:
+    return literal(str(valor), Tipo.STRING, linea, compartidos=compartidos)
\ No newline at end of file
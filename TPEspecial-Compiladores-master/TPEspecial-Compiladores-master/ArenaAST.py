@@ -0,0 +1,273 @@
+"""
+AST en arena: en lugar de un objeto dataclass (con su __dict__ y sus listas)
+por nodo, los nodos viven en arreglos paralelos y se identifican con un
+entero.
+
+    clase[i]    codigo de la clase del nodo (indice en CLASES), 1 byte
+    tipo[i]     Tipo del nodo (indice en TIPOS), 1 byte
+    linea[i]    linea del nodo
+    index[i]    posicion en el fuente (-1 si no tiene)
+    campo[i]    donde empiezan los campos del nodo en `campos`
+
+    campos      un entero por cada campo propio de la clase (izq, der, op,
+                sentencias, ...), codificado con una etiqueta en los 2 bits
+                bajos:  0 = None, 1 = id de nodo, 2 = indice en `valores`,
+                3 = indice de una secuencia (lista o tupla)
+    valores     valores distintos de los campos (nombres, operadores,
+                constantes, tipos); cada uno se guarda una sola vez
+    secuencias  cada lista/tupla es un tramo de `elementos`, que guarda los
+                elementos codificados igual que `campos`
+
+Para que el analisis semantico y el generador de codigo no cambien, cada nodo
+se ve a traves de una vista: una subclase de la clase original (Binario,
+Literal, ...) con las mismas propiedades, que lee y escribe en los arreglos.
+isinstance, hijos(), repr y el despacho por nombre de clase funcionan igual.
+Las vistas se crean a pedido y se reusan mientras alguien las tenga, asi que
+`padre.izq is sub` sigue valiendo.
+
+Las listas se devuelven armadas de nuevo en cada lectura: para cambiarlas hay
+que asignar el campo (nodo.argumentos = [...]), no modificarlas en el lugar.
+Un nodo comun que se asigna a un campo (por ejemplo un AuxiliarWasm del
+generador) se guarda tal cual en `valores`.
+
+    raiz = Arena.desde_arbol(parser.parse(tokens))   # vista de Programa
+"""
+import copy
+import dataclasses
+import sys
+import weakref
+from array import array
+
+from AnalisisSemantico import Nodo, Tipo
+
+# Campos que toda clase guarda en su propio arreglo
+_COMUNES = ('tipo', 'linea', 'index')
+
+_NINGUNO, _NODO, _VALOR, _SECUENCIA = 0, 1, 2, 3
+
+
+def _subclases(clase):
+    pendientes = [clase]
+    while pendientes:
+        c = pendientes.pop()
+        # con_slots deja viva la clase original hasta que pase el gc: solo
+        # cuenta la que quedo publicada en su modulo
+        if getattr(sys.modules[c.__module__], c.__name__, None) is c:
+            yield c
+        pendientes.extend(c.__subclasses__())
+
+
+CLASES = sorted(_subclases(Nodo), key=lambda c: c.__name__)
+TIPOS = list(Tipo)
+_CODIGO_CLASE = {c: i for i, c in enumerate(CLASES)}
+_CODIGO_TIPO = {t: i for i, t in enumerate(TIPOS)}
+_TIPO_OTRO = 255
+_CAMPOS = [tuple(f.name for f in dataclasses.fields(c) if f.name not in _COMUNES) for c in CLASES]
+
+
+class Arena:
+    def __init__(self):
+        self.clase = array('B')
+        self.tipo = array('B')
+        self.linea = array('i')
+        self.index = array('q')
+        self.campo = array('I')
+        self.campos = array('i')
+        self.valores = []
+        self.inicio_secuencia = array('I')
+        self.largo_secuencia = array('I')
+        self.es_tupla = array('B')
+        self.elementos = array('i')
+        self._tipos_otros = {}
+        self._codigo_valor = {}
+        self._vistas = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.clase)
+
+    @classmethod
+    def desde_arbol(cls, raiz):
+        # Copia un arbol de dataclasses a una arena nueva y devuelve la vista de la raiz
+        if raiz is None:
+            return None
+        arena = cls()
+        return arena._decodificar(arena.agregar(raiz))
+
+    # ---- alta de nodos ----
+    def agregar(self, raiz):
+        # Agrega el arbol que cuelga de `raiz` y devuelve su referencia codificada.
+        # Sin recursion: los nodos se reservan al verlos y sus campos se llenan
+        # al sacarlos de la pila, asi un arbol muy profundo no agota la pila de Python.
+        pendientes = []
+        vistos = {}
+        ref = self._codificar(raiz, pendientes, vistos)
+        campos = self.campos
+        while pendientes:
+            nodo, base, nombres = pendientes.pop()
+            for k, nombre in enumerate(nombres):
+                campos[base + k] = self._codificar(getattr(nodo, nombre), pendientes, vistos)
+        return ref
+
+    def _nuevo_nodo(self, nodo, codigo):
+        i = len(self.clase)
+        self.clase.append(codigo)
+        self.tipo.append(self._codigo_de_tipo(i, nodo.tipo))
+        self.linea.append(-1 if nodo.linea is None else nodo.linea)
+        self.index.append(-1 if nodo.index is None else nodo.index)
+        base = len(self.campos)
+        self.campo.append(base)
+        self.campos.extend([0] * len(_CAMPOS[codigo]))
+        return i, base
+
+    def _codigo_de_tipo(self, i, tipo):
+        codigo = _CODIGO_TIPO.get(tipo) if isinstance(tipo, Tipo) else None
+        if codigo is None:
+            self._tipos_otros[i] = tipo
+            return _TIPO_OTRO
+        self._tipos_otros.pop(i, None)
+        return codigo
+
+    def _codificar(self, valor, pendientes=None, vistos=None):
+        if valor is None:
+            return _NINGUNO
+        if isinstance(valor, _Vista) and valor._arena is self:
+            return valor._id << 2 | _NODO
+        codigo = _CODIGO_CLASE.get(valor.__class__)
+        if codigo is not None:
+            if vistos is None:
+                # Asignado a un campo despues de armar la arena: se guarda el objeto
+                return self._valor(valor) << 2 | _VALOR
+            ref = vistos.get(id(valor))
+            if ref is None:
+                i, base = self._nuevo_nodo(valor, codigo)
+                ref = vistos[id(valor)] = i << 2 | _NODO
+                pendientes.append((valor, base, _CAMPOS[codigo]))
+            return ref
+        if valor.__class__ is list or valor.__class__ is tuple:
+            elementos = [self._codificar(e, pendientes, vistos) for e in valor]
+            s = len(self.inicio_secuencia)
+            self.inicio_secuencia.append(len(self.elementos))
+            self.largo_secuencia.append(len(elementos))
+            self.es_tupla.append(valor.__class__ is tuple)
+            self.elementos.extend(elementos)
+            return s << 2 | _SECUENCIA
+        return self._valor(valor) << 2 | _VALOR
+
+    def _valor(self, valor):
+        try:
+            # La clave lleva la clase para no mezclar 1, 1.0 y True
+            clave = (valor.__class__, valor)
+            v = self._codigo_valor.get(clave)
+        except TypeError:
+            # No hasheable (un nodo comun, por ejemplo): se guarda sin internar
+            clave = None
+            v = None
+        if v is None:
+            v = len(self.valores)
+            self.valores.append(valor)
+            if clave is not None:
+                self._codigo_valor[clave] = v
+        return v
+
+    # ---- lectura ----
+    def _decodificar(self, ref):
+        etiqueta = ref & 3
+        if etiqueta == _NODO:
+            return self.vista(ref >> 2)
+        if etiqueta == _VALOR:
+            return self.valores[ref >> 2]
+        if etiqueta == _NINGUNO:
+            return None
+        s = ref >> 2
+        inicio = self.inicio_secuencia[s]
+        elementos = [self._decodificar(e) for e in self.elementos[inicio:inicio + self.largo_secuencia[s]]]
+        return tuple(elementos) if self.es_tupla[s] else elementos
+
+    def vista(self, i):
+        v = self._vistas.get(i)
+        if v is None:
+            v = object.__new__(_VISTAS[self.clase[i]])
+            v._arena = self
+            v._id = i
+            self._vistas[i] = v
+        return v
+
+    def memoria(self):
+        # Bytes de los arreglos (sin la tabla de valores)
+        arreglos = (self.clase, self.tipo, self.linea, self.index, self.campo, self.campos,
+                    self.inicio_secuencia, self.largo_secuencia, self.es_tupla, self.elementos)
+        return sum(a.itemsize * len(a) for a in arreglos)
+
+    def __deepcopy__(self, memo):
+        # copy.deepcopy del arbol: se copian los arreglos (y los valores, que
+        # pueden incluir nodos comunes), no las vistas
+        nueva = Arena.__new__(Arena)
+        memo[id(self)] = nueva
+        for nombre, valor in self.__dict__.items():
+            if nombre == '_vistas':
+                valor = weakref.WeakValueDictionary()
+            elif nombre == 'valores':
+                valor = copy.deepcopy(valor, memo)
+            else:
+                valor = copy.copy(valor)
+            setattr(nueva, nombre, valor)
+        return nueva
+
+
+class _Vista:
+    # Base de las vistas: el nodo es (arena, id); los atributos son propiedades.
+    # Los slots van en cada vista: dos bases con slots propios no se pueden combinar
+    __slots__ = ()
+
+    @property
+    def tipo(self):
+        codigo = self._arena.tipo[self._id]
+        return self._arena._tipos_otros[self._id] if codigo == _TIPO_OTRO else TIPOS[codigo]
+
+    @tipo.setter
+    def tipo(self, valor):
+        self._arena.tipo[self._id] = self._arena._codigo_de_tipo(self._id, valor)
+
+    @property
+    def linea(self):
+        linea = self._arena.linea[self._id]
+        return None if linea < 0 else linea
+
+    @linea.setter
+    def linea(self, valor):
+        self._arena.linea[self._id] = -1 if valor is None else valor
+
+    @property
+    def index(self):
+        index = self._arena.index[self._id]
+        return None if index < 0 else index
+
+    @index.setter
+    def index(self, valor):
+        self._arena.index[self._id] = -1 if valor is None else valor
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._arena, memo).vista(self._id)
+
+    def __reduce__(self):
+        raise TypeError("las vistas de una arena no se pueden serializar")
+
+
+def _propiedad(k):
+    def leer(self):
+        arena = self._arena
+        return arena._decodificar(arena.campos[arena.campo[self._id] + k])
+
+    def escribir(self, valor):
+        arena = self._arena
+        arena.campos[arena.campo[self._id] + k] = arena._codificar(valor)
+    return property(leer, escribir)
+
+
+def _crear_vista(clase, campos):
+    atributos = {nombre: _propiedad(k) for k, nombre in enumerate(campos)}
+    atributos.update(__slots__=('_arena', '_id', '__weakref__'), __module__=clase.__module__, __qualname__=clase.__qualname__)
+    return type(clase.__name__, (_Vista, clase), atributos)
+
+
+_VISTAS = [_crear_vista(c, campos) for c, campos in zip(CLASES, _CAMPOS)]
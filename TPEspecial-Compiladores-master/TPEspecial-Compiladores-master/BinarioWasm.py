@@ -0,0 +1,493 @@
+"""
+Codificacion directa del modulo al formato binario de WebAssembly (.wasm).
+
+El generador (generador_wasm.py) deja cada funcion como una lista de
+instrucciones (instruccion, inmediato): ("i32.const", 1), ("local.set", 0),
+("if", None), ... El inmediato de las constantes es el numero; el de las
+instrucciones con indice (local, global, call) y el de las etiquetas (block,
+loop, br_if) es el nombre con que el generador identifica a la variable, la
+funcion o el bloque, sin el texto del WAT. De esa misma lista el generador
+escribe el WAT. codificar_modulo toma las listas, los globales y los imports y
+arma las secciones type, import, function, global, export y code con LEB128,
+sin pasar por el texto del modulo ni por wat2wasm. Todo se recorre en un orden
+fijo, asi que el mismo programa da siempre los mismos bytes.
+
+verificar_binario lee un .wasm y controla su estructura: secciones, tamanios,
+indices (tipos, funciones, locales, globales, etiquetas), anidamiento de
+bloques, tipos de la pila de operandos y el limite de locales por funcion de
+los motores de JavaScript. Devuelve la lista de errores.
+"""
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+MAGIA = b"\x00asm"
+VERSION = b"\x01\x00\x00\x00"
+
+TIPOS = {"i32": 0x7F, "f64": 0x7C}
+NOMBRES_TIPOS = {codigo: nombre for nombre, codigo in TIPOS.items()}
+BLOQUE_VACIO = 0x40
+FIN = 0x0B
+# Limite de locales por funcion de la API de JavaScript (node y los navegadores no compilan mas)
+MAX_LOCALES = 50_000
+
+# Secciones, en el orden en que tienen que aparecer
+SECCION_TIPOS, SECCION_IMPORTS, SECCION_FUNCIONES, SECCION_GLOBALES, SECCION_EXPORTS, SECCION_CODIGO = 1, 2, 3, 6, 7, 10
+
+# Instrucciones sin inmediatos: codigo, tipos que consume, tipo que deja
+_I32_BIN = ("i32", "i32")
+_F64_BIN = ("f64", "f64")
+SIMPLES: Dict[str, Tuple[int, Tuple[str, ...], Optional[str]]] = {
+    "i32.eqz": (0x45, ("i32",), "i32"),
+    "i32.eq": (0x46, _I32_BIN, "i32"), "i32.ne": (0x47, _I32_BIN, "i32"),
+    "i32.lt_s": (0x48, _I32_BIN, "i32"), "i32.lt_u": (0x49, _I32_BIN, "i32"),
+    "i32.gt_s": (0x4A, _I32_BIN, "i32"), "i32.gt_u": (0x4B, _I32_BIN, "i32"),
+    "i32.le_s": (0x4C, _I32_BIN, "i32"), "i32.le_u": (0x4D, _I32_BIN, "i32"),
+    "i32.ge_s": (0x4E, _I32_BIN, "i32"), "i32.ge_u": (0x4F, _I32_BIN, "i32"),
+    "f64.eq": (0x61, _F64_BIN, "i32"), "f64.ne": (0x62, _F64_BIN, "i32"),
+    "f64.lt": (0x63, _F64_BIN, "i32"), "f64.gt": (0x64, _F64_BIN, "i32"),
+    "f64.le": (0x65, _F64_BIN, "i32"), "f64.ge": (0x66, _F64_BIN, "i32"),
+    "i32.add": (0x6A, _I32_BIN, "i32"), "i32.sub": (0x6B, _I32_BIN, "i32"),
+    "i32.mul": (0x6C, _I32_BIN, "i32"), "i32.div_s": (0x6D, _I32_BIN, "i32"),
+    "i32.div_u": (0x6E, _I32_BIN, "i32"),
+    "f64.add": (0xA0, _F64_BIN, "f64"), "f64.sub": (0xA1, _F64_BIN, "f64"),
+    "f64.mul": (0xA2, _F64_BIN, "f64"), "f64.div": (0xA3, _F64_BIN, "f64"),
+    "i32.trunc_f64_s": (0xAA, ("f64",), "i32"), "i32.trunc_f64_u": (0xAB, ("f64",), "i32"),
+}
+SIMPLES_POR_CODIGO = {codigo: (nombre, consume, deja) for nombre, (codigo, consume, deja) in SIMPLES.items()}
+
+BLOCK, LOOP, IF, ELSE, BR_IF, RETURN, CALL, DROP = 0x02, 0x03, 0x04, 0x05, 0x0D, 0x0F, 0x10, 0x1A
+LOCAL_GET, LOCAL_SET, LOCAL_TEE, GLOBAL_GET, GLOBAL_SET = 0x20, 0x21, 0x22, 0x23, 0x24
+I32_CONST, F64_CONST = 0x41, 0x44
+_CON_INDICE = {"call": CALL, "local.get": LOCAL_GET, "local.set": LOCAL_SET, "local.tee": LOCAL_TEE,
+               "global.get": GLOBAL_GET, "global.set": GLOBAL_SET}
+_BLOQUES = {"block": BLOCK, "loop": LOOP, "if": IF}
+_SIN_INMEDIATO = {"else": ELSE, "return": RETURN, "drop": DROP}
+
+# Una instruccion: (instruccion, inmediato); el inmediato es None si no lleva
+Instruccion = Tuple[str, Any]
+
+
+@dataclass
+class FuncionWasm:
+    """
+    Una funcion del modulo tal como la deja el generador: parametros y locales como
+    (nombre, tipo wasm), resultado (tipo wasm o None) y las instrucciones. Los nombres son
+    los del generador (cualquier valor hasheable); el texto solo hace falta en el WAT.
+    """
+    nombre: Hashable
+    parametros: List[Tuple[Hashable, str]] = field(default_factory=list)
+    resultado: Optional[str] = None
+    locales: List[Tuple[Hashable, str]] = field(default_factory=list)
+    codigo: List[Instruccion] = field(default_factory=list)
+
+
+class ErrorCodificacion(Exception):
+    pass
+
+
+def _uleb(n: int) -> bytes:
+    salida = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            salida.append(byte | 0x80)
+        else:
+            salida.append(byte)
+            return bytes(salida)
+
+
+def _sleb(n: int) -> bytes:
+    salida = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if (n == 0 and not byte & 0x40) or (n == -1 and byte & 0x40):
+            salida.append(byte)
+            return bytes(salida)
+        salida.append(byte | 0x80)
+
+
+def _nombre(texto: str) -> bytes:
+    datos = texto.encode("utf-8")
+    return _uleb(len(datos)) + datos
+
+
+def _vector(elementos: Sequence[bytes]) -> bytes:
+    return _uleb(len(elementos)) + b"".join(elementos)
+
+
+def _seccion(codigo: int, contenido: bytes) -> bytes:
+    return bytes((codigo,)) + _uleb(len(contenido)) + contenido
+
+
+def _tipo_funcion(parametros: Iterable[str], resultado: Optional[str]) -> bytes:
+    resultados = [resultado] if resultado else []
+    return b"\x60" + _vector([bytes((TIPOS[t],)) for t in parametros]) + _vector([bytes((TIPOS[t],)) for t in resultados])
+
+
+def codificar_modulo(importaciones: Sequence[Tuple[Hashable, Sequence[str]]], globales: Dict[Hashable, str],
+                     funciones: Sequence[FuncionWasm], exportada: Hashable) -> bytes:
+    '''
+        Arma el .wasm. importaciones: (nombre, tipos de los parametros) de cada funcion importada de
+        "env", que no devuelven nada; globales: nombre -> tipo, todos mutables y en 0; funciones:
+        las definidas, en orden; exportada: nombre de la funcion que se exporta.
+        Los indices de funciones, globales y locales salen del orden en que aparecen. Los nombres
+        de los imports y del export se escriben en el modulo con str().
+    '''
+    tipos: Dict[bytes, int] = {}
+
+    def indice_tipo(parametros, resultado):
+        return tipos.setdefault(_tipo_funcion(parametros, resultado), len(tipos))
+
+    indices_funciones: Dict[Hashable, int] = {}
+    imports = []
+    for nombre, parametros in importaciones:
+        indices_funciones[nombre] = len(indices_funciones)
+        imports.append(_nombre("env") + _nombre(str(nombre)) + b"\x00" + _uleb(indice_tipo(parametros, None)))
+    tipos_funciones = []
+    for funcion in funciones:
+        indices_funciones[funcion.nombre] = len(indices_funciones)
+        tipos_funciones.append(_uleb(indice_tipo([t for _, t in funcion.parametros], funcion.resultado)))
+
+    indices_globales = {nombre: i for i, nombre in enumerate(globales)}
+    seccion_globales = []
+    for tipo in globales.values():
+        inicial = bytes((I32_CONST,)) + _sleb(0) if tipo == "i32" else bytes((F64_CONST,)) + struct.pack("<d", 0.0)
+        seccion_globales.append(bytes((TIPOS[tipo], 1)) + inicial + bytes((FIN,)))
+
+    if exportada not in indices_funciones:
+        raise ErrorCodificacion(f"la funcion exportada '{exportada}' no existe")
+    exports = [_nombre(str(exportada)) + b"\x00" + _uleb(indices_funciones[exportada])]
+
+    cuerpos = [_codificar_cuerpo(funcion, indices_funciones, indices_globales) for funcion in funciones]
+
+    return b"".join((
+        MAGIA, VERSION,
+        _seccion(SECCION_TIPOS, _vector(list(tipos))),
+        _seccion(SECCION_IMPORTS, _vector(imports)),
+        _seccion(SECCION_FUNCIONES, _vector(tipos_funciones)),
+        _seccion(SECCION_GLOBALES, _vector(seccion_globales)),
+        _seccion(SECCION_EXPORTS, _vector(exports)),
+        _seccion(SECCION_CODIGO, _vector([_uleb(len(cuerpo)) + cuerpo for cuerpo in cuerpos])),
+    ))
+
+
+def _codificar_cuerpo(funcion: FuncionWasm, indices_funciones: Dict[Hashable, int],
+                      indices_globales: Dict[Hashable, int]) -> bytes:
+    indices_locales = {nombre: i for i, (nombre, _) in enumerate(funcion.parametros)}
+    # Las locales consecutivas del mismo tipo se declaran juntas: (cantidad, tipo)
+    grupos: List[List] = []
+    for nombre, tipo in funcion.locales:
+        indices_locales[nombre] = len(indices_locales)
+        if grupos and grupos[-1][1] == tipo:
+            grupos[-1][0] += 1
+        else:
+            grupos.append([1, tipo])
+    salida = bytearray(_vector([_uleb(cantidad) + bytes((TIPOS[tipo],)) for cantidad, tipo in grupos]))
+
+    etiquetas: List[Any] = []  # etiquetas de los bloques abiertos (None en un if), el mas interno al final
+    indices = {CALL: indices_funciones, LOCAL_GET: indices_locales, LOCAL_SET: indices_locales,
+               LOCAL_TEE: indices_locales, GLOBAL_GET: indices_globales, GLOBAL_SET: indices_globales}
+    for instruccion, inmediato in funcion.codigo:
+        simple = SIMPLES.get(instruccion)
+        if simple is not None:
+            salida.append(simple[0])
+        elif instruccion in _CON_INDICE:
+            codigo = _CON_INDICE[instruccion]
+            indice = indices[codigo].get(inmediato)
+            if indice is None:
+                raise ErrorCodificacion(f"{funcion.nombre}: '{inmediato}' no esta definido ({instruccion})")
+            salida.append(codigo)
+            salida += _uleb(indice)
+        elif instruccion == "i32.const":
+            valor = int(inmediato)
+            salida.append(I32_CONST)
+            salida += _sleb(valor - (1 << 32) if valor >= 1 << 31 else valor)
+        elif instruccion == "f64.const":
+            salida.append(F64_CONST)
+            salida += struct.pack("<d", float(inmediato))
+        elif instruccion in _BLOQUES:
+            etiquetas.append(inmediato)
+            salida += bytes((_BLOQUES[instruccion], BLOQUE_VACIO))
+        elif instruccion == "end":
+            if not etiquetas:
+                raise ErrorCodificacion(f"{funcion.nombre}: 'end' sin bloque abierto")
+            etiquetas.pop()
+            salida.append(FIN)
+        elif instruccion == "br_if":
+            # La profundidad es la distancia al bloque con esa etiqueta, contando desde el mas interno
+            for profundidad, etiqueta in enumerate(reversed(etiquetas)):
+                if etiqueta is not None and etiqueta == inmediato:
+                    break
+            else:
+                raise ErrorCodificacion(f"{funcion.nombre}: etiqueta '{inmediato}' no encontrada")
+            salida.append(BR_IF)
+            salida += _uleb(profundidad)
+        elif instruccion in _SIN_INMEDIATO:
+            salida.append(_SIN_INMEDIATO[instruccion])
+        else:
+            raise ErrorCodificacion(f"{funcion.nombre}: instruccion desconocida '{instruccion}'")
+    if etiquetas:
+        raise ErrorCodificacion(f"{funcion.nombre}: quedaron {len(etiquetas)} bloques sin cerrar")
+    salida.append(FIN)
+    return bytes(salida)
+
+
+class _Lector:
+    def __init__(self, datos: bytes, inicio: int = 0, fin: Optional[int] = None):
+        self.datos = datos
+        self.pos = inicio
+        self.fin = len(datos) if fin is None else fin
+
+    def byte(self) -> int:
+        if self.pos >= self.fin:
+            raise ErrorCodificacion(f"fin inesperado en el byte {self.pos}")
+        self.pos += 1
+        return self.datos[self.pos - 1]
+
+    def bytes(self, n: int) -> bytes:
+        if self.pos + n > self.fin:
+            raise ErrorCodificacion(f"fin inesperado en el byte {self.pos}")
+        self.pos += n
+        return self.datos[self.pos - n:self.pos]
+
+    def uleb(self) -> int:
+        resultado = desplazamiento = 0
+        while True:
+            byte = self.byte()
+            resultado |= (byte & 0x7F) << desplazamiento
+            desplazamiento += 7
+            if not byte & 0x80:
+                return resultado
+            if desplazamiento > 35:
+                raise ErrorCodificacion(f"LEB128 demasiado largo en el byte {self.pos}")
+
+    def sleb(self) -> int:
+        resultado = desplazamiento = 0
+        while True:
+            byte = self.byte()
+            resultado |= (byte & 0x7F) << desplazamiento
+            desplazamiento += 7
+            if not byte & 0x80:
+                if byte & 0x40:
+                    resultado -= 1 << desplazamiento
+                return resultado
+            if desplazamiento > 35:
+                raise ErrorCodificacion(f"LEB128 demasiado largo en el byte {self.pos}")
+
+    def tipo(self) -> str:
+        codigo = self.byte()
+        if codigo not in NOMBRES_TIPOS:
+            raise ErrorCodificacion(f"tipo de valor desconocido 0x{codigo:02x}")
+        return NOMBRES_TIPOS[codigo]
+
+    def nombre(self) -> str:
+        inicio = self.pos
+        try:
+            return self.bytes(self.uleb()).decode("utf-8")
+        except UnicodeDecodeError:
+            raise ErrorCodificacion(f"nombre que no es UTF-8 valido en el byte {inicio}") from None
+
+
+def verificar_binario(datos: bytes) -> List[str]:
+    '''
+        Controla la estructura de un .wasm con las secciones y las instrucciones que usa el
+        generador. Devuelve la lista de errores (vacia si el modulo esta bien).
+    '''
+    try:
+        _verificar(datos)
+    except ErrorCodificacion as e:
+        return [str(e)]
+    return []
+
+
+def _verificar(datos: bytes):
+    lector = _Lector(datos)
+    if lector.bytes(4) != MAGIA or lector.bytes(4) != VERSION:
+        raise ErrorCodificacion("no empieza con la magia y la version de WebAssembly")
+
+    tipos: List[Tuple[List[str], List[str]]] = []
+    funciones: List[int] = []  # indice de tipo de cada funcion, importadas primero
+    importadas = 0
+    globales: List[str] = []
+    cuerpos = None
+    anterior = 0
+    while lector.pos < lector.fin:
+        seccion = lector.byte()
+        tamanio = lector.uleb()
+        if lector.pos + tamanio > lector.fin:
+            raise ErrorCodificacion(f"la seccion {seccion} se pasa del final del archivo")
+        contenido = _Lector(datos, lector.pos, lector.pos + tamanio)
+        lector.pos += tamanio
+        if seccion == 0:
+            continue
+        if seccion <= anterior:
+            raise ErrorCodificacion(f"seccion {seccion} fuera de orden o repetida")
+        anterior = seccion
+
+        if seccion == SECCION_TIPOS:
+            for _ in range(contenido.uleb()):
+                if contenido.byte() != 0x60:
+                    raise ErrorCodificacion("tipo de funcion sin 0x60")
+                parametros = [contenido.tipo() for _ in range(contenido.uleb())]
+                resultados = [contenido.tipo() for _ in range(contenido.uleb())]
+                tipos.append((parametros, resultados))
+        elif seccion == SECCION_IMPORTS:
+            for _ in range(contenido.uleb()):
+                contenido.nombre()  # modulo
+                contenido.nombre()  # campo
+                if contenido.byte() != 0x00:
+                    raise ErrorCodificacion("solo se esperan funciones importadas")
+                funciones.append(_indice(contenido.uleb(), len(tipos), "tipo"))
+                importadas += 1
+        elif seccion == SECCION_FUNCIONES:
+            for _ in range(contenido.uleb()):
+                funciones.append(_indice(contenido.uleb(), len(tipos), "tipo"))
+        elif seccion == SECCION_GLOBALES:
+            for _ in range(contenido.uleb()):
+                tipo = contenido.tipo()
+                if contenido.byte() not in (0, 1):
+                    raise ErrorCodificacion("global con mutabilidad invalida")
+                esperado = I32_CONST if tipo == "i32" else F64_CONST
+                if contenido.byte() != esperado:
+                    raise ErrorCodificacion("el valor inicial de una global no es una constante de su tipo")
+                if tipo == "i32":
+                    contenido.sleb()
+                else:
+                    contenido.bytes(8)
+                if contenido.byte() != FIN:
+                    raise ErrorCodificacion("valor inicial de una global sin end")
+                globales.append(tipo)
+        elif seccion == SECCION_EXPORTS:
+            for _ in range(contenido.uleb()):
+                contenido.nombre()
+                if contenido.byte() != 0x00:
+                    raise ErrorCodificacion("solo se esperan funciones exportadas")
+                _indice(contenido.uleb(), len(funciones), "funcion")
+        elif seccion == SECCION_CODIGO:
+            cuerpos = contenido.uleb()
+            if cuerpos != len(funciones) - importadas:
+                raise ErrorCodificacion(f"{cuerpos} cuerpos para {len(funciones) - importadas} funciones")
+            for i in range(cuerpos):
+                tamanio_cuerpo = contenido.uleb()
+                cuerpo = _Lector(datos, contenido.pos, contenido.pos + tamanio_cuerpo)
+                if cuerpo.fin > contenido.fin:
+                    raise ErrorCodificacion(f"el cuerpo {i} se pasa del final de la seccion")
+                contenido.pos = cuerpo.fin
+                _verificar_cuerpo(cuerpo, tipos[funciones[importadas + i]], tipos, funciones, globales,
+                                  importadas + i)
+        else:
+            raise ErrorCodificacion(f"seccion inesperada {seccion}")
+        if contenido.pos != contenido.fin:
+            raise ErrorCodificacion(f"la seccion {seccion} tiene bytes de mas")
+
+    if cuerpos is None and len(funciones) > importadas:
+        raise ErrorCodificacion("falta la seccion de codigo")
+
+
+def _indice(indice: int, cantidad: int, que: str) -> int:
+    if indice >= cantidad:
+        raise ErrorCodificacion(f"indice de {que} {indice} fuera de rango ({cantidad})")
+    return indice
+
+
+def _verificar_cuerpo(cuerpo: _Lector, firma, tipos, funciones, globales, numero: int):
+    parametros, resultados = firma
+    locales = list(parametros)
+    for _ in range(cuerpo.uleb()):
+        cantidad = cuerpo.uleb()
+        if len(locales) + cantidad > MAX_LOCALES + len(parametros):
+            raise ErrorCodificacion(f"funcion {numero}: mas de {MAX_LOCALES} locales (probar con --reusar-locales)")
+        locales += [cuerpo.tipo()] * cantidad
+
+    # Cada bloque abierto: (altura de la pila al abrirlo, inalcanzable, es if sin else)
+    pila: List[str] = []
+    bloques = [[0, False, False]]
+    donde = f"funcion {numero}"
+
+    def sacar(esperado: Optional[str]):
+        altura, inalcanzable, _ = bloques[-1]
+        if len(pila) <= altura:
+            if inalcanzable:
+                return
+            raise ErrorCodificacion(f"{donde}: pila vacia (se esperaba {esperado or 'un valor'})")
+        valor = pila.pop()
+        if esperado and valor != esperado:
+            raise ErrorCodificacion(f"{donde}: se esperaba {esperado} y hay {valor}")
+
+    def cerrar_tramo(que: str):
+        altura, inalcanzable, _ = bloques[-1]
+        if len(pila) != altura and not inalcanzable:
+            raise ErrorCodificacion(f"{donde}: quedan {len(pila) - altura} valores en la pila al llegar a {que}")
+        del pila[altura:]
+
+    while True:
+        codigo = cuerpo.byte()
+        simple = SIMPLES_POR_CODIGO.get(codigo)
+        if simple is not None:
+            for tipo in reversed(simple[1]):
+                sacar(tipo)
+            pila.append(simple[2])
+        elif codigo in (LOCAL_GET, LOCAL_SET, LOCAL_TEE):
+            tipo = locales[_indice(cuerpo.uleb(), len(locales), "local")]
+            if codigo != LOCAL_GET:
+                sacar(tipo)
+            if codigo != LOCAL_SET:
+                pila.append(tipo)
+        elif codigo in (GLOBAL_GET, GLOBAL_SET):
+            tipo = globales[_indice(cuerpo.uleb(), len(globales), "global")]
+            if codigo == GLOBAL_GET:
+                pila.append(tipo)
+            else:
+                sacar(tipo)
+        elif codigo == CALL:
+            llamados, devueltos = tipos[funciones[_indice(cuerpo.uleb(), len(funciones), "funcion")]]
+            for tipo in reversed(llamados):
+                sacar(tipo)
+            pila.extend(devueltos)
+        elif codigo == I32_CONST:
+            cuerpo.sleb()
+            pila.append("i32")
+        elif codigo == F64_CONST:
+            cuerpo.bytes(8)
+            pila.append("f64")
+        elif codigo in (BLOCK, LOOP, IF):
+            if cuerpo.byte() != BLOQUE_VACIO:
+                raise ErrorCodificacion(f"{donde}: solo se esperan bloques sin resultado")
+            if codigo == IF:
+                sacar("i32")
+            bloques.append([len(pila), False, codigo == IF])
+        elif codigo == ELSE:
+            if len(bloques) == 1 or not bloques[-1][2]:
+                raise ErrorCodificacion(f"{donde}: else fuera de un if")
+            cerrar_tramo("else")
+            bloques[-1][1:] = [False, False]
+        elif codigo == BR_IF:
+            # La etiqueta mas externa (len(bloques) - 1) es la de la funcion: lleva sus resultados
+            profundidad = _indice(cuerpo.uleb(), len(bloques), "etiqueta")
+            sacar("i32")
+            if profundidad == len(bloques) - 1:
+                for tipo in reversed(resultados):
+                    sacar(tipo)
+                pila.extend(resultados)
+        elif codigo == RETURN:
+            for tipo in reversed(resultados):
+                sacar(tipo)
+            del pila[bloques[-1][0]:]
+            bloques[-1][1] = True
+        elif codigo == DROP:
+            sacar(None)
+        elif codigo == FIN:
+            if len(bloques) == 1:
+                altura, inalcanzable, _ = bloques[0]
+                if not inalcanzable and pila != resultados:
+                    raise ErrorCodificacion(f"{donde}: la funcion termina con {pila} en la pila, se esperaba {resultados}")
+                break
+            cerrar_tramo("end")
+            bloques.pop()
+        else:
+            raise ErrorCodificacion(f"{donde}: instruccion desconocida 0x{codigo:02x}")
+    if cuerpo.pos != cuerpo.fin:
+        raise ErrorCodificacion(f"{donde}: bytes despues del end final")
@@ -0,0 +1,85 @@
+"""
+Flujo de tokens compacto (struct-of-arrays): en lugar de un objeto Token por
+token, arreglos paralelos de tipo, inicio, largo, linea y valor.
+
+    tipo[i]    codigo del tipo (indice en `tipos`), 1 byte
+    inicio[i]  posicion del token en el fuente (tok.index)
+    largo[i]   tok.end - tok.index
+    linea[i]   tok.lineno
+    valor[i]   indice en `valores`: cada valor distinto (ID, palabra, constante)
+               se guarda una sola vez
+
+Se arma con FlujoTokens.desde_tokens(lexer.tokenize(texto)) a partir de
+cualquiera de los dos lexers. El parser generado lo consume directamente con
+parse_flujo(): el lookahead es una posicion en los arreglos y en la pila del
+parser queda esa posicion, sin armar un Token por token desplazado. Con el de
+sly, parse_flujo() lo recorre como iterador de Token.
+"""
+from array import array
+
+from LexerManual import Token
+
+
+class FlujoTokens:
+    def __init__(self):
+        self.tipo = array('B')
+        self.inicio = array('Q')
+        self.largo = array('I')
+        self.linea = array('I')
+        self.valor = array('I')
+        self.tipos = []
+        self.valores = []
+        self._codigo_tipo = {}
+        self._codigo_valor = {}
+
+    @classmethod
+    def desde_tokens(cls, tokens):
+        flujo = cls()
+        flujo.extender(tokens)
+        return flujo
+
+    def extender(self, tokens):
+        codigo_tipo = self._codigo_tipo
+        codigo_valor = self._codigo_valor
+        tipos = self.tipos
+        valores = self.valores
+        agregar_tipo = self.tipo.append
+        agregar_inicio = self.inicio.append
+        agregar_largo = self.largo.append
+        agregar_linea = self.linea.append
+        agregar_valor = self.valor.append
+        for tok in tokens:
+            t = codigo_tipo.get(tok.type)
+            if t is None:
+                t = codigo_tipo[tok.type] = len(tipos)
+                tipos.append(tok.type)
+            # La clave lleva el tipo de Python para no mezclar 1 con '1'
+            clave = (tok.value.__class__, tok.value)
+            v = codigo_valor.get(clave)
+            if v is None:
+                v = codigo_valor[clave] = len(valores)
+                valores.append(tok.value)
+            agregar_tipo(t)
+            agregar_inicio(tok.index)
+            agregar_largo(tok.end - tok.index)
+            agregar_linea(tok.lineno)
+            agregar_valor(v)
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def token(self, i):
+        tok = Token()
+        tok.type = self.tipos[self.tipo[i]]
+        tok.value = self.valores[self.valor[i]]
+        tok.lineno = self.linea[i]
+        tok.index = self.inicio[i]
+        tok.end = tok.index + self.largo[i]
+        return tok
+
+    def __iter__(self):
+        return map(self.token, range(len(self)))
+
+    def memoria(self):
+        # Bytes de los arreglos (sin la tabla de valores)
+        return sum(a.itemsize * len(a) for a in (self.tipo, self.inicio, self.largo, self.linea, self.valor))
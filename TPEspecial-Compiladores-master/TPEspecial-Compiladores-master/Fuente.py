@@ -0,0 +1,41 @@
+"""
+Entrada del compilador: el archivo fuente como texto decodificado (lo que
+necesita el lexer de sly) o mapeado en memoria como bytes UTF-8, para el
+lexer manual, que decodifica solo los lexemas que guarda como texto.
+
+El mapeo es de solo lectura: no se hace una copia del archivo y varios
+procesos que compilan el mismo fuente comparten las paginas del page cache.
+
+    with ArchivoFuente(ruta, en_bytes=True) as fuente:
+        tokens = lexer.tokenize(fuente.contenido)
+"""
+import mmap
+import os
+
+
+class ArchivoFuente:
+    def __init__(self, ruta, en_bytes=False):
+        # open() lanza FileNotFoundError aca, antes de entrar al with
+        self._archivo = open(ruta, 'rb' if en_bytes else 'r', encoding=None if en_bytes else 'utf-8')
+        self._mapa = None
+        if not en_bytes:
+            self.contenido = self._archivo.read()
+        elif os.fstat(self._archivo.fileno()).st_size == 0:
+            # Un archivo vacio no se puede mapear
+            self.contenido = b''
+        else:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            self.contenido = self._mapa
+
+    def cerrar(self):
+        self.contenido = None
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
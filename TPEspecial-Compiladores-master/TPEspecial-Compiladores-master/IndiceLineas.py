@@ -0,0 +1,43 @@
+"""
+Indice de inicios de linea de un fuente, para pasar una posicion (el `index`
+de un token, de una produccion o de un nodo del AST) a (linea, columna).
+
+Los lexers no llevan la columna de cada token: solo guardan la posicion. El
+indice se arma una sola vez, la primera vez que se pide una columna (en una
+compilacion sin errores nunca se arma), y cada consulta es un bisect.
+
+Acepta str o bytes UTF-8 (el mmap de Fuente.ArchivoFuente); en bytes las
+posiciones son en bytes y la columna se cuenta en caracteres.
+"""
+from array import array
+from bisect import bisect_right
+
+
+class IndiceLineas:
+    def __init__(self, texto):
+        self.texto = texto
+        self._inicios = None
+
+    def _construir(self):
+        texto = self.texto
+        salto = '\n' if isinstance(texto, str) else b'\n'
+        inicios = array('Q', [0])
+        buscar = texto.find
+        i = buscar(salto)
+        while i >= 0:
+            inicios.append(i + 1)
+            i = buscar(salto, i + 1)
+        self._inicios = inicios
+
+    def posicion(self, index):
+        # (linea, columna) de la posicion `index`, ambas contadas desde 1
+        if self._inicios is None:
+            self._construir()
+        linea = bisect_right(self._inicios, index)
+        inicio = self._inicios[linea - 1]
+        if isinstance(self.texto, str):
+            return linea, index - inicio + 1
+        return linea, len(self.texto[inicio:index].decode('utf-8', 'replace')) + 1
+
+    def columna(self, index):
+        return self.posicion(index)[1]
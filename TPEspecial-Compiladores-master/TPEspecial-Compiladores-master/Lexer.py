@@ -1,5 +1,8 @@
 from sly import Lexer
+from Nombres import internar
 from TablaDeSimbolos import TablaDeSimbolos
+from IndiceLineas import IndiceLineas
+from Trazas import TRAZA, LEXICO, AVISO, ERROR
 
 class AnalisisLexico(Lexer):
     #Definición de tokens
@@ -11,16 +14,19 @@ class AnalisisLexico(Lexer):
         self.errores = []
         self.tabla_simbolos = TablaDeSimbolos()
 
+    #Las columnas de los errores salen de un indice de lineas que solo se arma si hay errores
+    def tokenize(self, text, lineno=1, index=0):
+        self.indice = IndiceLineas(text)
+        return super().tokenize(text, lineno, index)
+
     #expresiones regulares para tokens
-    ignore_comentario = r'##(.|\n)*?##'     #La parte `(.|\n)*?` busca cualquier caracter
+    ignore_comentario = r'##'     #Solo la apertura: el cierre se busca en ignore_comentario()
     ignore_newline = r'\n+'
     UINT_CONST = r'\d+UI'
     #error_dfloat = r'(\d+\.\d*|\.\d+)D(\d+|[+\-]\b)|\d+D[+\-]\d+'
     DFLOAT_CONST = r'(\d+\.\d*|\.\d+)(D[+\-]\d+)?'  #negativos se ve en el parser
-    CADENA = r'"[^"\n]*"'
+    CADENA = r'"[^"\n]*"?'     #Sin la comilla de cierre es una cadena no terminada
     error_numero = r'\d+(\.\d*)?(D[+\-]\d+)?'
-    error_cadena = r'"([^"\n]|\\")*'
-    error_comentario = r'##(.|\n)*'
 
     #Identificadores y palabras reservadas
     ID = r'[A-Z][A-Z0-9%]*'
@@ -48,13 +54,25 @@ class AnalisisLexico(Lexer):
     
     #Manejo de errores en constantes de punto flotante
     def error_dfloat(self, t):
-        print(f"Línea {self.lineno}: Error: Formato inválido para número de punto flotante '{t.value}'")
+        if TRAZA.lexico:
+            TRAZA.emitir(LEXICO, ERROR, self.lineno, f"Línea {self.lineno}: Error: Formato inválido para número de punto flotante '{t.value}'")
         self.index += len(t.value)
     
 
     #Inciso 33: Ignoramos comentarios entre ## ... ##
+    #El cierre se busca con str.find y los saltos de linea se cuentan sobre el mismo
+    #tramo: tiempo lineal, sin la alternancia por caracter de `##(.|\n)*?##`.
     def ignore_comentario(self, t):
-        self.lineno += t.value.count('\n')
+        cierre = self.text.find('##', self.index)
+        if cierre < 0:
+            #Comentario no terminado: se consume el resto del archivo
+            resto = self.text[t.index:]
+            self.errores.append(f"(Línea {t.lineno}, Columna {self.indice.columna(t.index)}): Comentario no terminado '{resto}'")
+            self.lineno += resto.count('\n')
+            self.index = len(self.text)
+            return
+        self.lineno += self.text.count('\n', self.index, cierre)
+        self.index = cierre + 2
 
     #Contamos saltos de línea para reportar errores correctamente
     def ignore_newline(self, t):
@@ -66,10 +84,12 @@ class AnalisisLexico(Lexer):
         val = int(t.value[:-2])
         # Verificamos rango
         if not (0 <= val <= 65535):
-            print(f"Línea {self.lineno}: Warning: Constante '{t.value}' fuera de rango (0-65535).")
+            if TRAZA.lexico:
+                TRAZA.emitir(LEXICO, AVISO, self.lineno, f"Línea {self.lineno}: Warning: Constante '{t.value}' fuera de rango (0-65535).")
             # Truncamos el valor al rango permitido
             val = max(0, min(val, 65535))
-            print(f"Línea {self.lineno}: Warning: Constante '{t.value}' truncada a '{val}UI'.")
+            if TRAZA.lexico:
+                TRAZA.emitir(LEXICO, AVISO, self.lineno, f"Línea {self.lineno}: Warning: Constante '{t.value}' truncada a '{val}UI'.")
         t.value = val
         self.tabla_simbolos.agregar(str(t.value), 'UINT_CONST', valor=val, linea=self.lineno)
         return t
@@ -86,7 +106,8 @@ class AnalisisLexico(Lexer):
         es_cero = (valor_numerico == 0.0)
         en_rango_positivo = (self.POS_MIN < valor_numerico < self.POS_MAX)
         if not (es_cero or en_rango_positivo ):
-            print(f"Línea {self.lineno}: Error: Constante de punto flotante '{t.value}' fuera de rango.")
+            if TRAZA.lexico:
+                TRAZA.emitir(LEXICO, ERROR, self.lineno, f"Línea {self.lineno}: Error: Constante de punto flotante '{t.value}' fuera de rango.")
             return 
 
         self.tabla_simbolos.agregar(lexema_original, 'DFLOAT_CONST', valor=t.value, linea=self.lineno)
@@ -96,10 +117,13 @@ class AnalisisLexico(Lexer):
     
     def ID(self, t):
         if len(t.value) > 20:
-            print(f"Línea {self.lineno}: Warning: Identificador '{t.value}' truncado a 20 caracteres.")
+            if TRAZA.lexico:
+                TRAZA.emitir(LEXICO, AVISO, self.lineno, f"Línea {self.lineno}: Warning: Identificador '{t.value}' truncado a 20 caracteres.")
             t.value = t.value[:20]
         #Agregamos a la tabla de símbolos si este no ha sido agregado antes.
         if t.type == 'ID':
+            # Un solo Nombre (entero internado) por identificador: lo comparten los tokens, los nodos y la tabla
+            t.value = internar(t.value)
             if t.value not in self.tabla_simbolos.simbolos:
                 self.tabla_simbolos.agregar(t.value, 'Identificador', linea=self.lineno)
         #El token se retorna, sin importar qué tipo sea.
@@ -107,6 +131,10 @@ class AnalisisLexico(Lexer):
 
     #Inciso 7: Cadena de una linea entre comillas dobles
     def CADENA(self, t):
+        #Manejo de errores en cadenas entre comillas (en la misma pasada)
+        if len(t.value) < 2 or t.value[-1] != '"':
+            self.errores.append(f"(Línea {t.lineno}, Columna {self.indice.columna(t.index)}): Cadena no terminada '{t.value}'")
+            return
         lexema_original = t.value
         t.value = t.value[1:-1] # Quitamos las comillas
         # Agregamos la cadena a la tabla
@@ -115,20 +143,10 @@ class AnalisisLexico(Lexer):
  
     #Manejo de errores en numeros
     def error_numero(self, t):
-        self.errores.append(f"(Línea {t.lineno}): Formato inválido para número '{t.value}'")
+        self.errores.append(f"(Línea {t.lineno}, Columna {self.indice.columna(t.index)}): Formato inválido para número '{t.value}'")
              
-    #Manejo de errores en cadenas entre comillas
-    def error_cadena(self, t):
-        self.errores.append(f"(Línea {t.lineno}): Cadena no terminada '{t.value}'")
-
-    #Manejo de errores en comentarios
-    def error_comentario(self, t):
-        self.errores.append(f"(Línea {t.lineno}): Comentario no terminado '{t.value}'")
-        self.lineno += t.value.count('\n')
-        self.index += len(t.value)
-    
     #Manejo de errores
     def error(self, t):
         # Requisito: Reportar línea y descripción del error [cite: 44]
-        self.errores.append(f"(Línea {t.lineno}): Carácter ilegal '{t.value[0]}'")
+        self.errores.append(f"(Línea {t.lineno}, Columna {self.indice.columna(t.index)}): Carácter ilegal '{t.value[0]}'")
         self.index += 1
\ No newline at end of file
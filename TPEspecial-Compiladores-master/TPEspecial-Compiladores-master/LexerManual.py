@@ -0,0 +1,234 @@
+"""
+Lexer escrito a mano, alternativo a AnalisisLexico (Lexer.py), sin sly.
+
+Produce los mismos tokens (tipo, valor, lineno, index, end), la misma lista
+`errores` y los mismos efectos sobre la TablaDeSimbolos. Escanea con un unico
+patron maestro de pocas alternativas; las palabras reservadas se reconocen
+buscando la palabra en minusculas en una tabla, en lugar de probar una regex
+por palabra clave. Los comentarios se cierran con str.find.
+
+`tokenize` acepta tambien un buffer de bytes UTF-8 (bytes o el mmap de
+Fuente.ArchivoFuente(ruta, en_bytes=True)): se escanea con la version en bytes del mismo
+patron y solo se decodifican los lexemas que se guardan como texto (IDs,
+cadenas, constantes de punto flotante, mensajes de error). En ese modo
+`index`/`end` son posiciones en bytes, y los digitos no ASCII son caracteres
+ilegales (en `str`, `\\d` los acepta). Como el archivo no pasa por la
+traduccion de saltos de linea de open(), un '\\r' se toma como blanco: los
+fuentes con CRLF dan los mismos tokens y lineas que con el lexer de sly.
+"""
+import re
+
+from IndiceLineas import IndiceLineas
+from Nombres import internar
+from TablaDeSimbolos import TablaDeSimbolos
+from Trazas import TRAZA, LEXICO, AVISO, ERROR
+
+
+class Token:
+    __slots__ = ('type', 'value', 'lineno', 'index', 'end')
+
+    def __repr__(self):
+        return f'Token(type={self.type!r}, value={self.value!r}, lineno={self.lineno}, index={self.index}, end={self.end})'
+
+
+# Palabras reservadas, en el mismo orden que las reglas de Lexer.py: si la
+# palabra no esta en la tabla, gana la primera que sea prefijo (como en la regex).
+PALABRAS_RESERVADAS = {
+    'uint': 'UINT', 'do': 'DO', 'while': 'WHILE', 'if': 'IF', 'else': 'ELSE',
+    'endif': 'ENDIF', 'print': 'PRINT', 'return': 'RETURN', 'cv': 'CV', 'trunc': 'TRUNC',
+}
+
+OPERADORES = {
+    ':=': 'ASSIGN_PASCAL', '==': 'EQ', '=!': 'NEQ', '->': 'ARROW', '<=': 'LTE', '>=': 'GTE',
+    '=': 'ASSIGN', '<': 'LT', '>': 'GT', '-': 'MINUS',
+}
+
+# Los blancos previos se consumen en el mismo match (el token empieza en
+# fin - len(valor)); los saltos de linea junto con la indentacion que sigue.
+# '\r' es un blanco (CRLF); las lineas se cuentan por '\n'.
+# Las alternativas que comparten primer caracter estan en el mismo orden que en Lexer.py.
+_FUENTE_PATRON = r'''
+    [ \t\r]*
+    (?:
+        (?P<ID>[A-Z][A-Z0-9%]*)
+      | (?P<LITERAL>[+*/(){}_,;])
+      | (?P<NL>\r?\n[\r\n \t]*)
+      | (?P<PALABRA>[a-z]+)
+      | (?P<OP>:=|==|=!|->|<=|>=|[=<>\-])
+      | (?P<UINT_CONST>\d+UI)
+      | (?P<DFLOAT_CONST>(?:\d+\.\d*|\.\d+)(?:D[+\-]\d+)?)
+      | (?P<NUMERO>\d+(?:\.\d*)?(?:D[+\-]\d+)?)
+      | (?P<CADENA>"[^"\r\n]*"?)
+      | (?P<COMENTARIO>\#\#)
+      | (?P<PUNTO>\.)
+    )
+'''
+
+
+class _Modo:
+    # Patron y tablas para escanear str o bytes. Las tablas van del lexema
+    # (str o bytes) al tipo y al valor del token, que siempre es str.
+    def __init__(self, a_lexema):
+        self.patron = re.compile(a_lexema(_FUENTE_PATRON), re.VERBOSE)
+        self.blancos = re.compile(a_lexema('[ \t\r]*'))
+        self.palabras = {a_lexema(p): (tipo, p) for p, tipo in PALABRAS_RESERVADAS.items()}
+        self.operadores = {a_lexema(o): (tipo, o) for o, tipo in OPERADORES.items()}
+        self.literales = {a_lexema(c): c for c in '+*/(){}_,;.'}
+        self.salto = a_lexema('\n')
+        self.comentario = a_lexema('##')
+        self.comilla = a_lexema('"')
+
+
+_MODO_STR = _Modo(str)
+_MODO_BYTES = _Modo(str.encode)
+
+
+def _caracter(text, index):
+    # Caracter en text[index] y cuantas posiciones ocupa (1 en str, 1 a 4 bytes en UTF-8)
+    if isinstance(text, str):
+        return text[index], 1
+    primero = text[index]
+    largo = 1 if primero < 0xC0 or primero >= 0xF8 else 2 if primero < 0xE0 else 3 if primero < 0xF0 else 4
+    return text[index:index + largo].decode('utf-8', 'replace'), largo
+
+
+class AnalisisLexicoManual:
+    tokens = {'ID', 'MINUS', 'ASSIGN', 'ASSIGN_PASCAL', 'EQ', 'NEQ', 'ARROW', 'LTE', 'GTE', 'GT', 'LT',
+              'UINT', 'DO', 'WHILE', 'IF', 'ELSE', 'ENDIF', 'PRINT', 'RETURN', 'CADENA',
+              'UINT_CONST', 'DFLOAT_CONST', 'CV', 'TRUNC'}
+    ignore = ' \t'
+    literals = {'+', '*', '/', '(', ')', '{', '}', '_', ',', ';', '.'}
+    entrada_bytes = True  # main.py le pasa el archivo mapeado en memoria
+
+    POS_MIN = 2.2250738585072014e-308
+    POS_MAX = 1.7976931348623157e+308
+
+    def __init__(self):
+        self.errores = []
+        self.tabla_simbolos = TablaDeSimbolos()
+
+    def tokenize(self, text, lineno=1, index=0):
+        self.text = text
+        self.indice = IndiceLineas(text)
+        en_bytes = not isinstance(text, str)
+        modo = _MODO_BYTES if en_bytes else _MODO_STR
+        match = modo.patron.match
+        palabras = modo.palabras
+        operadores = modo.operadores
+        literales = modo.literales
+        salto = modo.salto
+        tabla = self.tabla_simbolos
+        errores = self.errores
+        n = len(text)
+        try:
+            while index < n:
+                m = match(text, index)
+                if m is None:
+                    index = modo.blancos.match(text, index).end()
+                    if index < n:
+                        caracter, largo = _caracter(text, index)
+                        errores.append(f"(Línea {lineno}, Columna {self.indice.columna(index)}): Carácter ilegal '{caracter}'")
+                        index += largo
+                    continue
+
+                tipo = m.lastgroup
+                fin = m.end()
+                valor = m.group(tipo)
+                index = fin - len(valor)
+                if tipo == 'NL':
+                    lineno += valor.count(salto)
+                    index = fin
+                    continue
+
+                if tipo == 'ID':
+                    if en_bytes:
+                        valor = valor.decode('ascii')
+                    if len(valor) > 20:
+                        if TRAZA.lexico:
+                            TRAZA.emitir(LEXICO, AVISO, lineno, f"Línea {lineno}: Warning: Identificador '{valor}' truncado a 20 caracteres.")
+                        valor = valor[:20]
+                    valor = internar(valor)  # un solo Nombre por identificador (tokens, nodos y tabla)
+                    if valor not in tabla.simbolos:
+                        tabla.agregar(valor, 'Identificador', linea=lineno)
+                elif tipo == 'LITERAL' or tipo == 'PUNTO':
+                    # PUNTO: '.' que no empieza un DFLOAT
+                    tipo = valor = literales[valor]
+                elif tipo == 'PALABRA':
+                    if valor in palabras:
+                        tipo, valor = palabras[valor]
+                    else:
+                        # Sin palabra exacta: la primera reservada que sea prefijo
+                        for palabra, (tipo, texto) in palabras.items():
+                            if valor.startswith(palabra):
+                                break
+                        else:
+                            errores.append(f"(Línea {lineno}, Columna {self.indice.columna(index)}): Carácter ilegal '{_caracter(text, index)[0]}'")
+                            index += 1
+                            continue
+                        valor = texto
+                        fin = index + len(palabra)
+                elif tipo == 'OP':
+                    tipo, valor = operadores[valor]
+                elif tipo == 'UINT_CONST':
+                    if en_bytes:
+                        valor = valor.decode('ascii')
+                    val = int(valor[:-2])
+                    if not (0 <= val <= 65535):
+                        if TRAZA.lexico:
+                            TRAZA.emitir(LEXICO, AVISO, lineno, f"Línea {lineno}: Warning: Constante '{valor}' fuera de rango (0-65535).")
+                        val = max(0, min(val, 65535))
+                        if TRAZA.lexico:
+                            TRAZA.emitir(LEXICO, AVISO, lineno, f"Línea {lineno}: Warning: Constante '{valor}' truncada a '{val}UI'.")
+                    valor = val
+                    tabla.agregar(str(val), 'UINT_CONST', valor=val, linea=lineno)
+                elif tipo == 'DFLOAT_CONST':
+                    if en_bytes:
+                        valor = valor.decode('ascii')
+                    numero = float(valor.replace('D', 'e'))
+                    if not (numero == 0.0 or self.POS_MIN < numero < self.POS_MAX):
+                        if TRAZA.lexico:
+                            TRAZA.emitir(LEXICO, ERROR, lineno, f"Línea {lineno}: Error: Constante de punto flotante '{valor}' fuera de rango.")
+                        index = fin
+                        continue
+                    tabla.agregar(valor, 'DFLOAT_CONST', valor=valor, linea=lineno)
+                elif tipo == 'CADENA':
+                    if en_bytes:
+                        valor = valor.decode('utf-8', 'replace')
+                    if len(valor) < 2 or valor[-1] != '"':
+                        errores.append(f"(Línea {lineno}, Columna {self.indice.columna(index)}): Cadena no terminada '{valor}'")
+                        index = fin
+                        continue
+                    valor = valor[1:-1]
+                elif tipo == 'COMENTARIO':
+                    cierre = text.find(modo.comentario, fin)
+                    if cierre < 0:
+                        resto = text[index:]
+                        lineno_inicio = lineno
+                        lineno += resto.count(salto)
+                        if en_bytes:
+                            resto = resto.decode('utf-8', 'replace').replace('\r\n', '\n')
+                        errores.append(f"(Línea {lineno_inicio}, Columna {self.indice.columna(index)}): Comentario no terminado '{resto}'")
+                        index = n
+                        continue
+                    fin = cierre + 2
+                    # mmap no tiene count(): se cuenta sobre el tramo del comentario
+                    lineno += text[index:fin].count(salto)
+                    index = fin
+                    continue
+                else:  # NUMERO
+                    if en_bytes:
+                        valor = valor.decode('ascii')
+                    errores.append(f"(Línea {lineno}, Columna {self.indice.columna(index)}): Formato inválido para número '{valor}'")
+                    index = fin
+                    continue
+
+                tok = Token()
+                tok.type = tipo
+                tok.value = valor
+                tok.lineno = lineno
+                tok.index = index
+                tok.end = index = fin
+                yield tok
+        finally:
+            self.index = index
+            self.lineno = lineno
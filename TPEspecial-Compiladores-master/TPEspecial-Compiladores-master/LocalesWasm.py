@@ -0,0 +1,112 @@
+"""
+Reuso de las locales auxiliares ($tN) de una funcion Wasm ya generada.
+
+El generador pide un $tN nuevo para cada valor intermedio y no reusa ninguno,
+asi que una funcion grande termina con miles de locales. Cada $tN vive desde
+que se escribe hasta su ultima lectura; dos $tN del mismo tipo que no estan
+vivos a la vez pueden ser la misma local. reusar_temporales calcula esos
+rangos sobre las instrucciones de la funcion ((instruccion, inmediato), ver
+BinarioWasm.py; un $tN es el inmediato entero N de local.get/set/tee) y asigna
+las locales con un barrido lineal.
+
+Un $tN que se escribe antes de un do-while y se lee adentro sigue vivo hasta
+el final del lazo (cada vuelta lo vuelve a leer). Un $tN que se lee antes de
+escribirse no se toca.
+"""
+import heapq
+from typing import Any, Dict, Hashable, List, Set, Tuple
+
+_ACCESOS = ("local.get", "local.set", "local.tee")
+
+
+def reusar_temporales(codigo: List[Tuple[str, Any]],
+                      locales: Set[Tuple[Hashable, str]]) -> Tuple[List[Tuple[str, Any]], Set[Tuple[Hashable, str]]]:
+    '''
+        Asigna los $tN de codigo (las instrucciones de una funcion) a la menor cantidad de locales
+        por tipo. locales son las declaraciones (nombre, tipo wasm); los $tN son las de nombre
+        entero. Devuelve el codigo con los nombres cambiados y las declaraciones que quedan;
+        codigo y locales no se modifican. Cada local conserva el nombre del primer $tN que la ocupa.
+    '''
+    tipos: Dict[int, str] = {}
+    for nombre, tipo in locales:
+        if isinstance(nombre, int):
+            tipos[nombre] = tipo
+    if not tipos:
+        return codigo, locales
+
+    inicio: Dict[int, int] = {}
+    fin: Dict[int, int] = {}
+    lazo_del_fin: Dict[int, int] = {}
+    leidos_antes: Set[int] = set()
+    accesos: List[Tuple[int, int]] = []
+    lazos: List[List[int]] = []  # [instruccion del loop, de su end, lazo padre]
+    abiertos: List[int] = []     # bloques abiertos: el lazo, o -1 para un block o un if
+
+    for i, (instruccion, nombre) in enumerate(codigo):
+        if instruccion in _ACCESOS:
+            if nombre not in tipos:
+                continue
+            if nombre not in inicio:
+                inicio[nombre] = i
+                if instruccion == "local.get":
+                    leidos_antes.add(nombre)
+            fin[nombre] = i
+            lazo_del_fin[nombre] = _lazo_actual(abiertos)
+            accesos.append((i, nombre))
+        elif instruccion == "loop":
+            lazos.append([i, len(codigo), _lazo_actual(abiertos)])
+            abiertos.append(len(lazos) - 1)
+        elif instruccion == "block" or instruccion == "if":
+            abiertos.append(-1)
+        elif instruccion == "end" and abiertos:
+            lazo = abiertos.pop()
+            if lazo >= 0:
+                lazos[lazo][1] = i
+
+    # Un $tN que se usa en un lazo que empezo despues de escribirlo vive hasta el final del
+    # lazo mas externo de esos
+    for nombre, lazo in lazo_del_fin.items():
+        ultimo = -1
+        while lazo >= 0 and lazos[lazo][0] > inicio[nombre]:
+            ultimo = lazo
+            lazo = lazos[lazo][2]
+        if ultimo >= 0:
+            fin[nombre] = max(fin[nombre], lazos[ultimo][1])
+
+    # Barrido lineal: al empezar cada rango se liberan las locales de los que ya terminaron
+    renombres: Dict[int, int] = {}
+    ocupadas: List[Tuple[int, int, int]] = []   # (fin, orden, local)
+    libres: Dict[str, List[Tuple[int, int]]] = {}  # por tipo: (orden, local)
+    orden_de: Dict[int, int] = {}
+    for nombre in sorted(inicio, key=inicio.get):
+        if nombre in leidos_antes:
+            continue
+        while ocupadas and ocupadas[0][0] < inicio[nombre]:
+            _, orden, local = heapq.heappop(ocupadas)
+            heapq.heappush(libres.setdefault(tipos[local], []), (orden, local))
+        disponibles = libres.get(tipos[nombre])
+        if disponibles:
+            orden, local = heapq.heappop(disponibles)
+            renombres[nombre] = local
+        else:
+            orden = orden_de[nombre] = len(orden_de)
+            local = nombre
+        heapq.heappush(ocupadas, (fin[nombre], orden, local))
+
+    if not renombres:
+        return codigo, locales
+    codigo = list(codigo)
+    for i, nombre in accesos:
+        local = renombres.get(nombre)
+        if local is not None:
+            codigo[i] = (codigo[i][0], local)
+    sobrantes = {(nombre, tipos[nombre]) for nombre in renombres}
+    return codigo, locales - sobrantes
+
+
+def _lazo_actual(abiertos: List[int]) -> int:
+    # El lazo mas interno abierto (los block no cuentan), o -1
+    for lazo in reversed(abiertos):
+        if lazo >= 0:
+            return lazo
+    return -1
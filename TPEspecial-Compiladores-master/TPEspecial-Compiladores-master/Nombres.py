@@ -0,0 +1,93 @@
+"""
+Nombres internados: cada identificador distinto (y cada nombre con mangling,
+como X:PROG:F) recibe un objeto Nombre la primera vez que aparece, y todo el
+compilador lo usa como clave: el token ID, los nodos del AST, los ambitos del
+analisis semantico, la tabla de simbolos y el generador de codigo.
+
+Hay un solo Nombre por texto, asi que dos nombres son iguales solo si son el
+mismo objeto: __eq__ y __hash__ son los de object (identidad, sin comparar
+texto). Un Nombre no es un entero ni un str: no se confunde con una constante
+UI ni con un texto que se le parezca. Cada Nombre guarda su texto (el mismo
+str, sin copiarlo), que solo se usa al escribir la salida: str(), repr() y los
+f-strings de los mensajes, de la tabla de simbolos y del WAT muestran el
+texto, igual que antes. `id` es el numero del nombre (el orden en que se
+interno); no se repite en todo el proceso.
+
+    a = internar("A")
+    a is internar("A")       # True: un solo objeto por nombre
+    f"${a}"                   # "$A"
+    {a: 1}[internar("A")]     # la busqueda compara identidad, no texto
+    a == "A"                  # False: un Nombre solo es igual a si mismo
+
+El 0 es el nombre vacio, asi un Nombre es falso solo si su texto es "".
+
+La tabla es del proceso: lo que se interna queda hasta que se llama a
+reiniciar(), que olvida todo salvo los nombres fijos (los del propio
+compilador, como abort y main en generador_wasm, armados con fijo()). Un
+proceso que compila muchas veces (los tests, los benchmarks) la reinicia entre
+compilaciones independientes. Un Nombre de antes de reiniciar sigue
+mostrando su texto y su id, pero ya no es el que da internar() para ese texto:
+no hay que mezclar tokens, arboles ni tablas de simbolos de antes y de despues.
+"""
+from itertools import count
+from typing import Dict, List
+
+
+_POR_TEXTO: Dict[str, "Nombre"] = {}
+_FIJOS: List["Nombre"] = []
+_IDS = count()
+
+
+class Nombre:
+    __slots__ = ('id', 'texto')
+
+    def __init__(self, id: int, texto: str):
+        self.id = id
+        self.texto = texto
+
+    def __str__(self) -> str:
+        return self.texto
+
+    def __repr__(self) -> str:
+        return repr(self.texto)
+
+    def __format__(self, formato: str) -> str:
+        return format(self.texto, formato)
+
+    def __bool__(self) -> bool:
+        return self.id != 0
+
+    # Un nombre es inmutable y unico: las copias del AST lo comparten
+    def __copy__(self) -> "Nombre":
+        return self
+
+    def __deepcopy__(self, memo) -> "Nombre":
+        return self
+
+    def __reduce__(self):
+        return internar, (self.texto,)
+
+
+def internar(texto: str) -> Nombre:
+    n = _POR_TEXTO.get(texto)
+    if n is None:
+        n = _POR_TEXTO[texto] = Nombre(next(_IDS), texto)
+    return n
+
+
+def fijo(texto: str) -> Nombre:
+    # Un nombre interno del compilador, que sobrevive a reiniciar()
+    n = internar(texto)
+    if all(f is not n for f in _FIJOS):
+        _FIJOS.append(n)
+    return n
+
+
+def reiniciar():
+    # Vacia la tabla salvo los fijos, que quedan con el mismo objeto y el mismo id
+    _POR_TEXTO.clear()
+    for n in _FIJOS:
+        _POR_TEXTO[n.texto] = n
+
+
+fijo("")
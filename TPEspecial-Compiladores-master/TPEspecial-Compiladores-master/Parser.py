@@ -1,40 +1,206 @@
+import hashlib
+import os
+import pickle
+from collections import deque
+
+import sly
 from sly import Parser
+from sly.yacc import YaccError
 from Lexer import AnalisisLexico
 from TablaDeSimbolos import TablaDeSimbolos
-from typing import List, Tuple
+from Trazas import TRAZA, SINTACTICO, INFO, ERROR
+from typing import List, Optional, Tuple
 
 # Importamos los nodos del AST el enum de tipos
 from AnalisisSemantico import (
     Programa, Bloque, DeclVar, Identificador, IdCalificado, Literal,
     Unario, Binario, Asignacion, MultiAsignacion, Si, DoWhile, Print,
-    Return, Parametro, Invocacion, Funcion, Trunc, Tipo, ErrorNodo, Lambda
+    Return, Parametro, Invocacion, Funcion, Trunc, Tipo, ErrorNodo, Lambda, Nodo, SentenciaErronea,
+    lit_uint, lit_dfloat, lit_string
 )
 
 
+# Cache en disco de las tablas LALR. Construirlas (sly.yacc.LRTable) lleva mas
+# de medio segundo y se repetia en cada arranque aunque la gramatica no cambie.
+# Se guarda junto al bytecode, asi queda fuera del repositorio.
+RUTA_CACHE_TABLAS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 '__pycache__', 'AnalisisSintactico.lalr')
+
+
+class TablasLALR:
+    # Lo unico que Parser.parse() usa de sly.yacc.LRTable
+    def __init__(self, lr_action, lr_goto, defaulted_states):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+
+
+def _leer_cache_tablas(clave):
+    try:
+        with open(RUTA_CACHE_TABLAS, 'rb') as f:
+            guardada, action, goto, defaulted = pickle.load(f)
+    except Exception:
+        # No existe, esta corrupto o es de otra version de Python: se reconstruye
+        return None
+    if guardada != clave:
+        return None
+    return TablasLALR(action, goto, defaulted)
+
+
+def _guardar_cache_tablas(clave, lrtable):
+    datos = (clave, lrtable.lr_action, lrtable.lr_goto, lrtable.defaulted_states)
+    temporal = f"{RUTA_CACHE_TABLAS}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(RUTA_CACHE_TABLAS), exist_ok=True)
+        with open(temporal, 'wb') as f:
+            pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, RUTA_CACHE_TABLAS)  # atomico: nunca queda un cache a medio escribir
+    except OSError:
+        # Directorio de solo lectura: se sigue sin cache
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+
+
+# Pasos de sly.Parser._build (privados) que reusa AnalisisSintactico._build
+_METODOS_SLY = ('_Parser__collect_rules', '_Parser__validate_specification',
+                '_Parser__build_grammar', '_Parser__build_lrtables')
+
+
+class _PosicionesNoRegistradas(dict):
+    # sly guarda lineno e (index, end) por id() de cada valor reducido en
+    # _line_positions/_index_positions, que crecen con la cantidad de tokens.
+    # No usamos line_position()/index_position(): no se guarda nada.
+    def __setitem__(self, clave, valor):
+        pass
+
 
 class AnalisisSintactico(Parser):
+    _line_positions = _index_positions = _PosicionesNoRegistradas()
+
     # Tabla de simbolos 
     def __init__(self):
-        self._errores: List[Tuple[str, int]] = [] #para cortar el main si hay errores sintacticos
+        self._errores: List[Tuple[str, int, Optional[int]]] = [] #para cortar el main si hay errores sintacticos
         self.tabla_simbolos = None
         self.error_flag = False
+        self._literales = {}  # literales sin posicion compartidos dentro de un arbol (lit_uint, ...)
 
     # metodo para establecer la tabla de simbolos.
     def set_tabla_simbolos(self, tabla):
         self.tabla_simbolos = tabla
 
     #Se llama desde las reglas, asi se reportan errores propios
+    # Se guarda tambien la posicion (index) del token o de la produccion: la
+    # columna se calcula solo al reportar, con el IndiceLineas del lexer.
     def registrar_error(self, mensaje: str, tok=None):
         linea = getattr(tok, "lineno", 0) if tok is not None else 0
-        self._errores.append((mensaje, linea))
+        index = getattr(tok, "index", None) if tok is not None else None
+        self._errores.append((mensaje, linea, index))
 
     def tiene_errores(self) -> bool:
         return len(self._errores) > 0
 
-    def errores(self) -> List[Tuple[str, int]]:
+    def errores(self) -> List[Tuple[str, int, Optional[int]]]:
         return list(self._errores)
-    
-    debugfile = 'parser.out'
+
+    # Las reglas de listas recursivas a izquierda (sentencias, lista_expr_const,
+    # parametros_invocacion) agregan con append sobre la lista de la izquierda.
+    # Las recursivas a derecha (lista_ids, parametros) reducen primero el ultimo
+    # elemento, asi que se arman con appendleft sobre un deque y la regla que
+    # consume la lista la convierte una sola vez con _cerrar().
+    def _anteponer(self, elem, resto):
+        if isinstance(resto, list):
+            resto = deque(resto)
+        if isinstance(resto, deque):
+            resto.appendleft(elem)
+            return resto
+        return [elem] + resto   # valores de reglas de error: igual que antes
+
+    def _cerrar(self, lista):
+        return list(lista) if isinstance(lista, deque) else lista
+
+    # Sentencias de un Bloque como lista plana de nodos. Algunas reglas devuelven
+    # una lista de sentencias (se abre) o None (se saca); lo que dejan las reglas
+    # de recuperacion de errores (tuplas como ('if', ...)) queda en una SentenciaErronea.
+    def _sentencias(self, valores):
+        if not isinstance(valores, (list, deque)):
+            valores = [valores]
+        if all(isinstance(s, Nodo) for s in valores):
+            return valores
+        planos = []
+        for s in valores:
+            for elem in (s if isinstance(s, (list, deque)) else (s,)):
+                if isinstance(elem, Nodo):
+                    planos.append(elem)
+                elif elem is not None:
+                    planos.append(SentenciaErronea(valor=elem))
+        return planos
+
+    # Los literales se comparten solo dentro del arbol de un parseo: al terminar
+    # se vacia el diccionario, asi no crece entre compilaciones del mismo proceso
+    def parse(self, tokens):
+        try:
+            return super().parse(tokens)
+        finally:
+            self._literales.clear()
+
+    # FlujoTokens (FlujoTokens.py): sly solo acepta un iterador de Token, asi
+    # que aca se recorre el flujo armando cada uno. El parser generado no copia
+    # este _parse_flujo: el de su driver lee los arreglos directo.
+    def parse_flujo(self, flujo):
+        try:
+            return self._parse_flujo(flujo)
+        finally:
+            self._literales.clear()
+
+    def _parse_flujo(self, flujo):
+        return super().parse(iter(flujo))
+
+    # El reporte parser.out (~3 MB) solo se escribe si se pide con DEBUG_PARSER=1
+    debugfile = 'parser.out' if os.environ.get('DEBUG_PARSER') else None
+
+    # Mismo proceso que sly.Parser._build, pero las tablas LALR salen del cache
+    # cuando la clave (reglas + precedencia) coincide con la guardada. Usa los
+    # metodos internos de sly 0.5 (requirements.txt); con otra version que no
+    # los tenga queda el _build de sly, sin cache.
+    if all(hasattr(Parser, metodo) for metodo in _METODOS_SLY):
+        @classmethod
+        def _build(cls, definitions):
+            reglas = cls._Parser__collect_rules(definitions)
+            if not cls._Parser__validate_specification():
+                raise YaccError('Invalid parser specification')
+            cls._Parser__build_grammar(reglas)
+
+            clave = cls._clave_gramatica()
+            if not cls.debugfile:
+                tablas = _leer_cache_tablas(clave)
+                if tablas is not None:
+                    cls._lrtable = tablas
+                    return
+
+            if not cls._Parser__build_lrtables():
+                raise YaccError('Can\'t build parsing tables')
+            _guardar_cache_tablas(clave, cls._lrtable)
+
+            if cls.debugfile:
+                with open(cls.debugfile, 'w') as f:
+                    f.write(str(cls._grammar))
+                    f.write('\n')
+                    f.write(str(cls._lrtable))
+                cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, cls.debugfile)
+
+    # Hash de todo lo que determina las tablas: producciones en orden (con su
+    # precedencia), tabla de precedencia, simbolo inicial y version de sly.
+    @classmethod
+    def _clave_gramatica(cls):
+        h = hashlib.sha256()
+        h.update(f"sly {sly.__version__}\n".encode())
+        for prod in cls._grammar.Productions:
+            h.update(f"{prod.name} -> {' '.join(prod.prod)} {prod.prec}\n".encode())
+        h.update(repr(sorted(cls._grammar.Precedence.items())).encode())
+        h.update(str(cls._grammar.Start).encode())
+        return h.hexdigest()
 
     #Tokens del lexico.
     tokens = AnalisisLexico.tokens
@@ -68,32 +234,36 @@ class AnalisisSintactico(Parser):
     #Regla inicio de programa
     @_('ID "{" sentencias "}"')
     def programa(self, p):
-        print(f"Línea {p.lineno}: Se reconoció el programa con sentencias.")
-        return Programa(nombre=p.ID, cuerpo=Bloque(sentencias=p.sentencias))
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció el programa con sentencias.")
+        return Programa(nombre=p.ID, cuerpo=Bloque(sentencias=self._sentencias(p.sentencias)))
     
     #Regla para sentencias (puede ser vacía o multiples sentencias)
     @_('sentencias sentencia')
     def sentencias(self, p):
-        return p.sentencias + ([p.sentencia] if p.sentencia is not None else [])
+        if p.sentencia is not None:
+            p.sentencias.append(p.sentencia)
+        return p.sentencias
 
     
     #Regla para una sentencia individual (declaracion de variable)
     @_('UINT lista_ids ";"')
     def sentencia(self, p):
-        print(f"Linea {p.lineno}: Se reconocio declaracion de variable(s) de tipo UINT.")
-        return DeclVar(tipo_decl=Tipo.UINT, ids=p.lista_ids, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Linea {p.lineno}: Se reconocio declaracion de variable(s) de tipo UINT.")
+        return DeclVar(tipo_decl=Tipo.UINT, ids=self._cerrar(p.lista_ids), linea=p.lineno, index=p.index)
     
     #Reglas para un identificador de variable.
     @_('ID')
     def lista_ids(self,p):
-        return [Identificador(nombre=p.ID, linea=p.lineno)]
+        return [Identificador(nombre=p.ID, linea=p.lineno, index=p.index)]
   
     @_('ID "," lista_ids')
     def lista_ids(self, p):
-        return [Identificador(nombre=p.ID, linea=p.lineno)] + p.lista_ids
+        return self._anteponer(Identificador(nombre=p.ID, linea=p.lineno, index=p.index), p.lista_ids)
     @_('id_calificado "," lista_ids')
     def lista_ids(self, p):
-        return [p.id_calificado] + p.lista_ids
+        return self._anteponer(p.id_calificado, p.lista_ids)
     
     @_('id_calificado')
     def lista_ids(self,p):
@@ -102,8 +272,9 @@ class AnalisisSintactico(Parser):
     @_('ID "." ID')
     def id_calificado(self, p):
         # Devuelve una tupla, que es ordenada e inmutable
-        print(f"Línea {p.lineno}: Se reconoció ID calificado '{p.ID0}.{p.ID1}'.")
-        return IdCalificado(base=Identificador(nombre=p.ID0), atributo=Identificador(nombre=p.ID1), linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció ID calificado '{p.ID0}.{p.ID1}'.")
+        return IdCalificado(base=Identificador(nombre=p.ID0), atributo=Identificador(nombre=p.ID1), linea=p.lineno, index=p.index)
 
     
     
@@ -116,12 +287,14 @@ class AnalisisSintactico(Parser):
     # Reglas para todas las sentencias if
     @_('IF "(" condicion ")" bloque_sentencias ELSE bloque_sentencias ENDIF ";"')
     def sentencia(self, p):
-        print(f"Línea {p.lineno}: Se reconoció IF con rama ELSE.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció IF con rama ELSE.")
         return Si(condicion=p.condicion, entonces=p.bloque_sentencias0, sino=p.bloque_sentencias1)
 
     @_('IF "(" condicion ")" bloque_sentencias ENDIF ";"')
     def sentencia(self, p):
-        print(f"Línea {p.lineno}: Se reconoció IF sin ELSE.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció IF sin ELSE.")
         return Si(condicion=p.condicion, entonces=p.bloque_sentencias, sino=None)
     
     @_(' "{" sentencias "}" ')
@@ -160,33 +333,39 @@ class AnalisisSintactico(Parser):
     #Reglas para condiciones
     @_('expresion EQ expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición de igualdad '{p.expresion0} == {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición de igualdad '{p.expresion0} == {p.expresion1}'.")
         return Binario(op='==', izq=p.expresion0, der=p.expresion1)
     
     
     @_('expresion NEQ expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición de desigualdad '{p.expresion0} != {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición de desigualdad '{p.expresion0} != {p.expresion1}'.")
         return Binario(op='!=', izq=p.expresion0, der=p.expresion1)
     
     @_('expresion LT expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición menor que '{p.expresion0} < {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición menor que '{p.expresion0} < {p.expresion1}'.")
         return Binario(op='<', izq=p.expresion0, der=p.expresion1)
     
     @_('expresion LTE expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición menor o igual que '{p.expresion0} <= {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición menor o igual que '{p.expresion0} <= {p.expresion1}'.")
         return Binario(op='<=', izq=p.expresion0, der=p.expresion1)
     
     @_('expresion GT expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición mayor que '{p.expresion0} > {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición mayor que '{p.expresion0} > {p.expresion1}'.")
         return Binario(op='>', izq=p.expresion0, der=p.expresion1)
     
     @_('expresion GTE expresion')
     def condicion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció condición mayor o igual que '{p.expresion0} >= {p.expresion1}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció condición mayor o igual que '{p.expresion0} >= {p.expresion1}'.")
         return Binario(op='>=', izq=p.expresion0, der=p.expresion1)
     #Fin de reglas condiciones
     
@@ -196,13 +375,14 @@ class AnalisisSintactico(Parser):
     @_('UINT ID "(" parametros ")" "{" sentencias_de_funcion final_funcion "}" ')
     def sentencia(self, p):
         tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion else [])
-        cuerpo = Bloque(sentencias=p.sentencias_de_funcion + tail)
-        return Funcion(nombre=p.ID, params=p.parametros, cuerpo=cuerpo, retorno=Tipo.UINT, linea=p.lineno)
+        cuerpo = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion + tail))
+        return Funcion(nombre=p.ID, params=self._cerrar(p.parametros), cuerpo=cuerpo, retorno=Tipo.UINT, linea=p.lineno, index=p.index)
         
     #Esto se hace debido a que si se usa 'sentencias' no se podria saber reconocer la palabra reservada RETURN
     @_('sentencias_de_funcion sentencia_de_funcion')
     def sentencias_de_funcion(self, p):
-        return p.sentencias_de_funcion + [p.sentencia_de_funcion]
+        p.sentencias_de_funcion.append(p.sentencia_de_funcion)
+        return p.sentencias_de_funcion
 
     @_('')
     def sentencias_de_funcion(self, p):
@@ -211,15 +391,18 @@ class AnalisisSintactico(Parser):
     # Sentencias permitidas dentro de una función
     @_('UINT lista_ids ";"')
     def sentencia_de_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció declaración de variable local '{p.lista_ids}'.")
-        return DeclVar(tipo_decl=Tipo.UINT, ids=p.lista_ids, linea=p.lineno)
+        ids = self._cerrar(p.lista_ids)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció declaración de variable local '{ids}'.")
+        return DeclVar(tipo_decl=Tipo.UINT, ids=ids, linea=p.lineno, index=p.index)
     
     @_('UINT ID "(" parametros ")" "{" sentencias_de_funcion final_funcion "}" ')
     def sentencia_de_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció declaración de funcion dentro de funcion '{p.ID}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció declaración de funcion dentro de funcion '{p.ID}'.")
         tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion else [])
-        cuerpo = Bloque(sentencias=p.sentencias_de_funcion + tail)
-        return Funcion(nombre=p.ID, params=p.parametros, cuerpo=cuerpo, retorno=Tipo.UINT)
+        cuerpo = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion + tail))
+        return Funcion(nombre=p.ID, params=self._cerrar(p.parametros), cuerpo=cuerpo, retorno=Tipo.UINT)
 
 
 
@@ -231,30 +414,34 @@ class AnalisisSintactico(Parser):
     #Reglas para IF comunes dentro de una funcion
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció IF con rama ELSE dentro de función.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció IF con rama ELSE dentro de función.")
         tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion0)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion1)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion0))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion1))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion + tail
     
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio if comun con else dentro de funcion sin return en ninguna rama ni posteriormente.")
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion0)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion1)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio if comun con else dentro de funcion sin return en ninguna rama ni posteriormente.")
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion0))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion1))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion
     
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció IF sin ELSE dentro de función.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció IF sin ELSE dentro de función.")
         tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion + tail
         
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio if comun dentro de funcion sin return en ninguna rama ni posteriormente.")
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio if comun dentro de funcion sin return en ninguna rama ni posteriormente.")
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion
     #FIN REGLAS DE IF COMUNES
 
@@ -265,41 +452,45 @@ class AnalisisSintactico(Parser):
     # IF () {..., RETURN ...} ELSE {..., RETURN ...} ENDIF;
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ELSE "{" sentencias_de_funcion final_funcion "}" ENDIF ";"')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         else_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion0 + then_tail)
-        else_blk = Bloque(sentencias=p.sentencias_de_funcion1 + else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion1 + else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)]
     
     #IF () RETURN ; ELSE RETURN ; ENDIF;
     @_('IF "(" condicion ")" final_funcion ELSE final_funcion ENDIF ";"')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         else_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
-        else_blk = Bloque(sentencias=else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)]
     
     #IF () {..., RETURN} ELSE RETURN; ENDIF;
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ELSE final_funcion ENDIF ";"')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         else_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion + then_tail)
-        else_blk = Bloque(sentencias=else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion + then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)]
     
     #IF () RETURN; ELSE {..., RETURN}; ENDIF;
     @_('IF "(" condicion ")" final_funcion ELSE "{" sentencias_de_funcion final_funcion "}" ENDIF ";"')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' y 'else' para '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         else_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
-        else_blk = Bloque(sentencias=p.sentencias_de_funcion + else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion + else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)]
     #FIN DE REGLAS PARA SENTENCIAS IF FINALES DENTRO DE FUNCION    
 
@@ -310,35 +501,39 @@ class AnalisisSintactico(Parser):
     #IF () {...RETURN...} ENDIF RETURN;
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' sin else para  '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' sin else para  '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion0 + then_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + then_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion1 + after_tail
     
     #IF () RETURN; ENDIF RETURN;
     @_('IF "(" condicion ")" final_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con 'if' sin else para  '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con 'if' sin else para  '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion + after_tail
     
     #IF () RETURN; ENDIF sentencias;
     @_('IF "(" condicion ")" final_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio posible falta de return si no se entra a la rama then.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio posible falta de return si no se entra a la rama then.")
         then_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion
     
     #IF () {...RETURN...}; ENDIF sentencias;
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio posible falta de return si no se entra a la rama then.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio posible falta de return si no se entra a la rama then.")
         then_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion0 + then_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + then_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=None)] + p.sentencias_de_funcion1
     
     #FIN DE BLOQUE ES PARA LOS FINALES DONDE FALTA ELSE
@@ -347,36 +542,40 @@ class AnalisisSintactico(Parser):
     #ESTE BLOQUE ES PARA LOS FINALES DONDE ESTA ELSE PERO SIN RETURN
     @_('IF "(" condicion ")" final_funcion ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio return en rama then unicamente.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio return en rama then unicamente.")
         then_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion
     
     @_('IF "(" condicion ")" final_funcion ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función en rama then, no en rama else. Pero si luego de todo el if '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función en rama then, no en rama else. Pero si luego de todo el if '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=then_tail)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        then_blk = Bloque(sentencias=self._sentencias(then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion + after_tail
     
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error sintactico en línea {p.lineno}: Se reconocio return en rama then unicamente.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintactico en línea {p.lineno}: Se reconocio return en rama then unicamente.")
         then_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion0 + then_tail)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion1
     
     @_('IF "(" condicion ")" "{" sentencias_de_funcion final_funcion "}" ELSE bloque_sentencias_de_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función con en rama then, no en rama else. Pero si luego de todo el if '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función con en rama then, no en rama else. Pero si luego de todo el if '{p.condicion}'.")
         then_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.sentencias_de_funcion0 + then_tail)
-        else_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
+        then_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + then_tail))
+        else_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion1 + after_tail
     #FIN DE BLOQUE ES PARA LOS FINALES DONDE ESTA ELSE PERO SIN RETURN
 
@@ -388,46 +587,51 @@ class AnalisisSintactico(Parser):
     #IF ()  ELSE RETURN; ENDIF;
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE final_funcion ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error semántico en línea {p.lineno}: Se reconocio return en rama else unicamente.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error semántico en línea {p.lineno}: Se reconocio return en rama else unicamente.")
         else_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
-        else_blk = Bloque(sentencias=else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
+        else_blk = Bloque(sentencias=self._sentencias(else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion
     
     #IF () ELSE {... RETURN ...}; ENDIF;
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE "{" sentencias_de_funcion final_funcion "}" ENDIF ";" sentencias_de_funcion')
     def final_funcion(self, p):
-        print(f"❌ Error semántico en línea {p.lineno}: Se reconocio return en rama else unicamente.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error semántico en línea {p.lineno}: Se reconocio return en rama else unicamente.")
         else_tail = p.final_funcion if isinstance(p.final_funcion, list) else ([p.final_funcion] if p.final_funcion is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
-        else_blk = Bloque(sentencias=p.sentencias_de_funcion0 + else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
+        else_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion1
     
      #IF ()  ELSE RETURN; ENDIF; RETURN
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE final_funcion ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función en rama else, no en rama then. Pero si luego de todo el if '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función en rama else, no en rama then. Pero si luego de todo el if '{p.condicion}'.")
         else_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
-        else_blk = Bloque(sentencias=else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
+        else_blk = Bloque(sentencias=self._sentencias(else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion + after_tail
     
     #IF () ELSE {... RETURN ...}; ENDIF; RETURN
     @_('IF "(" condicion ")" bloque_sentencias_de_funcion ELSE "{" sentencias_de_funcion final_funcion "}" ENDIF ";" sentencias_de_funcion final_funcion')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció final de función en rama else, no en rama then. Pero si luego de todo el if '{p.condicion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció final de función en rama else, no en rama then. Pero si luego de todo el if '{p.condicion}'.")
         else_tail = p.final_funcion0 if isinstance(p.final_funcion0, list) else ([p.final_funcion0] if p.final_funcion0 is not None else [])
         after_tail = p.final_funcion1 if isinstance(p.final_funcion1, list) else ([p.final_funcion1] if p.final_funcion1 is not None else [])
-        then_blk = Bloque(sentencias=p.bloque_sentencias_de_funcion)
-        else_blk = Bloque(sentencias=p.sentencias_de_funcion0 + else_tail)
+        then_blk = Bloque(sentencias=self._sentencias(p.bloque_sentencias_de_funcion))
+        else_blk = Bloque(sentencias=self._sentencias(p.sentencias_de_funcion0 + else_tail))
         return [Si(condicion=p.condicion, entonces=then_blk, sino=else_blk)] + p.sentencias_de_funcion1 + after_tail
     #FIN DE REGLAS DE FINALES DONDE RAMA THEN NO TIENE RETURN, Y SI EXISTE RAMA ELSE
     #FINAL SENTENCIAS IF DENTRO DE FUNCION
     
     @_('RETURN "(" expresion ")" ";"')
     def final_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció sentencia RETURN con expresión '{p.expresion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció sentencia RETURN con expresión '{p.expresion}'.")
         return Return(expr=p.expresion)
 
 
@@ -444,12 +648,14 @@ class AnalisisSintactico(Parser):
     
     @_('ID ASSIGN_PASCAL expresion ";"')
     def sentencia_de_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.ID} := {p.expresion}'.")
-        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno), expr=p.expresion)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.ID} := {p.expresion}'.")
+        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno, index=p.index), expr=p.expresion)
 
     @_('id_calificado ASSIGN_PASCAL expresion ";"')
     def sentencia_de_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconocio asignación por pascal '{p.id_calificado} := {p.expresion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconocio asignación por pascal '{p.id_calificado} := {p.expresion}'.")
         return Asignacion(destino=p.id_calificado, expr=p.expresion)
 
     @_('invocacion ')
@@ -464,20 +670,24 @@ class AnalisisSintactico(Parser):
     def sentencia_de_funcion(self, p):
         # Verificamos si la lista de sentencias esta vacia
         if not p.bloque_sentencias:
-            print(f"❌ Error Sintactico (Línea {p.lineno}): El cuerpo del DO-WHILE no puede estar vacio (riesgo de bucle infinito).")
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error Sintactico (Línea {p.lineno}): El cuerpo del DO-WHILE no puede estar vacio (riesgo de bucle infinito).")
             self.registrar_error("Cuerpo de DO-WHILE vacio", p)
             return None 
             
-        print(f"Línea {p.lineno}: Se reconoció sentencia DO-WHILE con condición '{p.condicion}'.")
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció sentencia DO-WHILE con condición '{p.condicion}'.")
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     @_('lista_ids ASSIGN lista_expr_const ";"')
     def sentencia_de_funcion(self, p):
         if len(p.lista_ids) > len(p.lista_expr_const):
-            print(f"❌ Error semantico L{p.lineno}: menos expresiones que variables.")
-            return ErrorNodo(mensaje="Mas variables que expresiones en multi asignacion", linea=p.lineno)
-        print(f"Línea {p.lineno}: Se reconocio asignación multiple con '='.")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const)
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error semantico L{p.lineno}: menos expresiones que variables.")
+            return ErrorNodo(mensaje="Mas variables que expresiones en multi asignacion", linea=p.lineno, index=p.index)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconocio asignación multiple con '='.")
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const)
     
 
     #Fin de sentencias permitidas dentro de una función
@@ -489,23 +699,27 @@ class AnalisisSintactico(Parser):
     # NIVEL 1: Términos (unidades básicas)
     @_('ID')
     def termino(self, p):
-        print(f"Línea {p.lineno}: Se reconoció termino '{p.ID}'.")
-        return Identificador(nombre=p.ID, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció termino '{p.ID}'.")
+        return Identificador(nombre=p.ID, linea=p.lineno, index=p.index)
     
     @_('UINT_CONST')
     def termino(self, p):
-        print(f"Línea {p.lineno}: Se reconoció termino TERMINO'{p.UINT_CONST}'.")
-        return Literal(valor=p.UINT_CONST, tipo=Tipo.UINT, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció termino TERMINO'{p.UINT_CONST}'.")
+        return Literal(valor=p.UINT_CONST, tipo=Tipo.UINT, linea=p.lineno, index=p.index)
     
     @_('DFLOAT_CONST')
     def termino(self, p):
-        print(f"Línea {p.lineno}: Se reconoció termino TERMINO '{p.DFLOAT_CONST}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció termino TERMINO '{p.DFLOAT_CONST}'.")
         valf = self._to_float(p.DFLOAT_CONST)
-        return Literal(valor=valf, tipo=Tipo.DFLOAT, linea=p.lineno)
+        return Literal(valor=valf, tipo=Tipo.DFLOAT, linea=p.lineno, index=p.index)
     
     @_('"(" expresion ")"')
     def termino(self, p):
-        print(f"Línea {p.lineno}: Se reconoció expresión entre paréntesis.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció expresión entre paréntesis.")
         return p.expresion
     
     @_('id_calificado')
@@ -524,11 +738,13 @@ class AnalisisSintactico(Parser):
     def factor(self, p):
         valor = p.factor[0]
         if isinstance(valor, int):  # UI
-            print(f"Línea {p.lineno}: ❌ Error - Falta operando izquierdo en la operación, no se permite UI negativo.")
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"Línea {p.lineno}: ❌ Error - Falta operando izquierdo en la operación, no se permite UI negativo.")
             return ('error', 'UI negativo no permitido')
         #elif isinstance(valor, float):  
         #DFLOAT
-        print(f"Línea {p.lineno}: Se reconoció expresion negativa '-{p.factor}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció expresion negativa '-{p.factor}'.")
         self.tabla_simbolos.agregar_negativo(p.factor, linea=p.lineno)
         return Unario(op='-', expr=p.factor)
 
@@ -539,12 +755,14 @@ class AnalisisSintactico(Parser):
     
     @_('expr_mult "*" factor')
     def expr_mult(self, p):
-        print(f"Línea {p.lineno}: Se reconoció operacion de la multiplicacion '{p.expr_mult} * {p.factor}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció operacion de la multiplicacion '{p.expr_mult} * {p.factor}'.")
         return Binario(op='*', izq=p.expr_mult, der=p.factor)
     
     @_('expr_mult "/" factor')
     def expr_mult(self, p):
-        print(f"Línea {p.lineno}: Se reconoció operacion de la division '{p.expr_mult} / {p.factor}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció operacion de la division '{p.expr_mult} / {p.factor}'.")
         return Binario(op='/', izq=p.expr_mult, der=p.factor)
     
     # NIVEL 4: Expresiones de suma y resta
@@ -554,12 +772,14 @@ class AnalisisSintactico(Parser):
     
     @_('expresion "+" expr_mult')
     def expresion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció operacion de la suma '{p.expresion} + {p.expr_mult}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció operacion de la suma '{p.expresion} + {p.expr_mult}'.")
         return Binario(op='+', izq=p.expresion, der=p.expr_mult)
     
     @_('expresion MINUS expr_mult')
     def expresion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció operacion de la resta '{p.expresion} - {p.expr_mult}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció operacion de la resta '{p.expresion} - {p.expr_mult}'.")
         return Binario(op='-', izq=p.expresion, der=p.expr_mult)
     
     # Eliminamos regla vacía para expresion - causa muchos conflictos
@@ -575,22 +795,26 @@ class AnalisisSintactico(Parser):
     #Asignaciones e invocaciones de funciones
     @_('ID ASSIGN_PASCAL expresion ";"')
     def sentencia(self, p):
-        print(f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.ID} := {p.expresion}'.")
-        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno), expr=p.expresion, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.ID} := {p.expresion}'.")
+        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno, index=p.index), expr=p.expresion, linea=p.lineno, index=p.index)
 
     @_('id_calificado ASSIGN_PASCAL expresion ";"')
     def sentencia(self, p):
-        print(f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.id_calificado} := {p.expresion}'.")
-        return Asignacion(destino=p.id_calificado, expr=p.expresion, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció asignación por pascal '{p.id_calificado} := {p.expresion}'.")
+        return Asignacion(destino=p.id_calificado, expr=p.expresion, linea=p.lineno, index=p.index)
 
     @_('ID ASSIGN_PASCAL error')
     def sentencia(self, p):
-        print(f"❌ Error sintáctico en línea {p.lineno}: Se esperaba una expresión después de ':=' en la asignación por pascal.")
-        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno))
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintáctico en línea {p.lineno}: Se esperaba una expresión después de ':=' en la asignación por pascal.")
+        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno, index=p.index))
 
     @_('id_calificado ASSIGN_PASCAL error')
     def sentencia(self, p):
-        print(f"❌ Error sintáctico en línea {p.lineno}: Se esperaba una expresión después de ':=' en la asignación por pascal.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error sintáctico en línea {p.lineno}: Se esperaba una expresión después de ':=' en la asignación por pascal.")
         return Asignacion(destino=p.id_calificado)
 
     @_('invocacion ')
@@ -599,45 +823,54 @@ class AnalisisSintactico(Parser):
 
     @_('ID "(" parametros_invocacion ")" ')
     def invocacion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció invocación de función '{p.ID}' con parámetros {p.parametros_invocacion}.")
-        return Invocacion(nombre=p.ID, argumentos=p.parametros_invocacion, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció invocación de función '{p.ID}' con parámetros {p.parametros_invocacion}.")
+        return Invocacion(nombre=p.ID, argumentos=p.parametros_invocacion, linea=p.lineno, index=p.index)
 
     @_('parametros_invocacion "," expresion ARROW ID')
     def parametros_invocacion(self, p):
-        return p.parametros_invocacion + [(p.expresion, p.ID)]
+        p.parametros_invocacion.append((p.expresion, p.ID))
+        return p.parametros_invocacion
     
     @_('parametros_invocacion "," TRUNC "(" expresion ")" ARROW ID')
     def parametros_invocacion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció truncamiento en argumento múltiple.")
-        trunc_node = Trunc(expr=p.expresion, tipo=Tipo.UINT, linea=p.lineno)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció truncamiento en argumento múltiple.")
+        trunc_node = Trunc(expr=p.expresion, tipo=Tipo.UINT, linea=p.lineno, index=p.index)
         if self.tabla_simbolos:
             #Registro en tabla de símbolos si es necesario
             pass
-        return p.parametros_invocacion + [(trunc_node, p.ID)]
+        p.parametros_invocacion.append((trunc_node, p.ID))
+        return p.parametros_invocacion
 
     @_('expresion ARROW ID')
     def parametros_invocacion(self, p):
-        print(f"Línea {p.lineno}: Se pasa al parametro formal '{p.ID}' la expresion: {p.expresion}.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se pasa al parametro formal '{p.ID}' la expresion: {p.expresion}.")
         return [(p.expresion, p.ID)]
     
     @_('CV UINT ID "," parametros')
     def parametros(self, p):
-        print(f"Línea {p.lineno}: Se pasa por copia valor '{p.ID}'.")
-        return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False)] + p.parametros
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se pasa por copia valor '{p.ID}'.")
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False), p.parametros)
     
     @_('UINT ID "," parametros')
     def parametros(self, p):
-        print(f"Línea {p.lineno}: Se pasa por copia-valor-resultado '{p.ID}'.")
-        return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True)] + p.parametros
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se pasa por copia-valor-resultado '{p.ID}'.")
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True), p.parametros)
 
     @_('CV UINT ID')
     def parametros(self, p):
-        print(f"Línea {p.lineno}: Se pasa por copia valor '{p.ID}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se pasa por copia valor '{p.ID}'.")
         return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False)]
 
     @_('UINT ID')
     def parametros(self, p):
-       print(f"Línea {p.lineno}: Se pasa por copia-valor-resultado '{p.ID}'.")
+       if TRAZA.sintactico:
+           TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se pasa por copia-valor-resultado '{p.ID}'.")
        return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True)]
 
     
@@ -651,12 +884,14 @@ class AnalisisSintactico(Parser):
     #Reglas para la sentencia PRINT
     @_('PRINT "(" CADENA ")" ";"')
     def print(self, p):
-        print(f"Línea {p.lineno}: Se reconoció sentencia PRINT con cadena '{p.CADENA}'.")
-        return Print(expr=Literal(valor=p.CADENA, tipo=Tipo.STRING))
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció sentencia PRINT con cadena '{p.CADENA}'.")
+        return Print(expr=lit_string(p.CADENA, compartidos=self._literales))
 
     @_('PRINT "(" expresion ")" ";"') 
     def print(self, p):
-        print(f"Línea {p.lineno}: Se reconoció sentencia PRINT con expresiónes '{p.expresion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció sentencia PRINT con expresiónes '{p.expresion}'.")
         return Print(expr=p.expresion)
 
     @_('print')
@@ -671,12 +906,14 @@ class AnalisisSintactico(Parser):
     def sentencia(self, p):
         # Verificamos si la lista de sentencias está vacia
         if not p.bloque_sentencias:
-            print(f"❌ Error Sintáctico (Línea {p.lineno}): El cuerpo del DO-WHILE no puede estar vacio (riesgo de bucle infinito).")
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error Sintáctico (Línea {p.lineno}): El cuerpo del DO-WHILE no puede estar vacio (riesgo de bucle infinito).")
             self.registrar_error("Cuerpo de DO-WHILE vacio", p)
             return None
             
-        print(f"Línea {p.lineno}: Se reconoció sentencia DO-WHILE con condición '{p.condicion}'.")
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció sentencia DO-WHILE con condición '{p.condicion}'.")
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     #Fin de regla DO-WHILE
 
@@ -686,10 +923,12 @@ class AnalisisSintactico(Parser):
     @_('lista_ids ASSIGN lista_expr_const ";"')
     def sentencia(self, p):
         if len(p.lista_ids) > len(p.lista_expr_const):
-            print(f"❌ Error semántico L{p.lineno}: menos expresiones que variables.")
-            return ErrorNodo(mensaje="Mas variables que expresiones multi asignación", linea=p.lineno)
-        print(f"Línea {p.lineno}: Se reconoció asignación múltiple con '='.")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const, linea=p.lineno)
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"❌ Error semántico L{p.lineno}: menos expresiones que variables.")
+            return ErrorNodo(mensaje="Mas variables que expresiones multi asignación", linea=p.lineno, index=p.index)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció asignación múltiple con '='.")
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const, linea=p.lineno, index=p.index)
         
     @_('expr_const')
     def lista_expr_const(self, p):
@@ -697,7 +936,8 @@ class AnalisisSintactico(Parser):
 
     @_('lista_expr_const "," expr_const')
     def lista_expr_const(self, p):
-        return p.lista_expr_const + [p.expr_const]
+        p.lista_expr_const.append(p.expr_const)
+        return p.lista_expr_const
 
     # Aquí usamos una estructura independiente y jerárquica para expresiones constantes
     # para evitar conflictos con las reglas de expresiones regulares
@@ -705,15 +945,16 @@ class AnalisisSintactico(Parser):
     # Nivel 1: términos constantes
     @_('UINT_CONST')
     def termino_const(self, p):
-                return Literal(valor=int(p.UINT_CONST), tipo=Tipo.UINT, linea=p.lineno)
+                return Literal(valor=int(p.UINT_CONST), tipo=Tipo.UINT, linea=p.lineno, index=p.index)
 
     @_('DFLOAT_CONST')
     def termino_const(self, p):
-        return Literal(valor=float(p.DFLOAT_CONST), tipo=Tipo.DFLOAT, linea=p.lineno)
+        return Literal(valor=float(p.DFLOAT_CONST), tipo=Tipo.DFLOAT, linea=p.lineno, index=p.index)
         
     @_('"(" expr_const ")" ')
     def termino_const(self, p):
-        print(f"Línea {p.lineno}: Se reconoció expresión constante entre paréntesis.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció expresión constante entre paréntesis.")
         return p.expr_const
         
     # Nivel 2: factor constante (puede ser un término o negación)
@@ -732,11 +973,13 @@ class AnalisisSintactico(Parser):
     def factor_const(self, p):
         valor = p.factor_const
         if isinstance(valor, int):  # UI
-            print(f"Línea {p.lineno}: ❌ Error - Falta operando izquierdo en la operación, no se permite UI negativo.")
+            if TRAZA.sintactico:
+                TRAZA.emitir(SINTACTICO, ERROR, p.lineno, f"Línea {p.lineno}: ❌ Error - Falta operando izquierdo en la operación, no se permite UI negativo.")
             return ('error', 'UI negativo no permitido')
         #elif isinstance(valor, float): 
         #DFLOAT
-        print(f"Línea {p.lineno}: Se reconoció factor constante negativo '-{p.factor_const}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció factor constante negativo '-{p.factor_const}'.")
         self.tabla_simbolos.agregar_negativo(p.factor_const, linea=p.lineno)
         return ('negativo', p.factor_const)
     
@@ -747,12 +990,14 @@ class AnalisisSintactico(Parser):
         
     @_('expr_mult_const "*" factor_const')
     def expr_mult_const(self, p):
-        print(f"Línea {p.lineno}: Se reconoció multiplicación de constantes.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció multiplicación de constantes.")
         return (p.expr_mult_const, '*', p.factor_const)
         
     @_('expr_mult_const "/" factor_const')
     def expr_mult_const(self, p):
-        print(f"Línea {p.lineno}: Se reconoció división de constantes.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció división de constantes.")
         return (p.expr_mult_const, '/', p.factor_const)
         
     # Nivel 4: expresiones aditivas constantes
@@ -762,12 +1007,14 @@ class AnalisisSintactico(Parser):
         
     @_('expr_const "+" expr_mult_const')
     def expr_const(self, p):
-        print(f"Línea {p.lineno}: Se reconoció suma de constantes.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció suma de constantes.")
         return (p.expr_const, '+', p.expr_mult_const)
         
     @_('expr_const MINUS expr_mult_const')
     def expr_const(self, p):
-        print(f"Línea {p.lineno}: Se reconoció resta de constantes.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció resta de constantes.")
         return (p.expr_const, '-', p.expr_mult_const)
     #Fin de reglas asignaciones multiples
 
@@ -778,34 +1025,38 @@ class AnalisisSintactico(Parser):
     #Inicio reglas de funciones Lambda
     @_('"(" parametro_lambda ")" bloque_sentencias "(" argumento_lambda ")"')
     def sentencia(self, p):
-        print(f"Línea {p.lineno}: Se reconoció función Lambda con parámetro '{p.parametro_lambda.nombre}' y argumento '{p.argumento_lambda}'.")
-        cuerpo = Bloque(sentencias=p.bloque_sentencias)  # envolver la única sentencia
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció función Lambda con parámetro '{p.parametro_lambda.nombre}' y argumento '{p.argumento_lambda}'.")
+        cuerpo = Bloque(sentencias=self._sentencias(p.bloque_sentencias))  # envolver la única sentencia
         return Lambda(parametro=p.parametro_lambda, cuerpo=cuerpo, argumento=p.argumento_lambda)
 
     @_('"(" parametro_lambda ")" bloque_sentencias "(" argumento_lambda ")"')
     def sentencia_de_funcion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció función Lambda con parámetro '{p.parametro_lambda.nombre}' y argumento '{p.argumento_lambda}'.")
-        cuerpo = Bloque(sentencias=p.bloque_sentencias)
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció función Lambda con parámetro '{p.parametro_lambda.nombre}' y argumento '{p.argumento_lambda}'.")
+        cuerpo = Bloque(sentencias=self._sentencias(p.bloque_sentencias))
         return Lambda(parametro=p.parametro_lambda, cuerpo=cuerpo, argumento=p.argumento_lambda)
 
     @_('UINT ID')
     def parametro_lambda(self, p):
-        print(f"Línea {p.lineno}: Parámetro Lambda '{p.ID}' de tipo UINT.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Parámetro Lambda '{p.ID}' de tipo UINT.")
         return Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False)
 
     @_('id_calificado')
     def argumento_lambda(self, p):
-        print(f"Línea {p.lineno}: Argumento Lambda calificado.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Argumento Lambda calificado.")
         return p.id_calificado
 
     @_('UINT_CONST')
     def argumento_lambda(self, p):
-        return Literal(valor=int(p.UINT_CONST), tipo=Tipo.UINT)
+        return lit_uint(p.UINT_CONST, compartidos=self._literales)
 
     @_('DFLOAT_CONST')
     def argumento_lambda(self, p):
         valf = self._to_float(p.DFLOAT_CONST)
-        return Literal(valor=valf, tipo=Tipo.DFLOAT)
+        return lit_dfloat(valf, compartidos=self._literales)
 
     @_('ID')
     def argumento_lambda(self, p):
@@ -814,12 +1065,13 @@ class AnalisisSintactico(Parser):
     #Regla para argumentos Dfloat negativos en funciones Lambda
     @_('MINUS DFLOAT_CONST %prec UMINUS')
     def argumento_lambda(self, p):
-        print(f"Línea {p.lineno}: Se reconoció argumento de función Lambda negativo '{p.DFLOAT_CONST}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció argumento de función Lambda negativo '{p.DFLOAT_CONST}'.")
         valf = self._to_float(p.DFLOAT_CONST)
         # registrar en la tabla
         if self.tabla_simbolos:
             self.tabla_simbolos.agregar_negativo(valf, linea=p.lineno)
-        return Literal(valor=-valf, tipo=Tipo.DFLOAT)
+        return lit_dfloat(-valf, compartidos=self._literales)
 
     #Fin de reglas funciones Lambda
     
@@ -828,7 +1080,8 @@ class AnalisisSintactico(Parser):
     #Reglas de conversiones de constantes DFLOAT a UINT en pasaje de parametros de funciones
     @_('TRUNC "(" expresion ")" ARROW ID')
     def parametros_invocacion(self, p):
-        print(f"Línea {p.lineno}: Se reconoció truncamiento de DFLOAT a UINT en la expresión '{p.expresion}'.")
+        if TRAZA.sintactico:
+            TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"Línea {p.lineno}: Se reconoció truncamiento de DFLOAT a UINT en la expresión '{p.expresion}'.")
         return [(Trunc(expr=p.expresion), p.ID)]
     #Fin de reglas conversiones
 
@@ -888,7 +1141,7 @@ class AnalisisSintactico(Parser):
     @_('UINT lista_ids error')
     def sentencia(self, p):
         self.registrar_error("Se esperaba ';' al final de la declaración de variables.", p)
-        return DeclVar(tipo_decl=Tipo.UINT, ids=p.lista_ids)
+        return DeclVar(tipo_decl=Tipo.UINT, ids=self._cerrar(p.lista_ids))
 
     
     
@@ -1037,7 +1290,7 @@ class AnalisisSintactico(Parser):
     @_('UINT lista_ids error')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Se esperaba ';' al final de la declaración de variables.", p)
-        return DeclVar(tipo_decl=Tipo.UINT, ids=p.lista_ids)
+        return DeclVar(tipo_decl=Tipo.UINT, ids=self._cerrar(p.lista_ids))
     
     
     @_('ID ASSIGN_PASCAL expresion error')
@@ -1063,14 +1316,14 @@ class AnalisisSintactico(Parser):
     @_('DO bloque_sentencias WHILE "(" condicion ")" error')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Se esperaba ';' al final de la sentencia DO-WHILE.", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     @_('lista_ids ASSIGN lista_expr_const error')
     def sentencia_de_funcion(self, p):
         if len(p.lista_ids) > len(p.lista_expr_const):
             self.registrar_error("Se esperaba ';' al final de la declaración de variables.", p)
             return ErrorNodo(mensaje="Aridad en multi-asignación")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const)
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const)
      #Fin de manejo de errores en sentencias dentro de funciones
 
     
@@ -1080,7 +1333,7 @@ class AnalisisSintactico(Parser):
     @_('PRINT "(" CADENA ")" error')
     def print(self, p):
         self.registrar_error("Se esperaba ';' al final de la sentencia PRINT con cadena.", p)
-        return Print(expr=Literal(valor=p.CADENA, tipo=Tipo.STRING))
+        return Print(expr=lit_string(p.CADENA, compartidos=self._literales))
 
 
     @_('PRINT "(" expresion ")" error')
@@ -1096,7 +1349,7 @@ class AnalisisSintactico(Parser):
     @_('DO bloque_sentencias WHILE "(" condicion ")" error')
     def sentencia(self, p):
         self.registrar_error("Se esperaba ';' al final de la sentencia DO-WHILE.", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     #Fin de manejo de error ; en DO-WHILE
 
@@ -1109,12 +1362,12 @@ class AnalisisSintactico(Parser):
         if len(p.lista_ids) > len(p.lista_expr_const):
             self.registrar_error("Se esperaba ';' al final de la declaración de variables.", p)
             return ErrorNodo(mensaje="Aridad en multi-asignación")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const)
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const)
     
     @_('ID ASSIGN_PASCAL expresion error')
     def sentencia(self, p):
         self.registrar_error("Se esperaba ';' al final de la asignación por pascal.", p)
-        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno), expr=p.expresion)
+        return Asignacion(destino=Identificador(nombre=p.ID, linea=p.lineno, index=p.index), expr=p.expresion)
 
     
     @_('id_calificado ASSIGN_PASCAL expresion error')
@@ -1145,12 +1398,12 @@ class AnalisisSintactico(Parser):
     @_('UINT "(" parametros ")" "{" sentencias_de_funcion final_funcion "}" ')
     def sentencia(self, p):
         self.registrar_error("Se esperaba un nombre de función (ID) después del tipo de retorno 'UINT'.", p)
-        return ('FUNCION_SIN_NOMBRE', p.parametros, p.sentencias_de_funcion)
+        return ('FUNCION_SIN_NOMBRE', self._cerrar(p.parametros), p.sentencias_de_funcion)
     
     @_('UINT "(" parametros ")" "{" sentencias_de_funcion final_funcion "}" ')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Se esperaba un nombre de función (ID) después del tipo de retorno 'UINT'.", p)
-        return ('FUNCION_SIN_NOMBRE', p.parametros, p.sentencias_de_funcion)
+        return ('FUNCION_SIN_NOMBRE', self._cerrar(p.parametros), p.sentencias_de_funcion)
     #Fin de reglas de manejo de faltante de nombre de funcion
 
 
@@ -1159,7 +1412,7 @@ class AnalisisSintactico(Parser):
     @_('ID lista_ids')
     def lista_ids(self, p):
         self.registrar_error("Se esperaba ',' entre los identificadores en la declaración de variables.", p)
-        return [p.ID] + p.lista_ids
+        return self._anteponer(Identificador(nombre=p.ID, linea=p.lineno, index=p.index), p.lista_ids)
     #Fin de regla de manejo de error de faltante de coma en la declaracion de variables
 
 
@@ -1167,45 +1420,45 @@ class AnalisisSintactico(Parser):
     @_('CV UINT "," parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba un nombre de parámetro (ID) después de 'CV UINT'.", p)
-        return [p.ID] + p.parametros
+        return p.parametros
     
 
     @_('UINT "," parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba un nombre de parámetro (ID) después de 'UINT'.", p)
-        return [p.ID] + p.parametros
+        return p.parametros
 
     @_('CV UINT')
     def parametros(self, p):
        self.registrar_error("Se esperaba un nombre de parámetro (ID) después de 'CV UINT'.", p)
-       return None
+       return []
 
     @_('UINT')
     def parametros(self, p):
        self.registrar_error("Se esperaba un nombre de parámetro (ID) después de 'UINT'.", p)
-       return None
+       return []
     #Fin de regla de manejo de error de falta de nombre del parametro formal en declaracion de funciones
 
     #Reglas de manejo de error de falta de tipo de parametro formal en declaracion de funciones
     @_('CV ID "," parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba un tipo de parámetro (UINT) después de CV y antes del nombre '{p.ID}'.", p)
-        return [p.ID] + p.parametros
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False), p.parametros)
     
     @_('ID "," parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba un tipo de parámetro (UINT) antes del nombre '{p.ID}'.", p)
-        return [p.ID] + p.parametros
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True), p.parametros)
     
     @_('CV ID')
     def parametros(self, p):
         self.registrar_error("Se esperaba un tipo de parámetro (UINT) después de CV y antes del nombre '{p.ID}'.", p)
-        return [p.ID]
+        return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False)]
     
     @_('ID')
     def parametros(self, p):
         self.registrar_error("Se esperaba un tipo de parámetro (UINT) antes del nombre '{p.ID}'.", p)
-        return Identificador(nombre=p.ID)
+        return [Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True)]
     #Fin de regla de manejo de error de falta de tipo de parametro formal en declaracion de funciones
 
 
@@ -1213,11 +1466,11 @@ class AnalisisSintactico(Parser):
     @_('CV UINT ID error parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba ',' entre los parámetros en la declaración de la función.", p)
-        return [p.ID] + p.parametros    
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=False), p.parametros)    
     @_('UINT ID error parametros')
     def parametros(self, p):
         self.registrar_error("Se esperaba ',' entre los parámetros en la declaración de la función.", p)
-        return [p.ID] + p.parametros
+        return self._anteponer(Parametro(nombre=p.ID, tipo=Tipo.UINT, por_ref=True), p.parametros)
     #Fin de regla para el manejo de error de falta de , en la lista de parametros de una funcion.
 
 
@@ -1225,7 +1478,8 @@ class AnalisisSintactico(Parser):
     @_('parametros_invocacion "," expresion ARROW error')
     def parametros_invocacion(self, p):
         self.registrar_error("Se esperaba un parametro formal correspondiente al parametro real.", p)
-        return p.parametros_invocacion + [('Se pasa', p.expresion)]
+        p.parametros_invocacion.append(('Se pasa', p.expresion))
+        return p.parametros_invocacion
     
     @_('expresion ARROW error')
     def parametros_invocacion(self, p):
@@ -1250,36 +1504,36 @@ class AnalisisSintactico(Parser):
     @_('DO bloque_sentencias WHILE error condicion ")" ";"')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Falta parentesis izquierdo en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
 
     @_('DO bloque_sentencias WHILE error condicion ")" ";"')
     def sentencia(self, p):
         self.registrar_error("Falta parentesis izquierdo en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     
     @_('DO bloque_sentencias WHILE "(" condicion error ";"')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Falta parentesis derecho en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     
     @_('DO bloque_sentencias WHILE "(" condicion error ";"')
     def sentencia(self, p):
         self.registrar_error("Falta parentesis derecho en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     
     @_('DO bloque_sentencias WHILE error condicion error ";"')
     def sentencia(self, p):
         self.registrar_error("Falta ambos parentesis en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
     
     @_('DO bloque_sentencias WHILE error condicion error ";"')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Falta ambos parentesis en DO-WHILE", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
     #Fin de manejo de errores de falta de parentesis en sentencia While
 
 
@@ -2110,7 +2364,7 @@ class AnalisisSintactico(Parser):
     @_('DO bloque_sentencias error "(" condicion ")" ";"')
     def sentencia(self, p):
         self.registrar_error("Se reconoció sentencia DO-WHILE sin la palabra reservada 'WHILE'.", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
     
     @_('DO bloque_sentencias error condicion ")" ";"')
     def sentencia(self, p):
@@ -2125,7 +2379,7 @@ class AnalisisSintactico(Parser):
     @_('DO bloque_sentencias error "(" condicion ")" ";"')
     def sentencia_de_funcion(self, p):
         self.registrar_error("Se reconoció sentencia DO-WHILE sin la palabra reservada 'WHILE'.", p)
-        return DoWhile(cuerpo=Bloque(sentencias=p.bloque_sentencias), condicion=p.condicion)
+        return DoWhile(cuerpo=Bloque(sentencias=self._sentencias(p.bloque_sentencias)), condicion=p.condicion)
 
     
     @_('DO bloque_sentencias error condicion ")" ";"')
@@ -2149,14 +2403,14 @@ class AnalisisSintactico(Parser):
         if len(p.lista_ids) > len(p.lista_expr_const):
             self.registrar_error("Error semantico: menos expresiones que variables en multi-asignacion.", p)
             return ErrorNodo(mensaje="Aridad en multi-asignación")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const)
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const)
     
     @_('lista_ids ASSIGN error expr_const ";"')
     def sentencia(self, p):
         if len(p.lista_ids) > len(p.lista_expr_const):
             self.registrar_error("Error semantico: menos expresiones que variables en multi-asignacion.", p)
             return ErrorNodo(mensaje="Aridad en multi-asignación")
-        return MultiAsignacion(destinos=p.lista_ids, expresiones=p.lista_expr_const)
+        return MultiAsignacion(destinos=self._cerrar(p.lista_ids), expresiones=p.lista_expr_const)
     #Fin de manejo de errores de falta de "," en lista de elementos de lado izquierdo o de lado derecho(tema 17)
     
     
@@ -0,0 +1,71 @@
+"""
+Recorridos del AST sin recursion de Python: la pila es una lista, asi que una
+cadena A + B + C + ... de cien mil operandos o muchos if/do-while anidados no
+llegan al limite de recursion ni hacen caer al interprete.
+
+    recorrer(raiz, hijos, entrar, salir)
+        Recorrido en profundidad. entrar(nodo, padre, nivel) se llama en
+        preorden (si devuelve False no se baja a los hijos de ese nodo; si
+        devuelve DETENER se termina el recorrido, sin llamar a salir) y
+        salir(nodo, padre, nivel) en postorden. hijos(nodo) da un iterable
+        con los hijos en orden (por ejemplo Nodo.iter_hijos); se visitan de
+        izquierda a derecha. La pila guarda el iterador de hijos de cada nodo
+        abierto, asi que no se arma ninguna lista por nodo.
+
+    ejecutar(paso, *args)
+        Para visitantes que necesitan el resultado de cada hijo y hacer algo
+        entre un hijo y el siguiente (el analisis semantico). paso(*args)
+        devuelve el resultado o un generador; el generador pide visitar un
+        hijo con `resultado = yield args_del_hijo` y termina con return. El
+        codigo antes del primer yield hace de entrada y el de despues del
+        ultimo, de salida. salir(args, resultado), si se pasa, se aplica al
+        resultado de cada paso.
+"""
+from types import GeneratorType
+
+
+DETENER = object()
+
+
+def recorrer(raiz, hijos, entrar=None, salir=None):
+    if entrar is not None:
+        resultado = entrar(raiz, None, 0)
+        if resultado is False or resultado is DETENER:
+            return
+    pila = [(raiz, None, 0, iter(hijos(raiz)))]
+    while pila:
+        nodo, padre, nivel, pendientes = pila[-1]
+        for hijo in pendientes:
+            resultado = None if entrar is None else entrar(hijo, nodo, nivel + 1)
+            if resultado is DETENER:
+                return
+            if resultado is not False:
+                pila.append((hijo, nodo, nivel + 1, iter(hijos(hijo))))
+            break
+        else:
+            pila.pop()
+            if salir is not None:
+                salir(nodo, padre, nivel)
+
+
+def ejecutar(paso, *args, salir=None):
+    resultado = paso(*args)
+    if resultado.__class__ is not GeneratorType:
+        return resultado if salir is None else salir(args, resultado)
+    pila = [(resultado, args)]
+    enviar = None
+    while pila:
+        generador, args = pila[-1]
+        try:
+            pedido = generador.send(enviar)
+        except StopIteration as fin:
+            pila.pop()
+            enviar = fin.value if salir is None else salir(args, fin.value)
+            continue
+        resultado = paso(*pedido)
+        if resultado.__class__ is GeneratorType:
+            pila.append((resultado, pedido))
+            enviar = None
+        else:
+            enviar = resultado if salir is None else salir(pedido, resultado)
+    return enviar
@@ -1,7 +1,85 @@
 #Definición de la tabla de símbolos
+#
+#Las entradas se guardan por columnas: una fila por símbolo y un arreglo por
+#atributo (tipo, valor, línea, uso), en vez de un diccionario por entrada.
+#  _indice   clave (lexema) -> fila. Renombrar solo mueve la clave en el índice.
+#  _tipo     código de tipo (array 'H'); los tipos distintos están en _tipos
+#  _linea    array 'q' (-1 = sin línea)
+#  _uso      máscara de bits (array 'Q') sobre _usos: un bit por uso conocido
+#La entrada como diccionario solo se arma al pedirla por `simbolos`.
+#
+#Exportación: exportar_texto/csv/jsonl/binario escriben fila por fila en un
+#archivo abierto, sin armar la tabla entera en memoria (EXPORTADORES los
+#indexa por formato; leer_binario lee el formato binario).
+import csv
+import io
+import json
+from array import array
+from collections.abc import Mapping
+
+from Trazas import TRAZA, TABLA, AVISO
+
+SIN_LINEA = -1
+
+# Usos que asigna el compilador, en el orden en que se muestran combinados.
+# Un uso desconocido toma el bit siguiente.
+USOS_CONOCIDOS = (
+    "nombre de programa",
+    "nombre de variable",
+    "nombre de funcion",
+    "parametro-cv",
+    "parametro-cvr",
+    "constante",
+)
+MAX_USOS = 64
+
+FORMATO_FILA = "{:<25} {:<15} {:<25} {:<35} {:<10}\n"
+COLUMNAS = ("lexema", "tipo", "valor", "uso", "linea")
+
+# Formato binario (enteros sin signo en LEB128, textos como largo + UTF-8):
+#   "TDS1" | filas | tipos (cantidad + textos) | usos (cantidad + textos) | fila...
+#   fila = lexema | código de tipo | valor | máscara de uso | línea + 1 (0 = sin línea)
+#   valor = 0 (ninguno) | 1 + entero en zigzag | 2 + texto
+MAGIA_BINARIO = b"TDS1"
+
+
+class VistaSimbolos(Mapping):
+    #Vista de solo lectura: lexema -> entrada {'lexema','tipo','valor','linea','uso'}.
+    #Cada entrada se arma al pedirla; modificarla no cambia la tabla.
+    __slots__ = ("_tabla",)
+
+    def __init__(self, tabla):
+        self._tabla = tabla
+
+    def __getitem__(self, lexema):
+        return self._tabla._entrada(self._tabla._indice[lexema])
+
+    def __contains__(self, lexema):
+        return lexema in self._tabla._indice
+
+    def __iter__(self):
+        return iter(self._tabla._indice)
+
+    def __len__(self):
+        return len(self._tabla._indice)
+
+
 class TablaDeSimbolos:
     def __init__(self):
-        self.simbolos = {}  # Diccionario para almacenar los símbolos
+        self._indice = {}           # lexema -> fila
+        self._claves = []           # fila -> lexema actual
+        self._tipo = array('H')
+        self._valor = []
+        self._linea = array('q')
+        self._uso = array('Q')
+        self._tipos = []            # código -> tipo
+        self._codigo_tipo = {}      # tipo -> código
+        self._usos = []             # bit -> uso
+        self._bit_uso = {}          # uso -> máscara
+        self._texto_uso = {0: 'N/A'}  # máscara -> texto ("uso1-uso2")
+        for uso in USOS_CONOCIDOS:
+            self._registrar_uso(uso)
+        self.simbolos = VistaSimbolos(self)
 
     def _to_tipo_str(self, tipo):
         #Acepta enums (p.ej. Tipo.UINT) o strings y devuelve un string de tipo.
@@ -9,57 +87,96 @@ class TablaDeSimbolos:
             return tipo.name  # Enum
         except Exception:
             return str(tipo)
-        
+
+    def _codigo(self, tipo):
+        codigo = self._codigo_tipo.get(tipo)
+        if codigo is None:
+            codigo = self._codigo_tipo[tipo] = len(self._tipos)
+            self._tipos.append(tipo)
+        return codigo
+
+    def _registrar_uso(self, uso):
+        if len(self._usos) == MAX_USOS:
+            raise ValueError(f"Demasiados usos distintos en la tabla de símbolos (máximo {MAX_USOS})")
+        mascara = self._bit_uso[uso] = 1 << len(self._usos)
+        self._usos.append(uso)
+        return mascara
+
+    def _texto(self, mascara):
+        texto = self._texto_uso.get(mascara)
+        if texto is None:
+            texto = self._texto_uso[mascara] = "-".join(
+                uso for i, uso in enumerate(self._usos) if mascara >> i & 1)
+        return texto
+
+    def _nueva_fila(self, lexema, tipo, valor, linea, mascara):
+        fila = self._indice[lexema] = len(self._claves)
+        self._claves.append(lexema)
+        self._tipo.append(self._codigo(tipo))
+        self._valor.append(valor)
+        self._linea.append(SIN_LINEA if linea is None else linea)
+        self._uso.append(mascara)
+        return fila
+
+    def _entrada(self, fila):
+        linea = self._linea[fila]
+        return {
+            'lexema': self._claves[fila],
+            'tipo': self._tipos[self._tipo[fila]],
+            'valor': self._valor[fila],
+            'linea': None if linea == SIN_LINEA else linea,
+            'uso': self._texto(self._uso[fila]),
+        }
+
     def agregar(self, lexema, tipo, valor=None, linea=None):    #Por si se desconoce el valor o linea
-        if lexema not in self.simbolos:
+        fila = self._indice.get(lexema)
+        if fila is None:
             # Si el símbolo es nuevo, lo creamos
-            entrada = {
-                'lexema': lexema,
-                'tipo': tipo,
-                'valor': valor,
-                'linea': linea,
-                'uso': 'N/A'
-            }
-            self.simbolos[lexema] = entrada
+            fila = self._nueva_fila(lexema, tipo, valor, linea, 0)
         else:
-            print(f"Warning: El símbolo '{lexema}' ya existe en la tabla de símbolos.")
+            if TRAZA.tabla:
+                TRAZA.emitir(TABLA, AVISO, linea, f"Warning: El símbolo '{lexema}' ya existe en la tabla de símbolos.")
         # Devolvemos la entrada
-        return self.simbolos[lexema]
-    
+        return self._entrada(fila)
+
 
     def asignar_tipo(self, lexema, tipo):
         #Método para asignar o actualizar el tipo de un símbolo existente en la tabla.
         tipo_str = self._to_tipo_str(tipo)
-        if lexema not in self.simbolos:
+        fila = self._indice.get(lexema)
+        if fila is None:
             # Si no existe, lo crea (útil si el lexer no lo vio)
             self.agregar(lexema, tipo_str)
             return
         # Si existe, actualiza el tipo
-        self.simbolos[lexema]['tipo'] = tipo_str
+        self._tipo[fila] = self._codigo(tipo_str)
 
 
     def renombrar(self, clave_vieja, clave_nueva):
         #Cambia la clave de una entrada y actualiza 'lexema' sin perder la info.Retorna True si se renombró, False si no existía o la nueva ya existe.
-        if clave_vieja in self.simbolos and clave_nueva not in self.simbolos:
-            entrada = self.simbolos.pop(clave_vieja)
-            entrada['lexema'] = clave_nueva
-            self.simbolos[clave_nueva] = entrada
+        #La fila queda igual: solo se mueve la clave en el índice (al final, como antes).
+        if clave_vieja in self._indice and clave_nueva not in self._indice:
+            fila = self._indice.pop(clave_vieja)
+            self._indice[clave_nueva] = fila
+            self._claves[fila] = clave_nueva
             return True
         return False
-    
-    
+
+
     def asignar_uso(self, lexema, uso_str):
-        #Asigna o añade un uso a un símbolo existente.
-        if lexema in self.simbolos:
-            entrada = self.simbolos[lexema]
-            # CORRECCIÓN: Usar .get() para leer de forma segura
-            current_uso = entrada.get('uso', 'N/A')
-            if current_uso == 'N/A' or not current_uso:
-                entrada['uso'] = uso_str
-            else:
-                # Evita añadir el mismo uso dos veces seguidas
-                if uso_str not in current_uso.split('-'):
-                    entrada['uso'] += f"-{uso_str}"
+        #Asigna o añade un uso a un símbolo existente. Un uso repetido no se vuelve a agregar.
+        fila = self._indice.get(lexema)
+        if fila is not None:
+            mascara = self._bit_uso.get(uso_str)
+            if mascara is None:
+                mascara = self._registrar_uso(uso_str)
+            self._uso[fila] |= mascara
+
+
+    def tiene_uso(self, lexema, uso_str):
+        fila = self._indice.get(lexema)
+        mascara = self._bit_uso.get(uso_str)
+        return fila is not None and mascara is not None and bool(self._uso[fila] & mascara)
 
 
     def agregar_negativo(self, lexema_original, linea=None):
@@ -72,39 +189,143 @@ class TablaDeSimbolos:
             valor_original = lexema_original[0]
         else:
             valor_original = str(lexema_original)
-        
+
         # Crear el lexema para el número negativo
         lexema_negativo = f"-{valor_original}"
-        
+
         # Crear una nueva entrada para el número negativo
-        if lexema_negativo not in self.simbolos:
-            entrada = {
-                'lexema': lexema_negativo,
-                'tipo': 'DFLOAT_CONST',
-                'valor': f"-{valor_original}",
-                'linea': linea,
-                'uso': 'constante'
-            }
-            self.simbolos[lexema_negativo] = entrada
+        fila = self._indice.get(lexema_negativo)
+        if fila is None:
+            fila = self._nueva_fila(lexema_negativo, 'DFLOAT_CONST', lexema_negativo, linea,
+                                    self._bit_uso['constante'])
         else:
-            print(f"Warning: El símbolo '{lexema_negativo}' ya existe en la tabla de símbolos.")
-        
-        return self.simbolos[lexema_negativo]
+            if TRAZA.tabla:
+                TRAZA.emitir(TABLA, AVISO, linea, f"Warning: El símbolo '{lexema_negativo}' ya existe en la tabla de símbolos.")
+
+        return self._entrada(fila)
+
+    def filas(self):
+        #(lexema, tipo, valor, uso, linea) por cada símbolo, en el orden de la tabla.
+        for lexema, fila in self._indice.items():
+            linea = self._linea[fila]
+            yield (lexema, self._tipos[self._tipo[fila]], self._valor[fila],
+                   self._texto(self._uso[fila]), None if linea == SIN_LINEA else linea)
+
+    def exportar_texto(self, archivo):
+        archivo.write("   TABLA DE SÍMBOLOS   \n")
+        archivo.write(FORMATO_FILA.format("Lexema", "Tipo", "Valor", "Uso", "Línea"))
+        archivo.write("-" * 115 + "\n")
+        for lexema, tipo, valor, uso, linea in self.filas():
+            archivo.write(FORMATO_FILA.format(
+                lexema,
+                tipo,
+                str(valor) if valor is not None else "N/A",
+                uso,
+                str(linea) if linea is not None else "N/A"
+            ))
+        archivo.write("\n")
+
+    def exportar_csv(self, archivo):
+        #El archivo se abre con newline=""; sin valor o sin línea queda el campo vacío.
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS)
+        for lexema, tipo, valor, uso, linea in self.filas():
+            escritor.writerow((lexema, self._to_tipo_str(tipo), valor, uso, linea))
+
+    def exportar_jsonl(self, archivo):
+        #Un objeto por línea. El lexema va como texto (str de un Nombre).
+        for lexema, tipo, valor, uso, linea in self.filas():
+            archivo.write(json.dumps({"lexema": str(lexema), "tipo": self._to_tipo_str(tipo),
+                                      "valor": valor if valor is None or isinstance(valor, (int, float)) else str(valor),
+                                      "uso": uso, "linea": linea}, ensure_ascii=False) + "\n")
+
+    def exportar_binario(self, archivo):
+        #El archivo se abre en modo binario ("wb").
+        archivo.write(MAGIA_BINARIO + _uleb(len(self._indice)))
+        archivo.write(_uleb(len(self._tipos)) + b"".join(_texto_binario(self._to_tipo_str(t)) for t in self._tipos))
+        archivo.write(_uleb(len(self._usos)) + b"".join(_texto_binario(u) for u in self._usos))
+        for lexema, fila in self._indice.items():
+            valor = self._valor[fila]
+            if valor is None:
+                valor_bin = b"\x00"
+            elif isinstance(valor, int):
+                valor_bin = b"\x01" + _uleb(valor << 1 if valor >= 0 else (-valor << 1) - 1)
+            else:
+                valor_bin = b"\x02" + _texto_binario(str(valor))
+            archivo.write(_texto_binario(str(lexema)) + _uleb(self._tipo[fila]) + valor_bin
+                          + _uleb(self._uso[fila]) + _uleb(self._linea[fila] + 1))
 
     def __str__(self):
-        s = "   TABLA DE SÍMBOLOS   \n"
-        s += "{:<25} {:<15} {:<25} {:<35} {:<10}\n".format("Lexema", "Tipo", "Valor", "Uso", "Línea")
-        s += "-" * 115 + "\n"
-        for lexema, entrada in self.simbolos.items():
-            valor_str = str(entrada['valor']) if entrada['valor'] is not None else "N/A"
-            linea_str = str(entrada['linea']) if entrada['linea'] is not None else "N/A"
-            uso_str = str(entrada.get('uso', 'N/A')) # Usar .get() para seguridad
-            s += "{:<25} {:<15} {:<25} {:<35} {:<10}\n".format(
-                entrada['lexema'],
-                entrada['tipo'],
-                valor_str,
-                uso_str,
-                linea_str
-            )
-        s += "\n"
-        return s
+        buffer = io.StringIO()
+        self.exportar_texto(buffer)
+        return buffer.getvalue()
+
+
+EXPORTADORES = {
+    "texto": TablaDeSimbolos.exportar_texto,
+    "csv": TablaDeSimbolos.exportar_csv,
+    "jsonl": TablaDeSimbolos.exportar_jsonl,
+    "binario": TablaDeSimbolos.exportar_binario,
+}
+
+
+def _uleb(n):
+    salida = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            salida.append(byte | 0x80)
+        else:
+            salida.append(byte)
+            return bytes(salida)
+
+
+def _texto_binario(texto):
+    datos = texto.encode("utf-8")
+    return _uleb(len(datos)) + datos
+
+
+def _leer_uleb(archivo):
+    n = desplazamiento = 0
+    while True:
+        byte = archivo.read(1)
+        if not byte:
+            raise ValueError("Tabla binaria truncada")
+        n |= (byte[0] & 0x7F) << desplazamiento
+        if byte[0] < 0x80:
+            return n
+        desplazamiento += 7
+
+
+def _leer_texto(archivo):
+    largo = _leer_uleb(archivo)
+    datos = archivo.read(largo)
+    if len(datos) != largo:
+        raise ValueError("Tabla binaria truncada")
+    return datos.decode("utf-8")
+
+
+def leer_binario(archivo):
+    #Lee lo que escribió exportar_binario: un diccionario por fila, con las claves de COLUMNAS.
+    if archivo.read(len(MAGIA_BINARIO)) != MAGIA_BINARIO:
+        raise ValueError("No es una tabla de símbolos binaria")
+    filas = _leer_uleb(archivo)
+    tipos = [_leer_texto(archivo) for _ in range(_leer_uleb(archivo))]
+    usos = [_leer_texto(archivo) for _ in range(_leer_uleb(archivo))]
+    for _ in range(filas):
+        lexema = _leer_texto(archivo)
+        tipo = tipos[_leer_uleb(archivo)]
+        clase = archivo.read(1)
+        if clase == b"\x00":
+            valor = None
+        elif clase == b"\x01":
+            z = _leer_uleb(archivo)
+            valor = z >> 1 if not z & 1 else -((z + 1) >> 1)
+        else:
+            valor = _leer_texto(archivo)
+        mascara = _leer_uleb(archivo)
+        uso = "-".join(u for i, u in enumerate(usos) if mascara >> i & 1) or "N/A"
+        linea = _leer_uleb(archivo) - 1
+        yield {"lexema": lexema, "tipo": tipo, "valor": valor, "uso": uso,
+               "linea": None if linea == SIN_LINEA else linea}
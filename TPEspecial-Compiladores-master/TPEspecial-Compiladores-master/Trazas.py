@@ -0,0 +1,92 @@
+"""
+Trazas del compilador: eventos tipados que emiten el parser (reglas
+reconocidas), el lexer (avisos de truncamiento/rango) y la tabla de simbolos
+(simbolos repetidos).
+
+Los puntos de emision preguntan primero por el flag de su categoria:
+
+    if TRAZA.sintactico:
+        TRAZA.emitir(SINTACTICO, INFO, p.lineno, f"...")
+
+asi, sin destinos registrados, no se arma ningun string ni se crea ningun
+evento. Los destinos (archivo de texto, buffer circular, JSON lines) se
+registran con TRAZA.agregar_destino().
+"""
+import json
+from collections import deque
+from typing import NamedTuple, Optional
+
+# Categorias
+SINTACTICO = 'sintactico'
+LEXICO = 'lexico'
+TABLA = 'tabla'
+CATEGORIAS = (SINTACTICO, LEXICO, TABLA)
+
+# Niveles
+INFO = 'INFO'
+AVISO = 'AVISO'
+ERROR = 'ERROR'
+
+
+class Evento(NamedTuple):
+    categoria: str
+    nivel: str
+    linea: Optional[int]
+    mensaje: str
+
+
+class DestinoTexto:
+    # Un evento por linea, con el mismo texto que antes se imprimia
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def escribir(self, evento):
+        self.archivo.write(evento.mensaje + "\n")
+
+
+class DestinoJSONL:
+    # Un objeto JSON por linea: {"categoria", "nivel", "linea", "mensaje"}
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def escribir(self, evento):
+        self.archivo.write(json.dumps(evento._asdict(), ensure_ascii=False) + "\n")
+
+
+class DestinoBufferCircular:
+    # Guarda solo los ultimos `capacidad` eventos (memoria acotada)
+    def __init__(self, capacidad):
+        self.eventos = deque(maxlen=capacidad)
+
+    def escribir(self, evento):
+        self.eventos.append(evento)
+
+
+class Trazador:
+    def __init__(self):
+        self._destinos = []
+        self._actualizar_flags()
+
+    def agregar_destino(self, destino, categorias=CATEGORIAS):
+        self._destinos.append((destino, frozenset(categorias)))
+        self._actualizar_flags()
+        return destino
+
+    def quitar_destinos(self):
+        self._destinos = []
+        self._actualizar_flags()
+
+    def _actualizar_flags(self):
+        # Un atributo bool por categoria: es lo unico que se consulta en los puntos de emision
+        for categoria in CATEGORIAS:
+            setattr(self, categoria, any(categoria in cats for _, cats in self._destinos))
+
+    def emitir(self, categoria, nivel, linea, mensaje):
+        evento = Evento(categoria, nivel, linea, mensaje)
+        for destino, categorias in self._destinos:
+            if categoria in categorias:
+                destino.escribir(evento)
+
+
+# Trazador global del compilador
+TRAZA = Trazador()
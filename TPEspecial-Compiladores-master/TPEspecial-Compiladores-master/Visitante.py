@@ -0,0 +1,40 @@
+"""
+Base para los recorridos del AST con despacho por clase de nodo.
+
+Cada recorrido define un metodo por clase de nodo con un prefijo comun
+(AnalisisSemantico usa _v_Binario, _v_Literal, ...; GeneradorWasm usa
+_s_DeclVar, _s_Si, ...). Antes cada visita armaba el nombre con un f-string
+y lo buscaba con getattr; ahora el metodo de cada clase se resuelve una sola
+vez y queda en una tabla indexada por la clase:
+
+    metodo = self.metodo_para(n.__class__)    # funcion sin ligar o None
+    if metodo:
+        metodo(self, n, ...)
+
+La busqueda sigue el MRO de la clase del nodo, asi una subclase (por ejemplo
+las vistas de ArenaAST, que heredan de Binario) usa el metodo de su base.
+Cada subclase de Visitante tiene su propia tabla.
+"""
+
+
+class Visitante:
+    PREFIJO = "_v_"
+    _despacho = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._despacho = {}
+
+    @classmethod
+    def metodo_para(cls, clase_nodo):
+        try:
+            return cls._despacho[clase_nodo]
+        except KeyError:
+            pass
+        metodo = None
+        for base in clase_nodo.__mro__:
+            metodo = getattr(cls, cls.PREFIJO + base.__name__, None)
+            if metodo is not None:
+                break
+        cls._despacho[clase_nodo] = metodo
+        return metodo
@@ -0,0 +1,103 @@
+"""
+Resolucion de nombres con funciones muy anidadas.
+
+Programa generado: N funciones anidadas, cada una con una variable propia, y
+en cada nivel asignaciones que leen las variables de los primeros niveles y
+un identificador prefijado con el nombre del primer nivel (F1.V1). Con la
+cadena de padres cada uso sube casi N ambitos y cada declaracion arma la ruta
+entera; con los indices de Ambito cada busqueda es un acceso a diccionario.
+
+AmbitoEncadenado reproduce el Ambito anterior (resolver, ambito_visible y
+get_mangled_path recorriendo los padres) y se compara el analisis semantico
+con uno y otro. Antes se verifica que los diagnosticos y la tabla de simbolos
+sean los mismos.
+
+Uso:
+    python benchmarks/bench_ambitos.py [niveles...]     (por defecto 100 400 1600)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import AnalisisSemantico as semantico
+from LexerManual import AnalisisLexicoManual
+from Nombres import reiniciar
+from generar_parser import cargar_analizador_sintactico
+
+
+class AmbitoEncadenado(semantico.Ambito):
+    def get_mangled_path(self):
+        partes = []
+        a = self
+        while a is not None:
+            partes.append(a.nombre)
+            a = a.padre
+        return ":" + ":".join(map(str, reversed(partes)))
+
+    def resolver(self, nombre):
+        amb = self
+        while amb:
+            if nombre in amb.simbolos:
+                return amb.simbolos[nombre]
+            amb = amb.padre
+        return None
+
+    def ambito_visible(self, nombre):
+        amb = self
+        while amb and amb.nombre != nombre:
+            amb = amb.padre
+        return amb
+
+
+def fuente(niveles):
+    partes = ["PROG {\n    uint G;\n"]
+    for i in range(1, niveles + 1):
+        partes.append(f"uint F{i}(uint P{i}) {{\n    uint V{i};\n")
+        partes.append(f"    V{i} := G + V1 + P1 + F1.V1;\n")
+    for i in range(niveles, 0, -1):
+        if i < niveles:
+            partes.append(f"    F{i + 1}(V{i}->P{i + 1})\n")
+        partes.append(f"    return(V{i});\n}}\n")
+    partes.append("    F1(G->P1)\n}\n")
+    return "".join(partes)
+
+
+def analizar(Parser, texto, Ambito):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+
+    anterior = semantico.Ambito
+    semantico.Ambito = Ambito
+    try:
+        gc.collect()
+        inicio = time.perf_counter()
+        arbol = semantico.AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+        duracion = time.perf_counter() - inicio
+    finally:
+        semantico.Ambito = anterior
+    return duracion, [str(d) for d in arbol.diag], sorted(map(str, lexer.tabla_simbolos.simbolos))
+
+
+def main():
+    lista = [int(a) for a in sys.argv[1:]] or [100, 400, 1600]
+    Parser = cargar_analizador_sintactico()
+    print(f"{'niveles':>8} {'cadena de padres':>17} {'indices':>9} {'mejora':>7}")
+    for niveles in lista:
+        reiniciar()
+        texto = fuente(niveles)
+        t_cadena, diag_cadena, tabla_cadena = analizar(Parser, texto, AmbitoEncadenado)
+        t_indice, diag_indice, tabla_indice = analizar(Parser, texto, semantico.Ambito)
+        assert diag_cadena == diag_indice and tabla_cadena == tabla_indice, "resultados distintos"
+        assert not diag_indice, diag_indice[:3]
+        print(f"{niveles:>8} {t_cadena:>16.3f}s {t_indice:>8.3f}s {t_cadena / t_indice:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
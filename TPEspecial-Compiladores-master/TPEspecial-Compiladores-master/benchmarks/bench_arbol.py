@@ -0,0 +1,146 @@
+"""
+Escritura de un AST grande: imprimir_arbol y to_dot como eran antes (todas
+las lineas en una lista y un join al final; to_dot con un diccionario de
+id() a nombre que guarda cada nodo) contra escribir_arbol y escribir_dot,
+que escriben linea por linea en un archivo y numeran los nodos con un
+contador. Tambien se mide escribir con limites: con max_nodos y profundidad
+no se recorre el resto del arbol; con una sola funcion se la busca sin
+escribir nada.
+
+Para cada uno se mide el tiempo y el pico de memoria (tracemalloc, en una
+segunda pasada). Antes se verifica que la salida sin limites sea la misma.
+
+Uso:
+    python benchmarks/bench_arbol.py [sentencias]     (por defecto 50000)
+"""
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import (AnalisisSemantico, Binario, Identificador, Invocacion, Literal, Nodo, Tipo,
+                               Unario, _hijos_dot, _hijos_impresos, _planos)
+from LexerManual import AnalisisLexicoManual
+from Recorrido import recorrer
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y;\n    uint F(uint P) {\n        return(P + 1UI);\n    }\n"]
+    for i in range(n):
+        if i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X); }} else {{ Y := F(Y -> P); }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + Y;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def imprimir_con_lista(arbol):
+    lineas = []
+    def entrar(n, padre, nivel):
+        pref = "  " * nivel
+        if not isinstance(n, Nodo):
+            lineas.append(f"{pref}{n!r}")
+            return
+        info = f"{pref}{n.__class__.__name__}"
+        if hasattr(n, "tipo") and isinstance(n.tipo, Tipo):
+            info += f" : {n.tipo.name}"
+        lineas.append(info)
+    for raiz in _planos([arbol.raiz]):
+        recorrer(raiz, _hijos_impresos, entrar)
+    return "\n".join(lineas)
+
+
+def dot_con_ids(arbol):
+    lines = ["digraph G {", '  node [shape=box, fontname="Courier"];']
+    idmap = {}
+    def nid(n):
+        key = id(n)
+        if key not in idmap:
+            idmap[key] = (f"n{len(idmap) + 1}", n)
+        return idmap[key][0]
+    def label(n):
+        base = n.__class__.__name__
+        if isinstance(n, (Identificador, Invocacion)):
+            base += f"\\n{n.nombre}"
+        if isinstance(n, Literal):
+            base += f"\\n{n.valor}"
+        if isinstance(n, (Binario, Unario)):
+            base += f"\\n{n.op}"
+        if hasattr(n, "tipo") and isinstance(n.tipo, Tipo):
+            base += f"\\n:{n.tipo.name}"
+        return base
+    def entrar(n, padre, nivel):
+        if isinstance(padre, Nodo):
+            lines.append(f"  {nid(padre)} -> {nid(n)};")
+        if isinstance(n, Nodo):
+            lines.append(f'  {nid(n)} [label="{label(n)}"];')
+    recorrer(arbol.raiz, _hijos_dot, entrar)
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def a_archivo(metodo, **limites):
+    def escribir(arbol, archivo):
+        metodo(arbol, archivo, **limites)
+    return escribir
+
+
+def de_string(funcion):
+    def escribir(arbol, archivo):
+        archivo.write(funcion(arbol))
+    return escribir
+
+
+def medir(escribir, arbol):
+    with open(os.devnull, "w", encoding="utf-8") as archivo:
+        gc.collect()
+        inicio = time.perf_counter()
+        escribir(arbol, archivo)
+        duracion = time.perf_counter() - inicio
+        gc.collect()
+        tracemalloc.start()
+        escribir(arbol, archivo)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return duracion, pico
+
+
+def main():
+    sentencias = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lexer = AnalisisLexicoManual()
+    parser = cargar_analizador_sintactico()()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(fuente(sentencias)))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+
+    assert arbol.imprimir_arbol() == imprimir_con_lista(arbol), "imprimir_arbol cambio"
+    assert arbol.to_dot() == dot_con_ids(arbol), "to_dot cambio"
+    salida = io.StringIO()
+    arbol.escribir_arbol(salida, funcion="F")
+    assert salida.getvalue().startswith("Funcion"), salida.getvalue()[:100]
+
+    clase = type(arbol)
+    print(f"{'':<32} {'tiempo':>8} {'pico de memoria':>16}")
+    for nombre, escribir in (("imprimir_arbol (lista)", de_string(imprimir_con_lista)),
+                             ("escribir_arbol", a_archivo(clase.escribir_arbol)),
+                             ("escribir_arbol max_nodos=1000", a_archivo(clase.escribir_arbol, max_nodos=1000)),
+                             ("escribir_arbol profundidad=2", a_archivo(clase.escribir_arbol, profundidad=2)),
+                             ("escribir_arbol funcion=F", a_archivo(clase.escribir_arbol, funcion="F")),
+                             ("to_dot (ids)", de_string(dot_con_ids)),
+                             ("escribir_dot", a_archivo(clase.escribir_dot)),
+                             ("escribir_dot max_nodos=1000", a_archivo(clase.escribir_dot, max_nodos=1000))):
+        duracion, pico = medir(escribir, arbol)
+        print(f"{nombre:<32} {duracion:>7.3f}s {pico / 2**20:>13.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+AST de dataclasses (un objeto con __dict__ por nodo, listas de hijos) contra
+el AST en arena (ArenaAST.py: arreglos paralelos y vistas).
+
+Se mide con tracemalloc la memoria retenida por cada representacion del
+mismo arbol y los bytes por nodo, y el tiempo del analisis semantico y de la
+generacion de codigo sobre cada una (con las vistas cada acceso a un campo
+pasa por una propiedad). Antes se verifica que el WAT generado sea el mismo.
+
+Uso:
+    python benchmarks/bench_arena.py [sentencias]     (por defecto 50000)
+"""
+import copy
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico
+from ArenaAST import Arena
+from LexerManual import AnalisisLexicoManual
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y;\n"]
+    for i in range(n):
+        if i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X); }} else {{ Y := Y - 1UI; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + Y;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def parsear(Parser, texto):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    return raiz, lexer.tabla_simbolos
+
+
+def memoria_retenida(funcion, *args):
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion(*args)
+    retenido = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return retenido, resultado
+
+
+def compilar(raiz, tabla):
+    inicio = time.perf_counter()
+    arbol = AnalisisSemantico(tabla).analizar_entrada(raiz)
+    medio = time.perf_counter()
+    wat = GeneradorWasm().generar(arbol)
+    return medio - inicio, time.perf_counter() - medio, wat
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    sys.setrecursionlimit(100_000)
+    Parser = cargar_analizador_sintactico()
+
+    raiz, tabla = parsear(Parser, fuente(200))
+    esperado = compilar(raiz, tabla)[2]
+    raiz, tabla = parsear(Parser, fuente(200))
+    assert compilar(Arena.desde_arbol(raiz), tabla)[2] == esperado, "WAT distinto con la arena"
+
+    raiz, tabla = parsear(Parser, fuente(cantidad))
+    # La copia mide lo que ocupa el arbol de objetos sin lo que retuvo el parser
+    mem_objetos, objetos = memoria_retenida(copy.deepcopy, raiz)
+    mem_arena, vista = memoria_retenida(Arena.desde_arbol, raiz)
+    del raiz
+    nodos = len(vista._arena)
+
+    print(f"{nodos} nodos, {len(vista._arena.valores)} valores distintos")
+    print(f"{'':<14} {'memoria MB':>11} {'bytes/nodo':>11} {'semantico':>10} {'generacion':>11}")
+    for nombre, memoria, arbol in (("dataclasses", mem_objetos, objetos), ("arena", mem_arena, vista)):
+        t_sem, t_gen, _ = compilar(arbol, tabla)
+        print(f"{nombre:<14} {memoria / 1e6:>11.1f} {memoria / nodos:>11.1f} {t_sem:>9.2f}s {t_gen:>10.2f}s")
+    print(f"(arreglos de la arena: {vista._arena.memoria() / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Tiempo de arranque del parser: import de Parser en frio (sin cache de tablas
+LALR, se construyen con sly) contra en caliente (tablas leidas del cache).
+
+Uso:
+    python benchmarks/bench_arranque.py [repeticiones]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Parser import RUTA_CACHE_TABLAS
+
+CODIGO = (
+    "import sys, time\n"
+    f"sys.path.insert(0, {RAIZ!r})\n"
+    "t = time.perf_counter()\n"
+    "import Parser\n"
+    "print(time.perf_counter() - t)\n"
+)
+
+
+def medir_import(directorio):
+    # Proceso nuevo en cada medicion: el import tiene que ser el de un arranque real
+    salida = subprocess.run([sys.executable, "-c", CODIGO], cwd=directorio,
+                            capture_output=True, text=True, check=True)
+    return float(salida.stdout.strip().splitlines()[-1])
+
+
+def borrar_cache():
+    try:
+        os.remove(RUTA_CACHE_TABLAS)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    frio, caliente = [], []
+    with tempfile.TemporaryDirectory() as directorio:
+        for _ in range(repeticiones):
+            borrar_cache()
+            frio.append(medir_import(directorio))
+            caliente.append(medir_import(directorio))
+
+    print(f"{'':<10} {'mediana':>10} {'min':>10}")
+    print(f"{'frio':<10} {statistics.median(frio):>9.3f}s {min(frio):>9.3f}s")
+    print(f"{'caliente':<10} {statistics.median(caliente):>9.3f}s {min(caliente):>9.3f}s")
+    print(f"aceleracion: x{statistics.median(frio) / statistics.median(caliente):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Codificacion directa a .wasm (BinarioWasm.py) sobre un programa grande.
+
+Se genera el modulo (generar, que arma el WAT) y despues se lo codifica en
+binario con generar_binario, en los modos con un auxiliar por valor y pila con
+reuso de locales. Se mide el tiempo de cada paso y el tamanio del WAT y del
+.wasm, se verifica que dos codificaciones den los mismos bytes y se muestra si
+el binario es valido segun verificar_binario y, si hay node en el PATH, segun
+WebAssembly.validate. Sin reuso, main pasa el limite de locales por funcion
+de los motores de JavaScript.
+
+Uso:
+    python benchmarks/bench_binario.py [sentencias]     (por defecto 50000)
+"""
+import gc
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico
+from BinarioWasm import verificar_binario
+from LexerManual import AnalisisLexicoManual
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+VALIDAR_CON_NODE = "const fs = require('fs'); process.exit(WebAssembly.validate(fs.readFileSync(process.argv[1])) ? 0 : 1);"
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y, Z;\n    uint F(uint P) {\n        return(P * 2UI + 1UI);\n    }\n"]
+    for i in range(n):
+        if i % 10 == 9:
+            partes.append(f"    Z := 0UI; do {{ X := X + Z * {i % 500}UI; Z := Z + 1UI; }} while (Z < 3UI);\n")
+        elif i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X / (Y + 1UI)); }} else {{ Y := F(Y -> P) + X; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) - Z / 3UI;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def validar_con_node(binario):
+    with tempfile.NamedTemporaryFile(suffix=".wasm", delete=False) as archivo:
+        archivo.write(binario)
+    try:
+        return subprocess.run(["node", "-e", VALIDAR_CON_NODE, archivo.name]).returncode == 0
+    finally:
+        os.remove(archivo.name)
+
+
+def main():
+    sentencias = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lexer = AnalisisLexicoManual()
+    parser = cargar_analizador_sintactico()()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(fuente(sentencias)))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+    node = shutil.which("node")
+
+    print(f"{'':<22} {'generar':>8} {'WAT':>10} {'binario':>8} {'.wasm':>10} {'verificar':>10}  {'valido':<7} node")
+    for nombre, opciones in (("un auxiliar por valor", {}), ("pila + reuso", {"pila": True, "reusar_locales": True})):
+        generador = GeneradorWasm(**opciones)
+        gc.collect()
+        inicio = time.perf_counter()
+        wat = generador.generar(arbol)
+        t_generar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        binario = generador.generar_binario()
+        t_binario = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        errores = verificar_binario(binario)
+        t_verificar = time.perf_counter() - inicio
+        assert generador.generar_binario() == binario, "la codificacion no es determinista"
+        segun_node = ("si" if validar_con_node(binario) else "no") if node else "-"
+        print(f"{nombre:<22} {t_generar:>7.2f}s {len(wat.encode()) / 2**20:>7.1f} MB {t_binario:>7.2f}s "
+              f"{len(binario) / 2**20:>7.1f} MB {t_verificar:>9.2f}s  {'no' if errores else 'si':<7} {segun_node}")
+        for err in errores:
+            print(f"    {err}")
+
+
+if __name__ == "__main__":
+    main()
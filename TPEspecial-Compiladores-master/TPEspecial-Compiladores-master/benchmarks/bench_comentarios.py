@@ -0,0 +1,84 @@
+"""
+Entradas patologicas para el lexer: comentarios de varios megabytes
+(terminados y sin terminar), cadenas sin terminar de una sola linea muy larga
+y muchos comentarios cortos.
+
+Para cada caso se mide el lexer actual (Lexer.py) y, como referencia, el
+costo de las expresiones regulares anteriores (`##(.|\\n)*?##`,
+`##(.|\\n)*`, `"([^"\\n]|\\\\")*`) aplicadas directamente con `re` sobre el
+mismo texto. Con escaneo lineal, el tiempo por MB del lexer se mantiene
+constante al duplicar el tamanio. Tambien se verifica la linea final y la
+cantidad de errores.
+
+Uso:
+    python benchmarks/bench_comentarios.py [mb1 mb2 ...]     (por defecto 1 2 4 8)
+"""
+import os
+import re
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Lexer import AnalisisLexico
+from Nombres import reiniciar
+
+COMENTARIO_ANTERIOR = re.compile(r'##(.|\n)*?##')
+COMENTARIO_ABIERTO_ANTERIOR = re.compile(r'##(.|\n)*')
+CADENA_ABIERTA_ANTERIOR = re.compile(r'"([^"\n]|\\")*')
+
+
+def casos(megabytes):
+    # nombre -> (texto, regex anterior aplicada al texto, lineas, errores)
+    n = int(megabytes * 1_000_000)
+    lineas = n // 8
+    cuerpo = "abc def\n" * lineas
+    return {
+        "comentario largo": (
+            "X := 1UI;\n## " + cuerpo + " ##\nX := 2UI;\n",
+            lambda t: COMENTARIO_ANTERIOR.match(t, 10), lineas + 4, 0),
+        "comentario sin cerrar": (
+            "X := 1UI;\n## " + cuerpo,
+            lambda t: COMENTARIO_ABIERTO_ANTERIOR.match(t, 10), lineas + 2, 1),
+        "cadena sin cerrar": (
+            'print("' + "a" * n + '\nX := 1UI;\n',
+            lambda t: CADENA_ABIERTA_ANTERIOR.match(t, 6), 3, 1),
+        "comentarios cortos": (
+            "## c ##\n" * lineas,
+            COMENTARIO_ANTERIOR.findall, lineas + 1, 0),
+    }
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def tokenizar(texto):
+    lexer = AnalisisLexico()
+    list(lexer.tokenize(texto))
+    return lexer
+
+
+def main():
+    tamanios = [float(x) for x in sys.argv[1:]] or [1, 2, 4, 8]
+    print(f"{'caso':<22} {'MB':>5} {'lexer':>9} {'MB/s':>9} {'regex anterior':>15}")
+    for megabytes in tamanios:
+        reiniciar()
+        for nombre, (texto, anterior, lineas, errores) in casos(megabytes).items():
+            duracion, lexer = medir(lambda: tokenizar(texto))
+            assert lexer.lineno == lineas, (nombre, lexer.lineno, lineas)
+            assert len(lexer.errores) == errores, (nombre, lexer.errores[:1])
+            referencia, _ = medir(lambda: anterior(texto), repeticiones=1)
+            mb = len(texto) / 1e6
+            print(f"{nombre:<22} {mb:>5.1f} {duracion:>8.3f}s {mb / duracion:>9.1f} {referencia:>14.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Entrada del front end sobre un archivo grande: leer y decodificar a str
+contra mapear el archivo en memoria (Fuente.ArchivoFuente) y escanear bytes
+con el lexer manual.
+
+Cada variante corre en un proceso aparte y reporta su tiempo y su RSS
+maximo (ru_maxrss). En la variante mmap las paginas del archivo cuentan en
+el RSS pero son del page cache: se comparten entre procesos y el sistema
+las puede liberar sin swap.
+
+Uso:
+    python benchmarks/bench_entrada.py [megabytes]     (por defecto 50)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Un caracter fuera de Latin-1 (€) hace que el str decodificado ocupe 2 bytes por caracter
+BLOQUE = '''    ## bloque {i}: comentario con tildes y simbolos, cañón de 5 € ##
+    X{j} := X{j} + {j}UI * (X{j} - 3UI);
+    print("cadena número {j}");
+'''
+
+MEDICION = '''
+import resource, sys, time
+sys.path.insert(0, {raiz!r})
+from Fuente import ArchivoFuente
+from LexerManual import AnalisisLexicoManual
+inicio = time.perf_counter()
+with ArchivoFuente({ruta!r}, en_bytes={en_bytes!r}) as fuente:
+    lexer = AnalisisLexicoManual()
+    cantidad = sum(1 for _ in lexer.tokenize(fuente.contenido))
+duracion = time.perf_counter() - inicio
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(cantidad, len(lexer.errores), duracion, rss)
+'''
+
+
+def escribir_fuente(ruta, megabytes):
+    largo = 0
+    i = 0
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write("PROGRAMA {\n")
+        while largo < megabytes * 1_000_000:
+            largo += f.write(BLOQUE.format(i=i, j=i % 100))
+            i += 1
+        f.write("}\n")
+
+
+def medir(ruta, en_bytes):
+    codigo = MEDICION.format(raiz=RAIZ, ruta=ruta, en_bytes=en_bytes)
+    salida = subprocess.run([sys.executable, "-c", codigo], check=True,
+                            capture_output=True, text=True).stdout.split()
+    return int(salida[0]), int(salida[1]), float(salida[2]), float(salida[3])
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "fuente.txt")
+        escribir_fuente(ruta, megabytes)
+        mb = os.path.getsize(ruta) / 1e6
+        print(f"fuente: {mb:.1f} MB")
+        resultados = {}
+        for nombre, en_bytes in (("str (read + decode)", False), ("bytes (mmap)", True)):
+            cantidad, errores, duracion, rss = medir(ruta, en_bytes)
+            resultados[nombre] = (cantidad, errores)
+            print(f"{nombre:<22} {cantidad:>10} tokens {duracion:>7.2f}s {mb / duracion:>7.2f} MB/s "
+                  f"{rss:>9.1f} MB RSS max")
+        assert len(set(resultados.values())) == 1, resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Salida de una tabla de simbolos grande: el __str__ anterior (un string que
+crece con s += por cada fila) contra los exportadores de TablaDeSimbolos, que
+escriben fila por fila en un archivo (texto, CSV, JSON lines y binario).
+
+Para cada uno se mide el tiempo, el pico de memoria durante la escritura
+(tracemalloc, en una segunda pasada) y el tamaño del archivo. Antes se
+verifica que el texto exportado sea igual al anterior y que leer_binario
+devuelva las mismas filas que el JSON lines.
+
+Uso:
+    python benchmarks/bench_exportar.py [entradas]     (por defecto 500000)
+"""
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Nombres import internar
+from TablaDeSimbolos import EXPORTADORES, TablaDeSimbolos, leer_binario
+
+
+def texto_concatenado(tabla):
+    s = "   TABLA DE SÍMBOLOS   \n"
+    s += "{:<25} {:<15} {:<25} {:<35} {:<10}\n".format("Lexema", "Tipo", "Valor", "Uso", "Línea")
+    s += "-" * 115 + "\n"
+    for lexema, tipo, valor, uso, linea in tabla.filas():
+        s += "{:<25} {:<15} {:<25} {:<35} {:<10}\n".format(
+            lexema, tipo, str(valor) if valor is not None else "N/A", uso,
+            str(linea) if linea is not None else "N/A")
+    s += "\n"
+    return s
+
+
+def tabla_grande(n):
+    tabla = TablaDeSimbolos()
+    for i in range(n):
+        nombre = internar(f"X{i}")
+        tabla.agregar(nombre, "Identificador", linea=i)
+        tabla.renombrar(nombre, internar(f"X{i}:PROG"))
+        tabla.asignar_tipo(internar(f"X{i}:PROG"), "UINT")
+        tabla.asignar_uso(internar(f"X{i}:PROG"), "nombre de variable")
+        if i % 2:
+            tabla.agregar(str(i), "UINT_CONST", valor=i, linea=i)
+    return tabla
+
+
+def abrir(ruta, formato):
+    if formato == "binario":
+        return open(ruta, "wb")
+    return open(ruta, "w", encoding="utf-8", newline="")
+
+
+def escribir_concatenado(tabla, ruta):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(texto_concatenado(tabla))
+
+
+def escribir(formato):
+    def exportar(tabla, ruta):
+        with abrir(ruta, formato) as archivo:
+            EXPORTADORES[formato](tabla, archivo)
+    return exportar
+
+
+def medir(funcion, tabla, ruta):
+    gc.collect()
+    inicio = time.perf_counter()
+    funcion(tabla, ruta)
+    duracion = time.perf_counter() - inicio
+    gc.collect()
+    tracemalloc.start()
+    funcion(tabla, ruta)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duracion, pico, os.path.getsize(ruta)
+
+
+def main():
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    chica = tabla_grande(300)
+    assert str(chica) == texto_concatenado(chica), "el texto exportado cambio"
+    jsonl, binario = io.StringIO(), io.BytesIO()
+    chica.exportar_jsonl(jsonl)
+    chica.exportar_binario(binario)
+    binario.seek(0)
+    assert list(leer_binario(binario)) == [json.loads(l) for l in jsonl.getvalue().splitlines()]
+
+    tabla = tabla_grande(entradas)
+    print(f"{'':<22} {'tiempo':>8} {'pico de memoria':>16} {'archivo':>10}")
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, funcion in (("texto (s +=)", escribir_concatenado),
+                                ("texto", escribir("texto")),
+                                ("csv", escribir("csv")),
+                                ("jsonl", escribir("jsonl")),
+                                ("binario", escribir("binario"))):
+            duracion, pico, tamano = medir(funcion, tabla, os.path.join(directorio, nombre))
+            print(f"{nombre:<22} {duracion:>7.2f}s {pico / 2**20:>13.1f} MB {tamano / 2**20:>7.1f} MB")
+    print(f"({len(tabla.simbolos)} entradas)")
+
+
+if __name__ == "__main__":
+    main()
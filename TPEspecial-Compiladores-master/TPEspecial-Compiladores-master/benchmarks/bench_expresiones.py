@@ -0,0 +1,128 @@
+"""
+Reduccion de expresiones muy largas en el generador de codigo.
+
+ReduccionDesdeLaRaiz reproduce la reduccion anterior: en cada paso busca
+desde la raiz (con una pila) un Binario con los dos operandos reducidos, lo
+calcula y vuelve a empezar, asi que una expresion de N operandos cuesta del
+orden de N^2. GeneradorWasm la reduce en una sola pasada en postorden.
+
+Dos formas de expresion, con +, -, * y / mezclados:
+  cadena      X + 1UI * X - 2UI + ...    (asociada a izquierda: profundidad N)
+  balanceada  ((X + 1UI) * (X - 2UI)) + ...    (profundidad log N)
+
+Se genera el programa completo con cada uno y se verifica que el WAT sea el
+mismo. La reduccion anterior solo se mide hasta --max-anterior operandos.
+
+Uso:
+    python benchmarks/bench_expresiones.py [operandos...] [--max-anterior N]
+        (por defecto 1000 10000 50000, --max-anterior 10000)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico, Binario, Nodo
+from LexerManual import AnalisisLexicoManual
+from Nombres import reiniciar
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+OPERADORES = ("+", "*", "-", "+", "/")
+
+
+class ReduccionDesdeLaRaiz(GeneradorWasm):
+    def _reducir_binarios(self, nodo, valores):
+        while self._valor(nodo, valores) is None:
+            pila = [nodo]
+            sub = izq = der = None
+            while pila:
+                actual = pila.pop()
+                if not isinstance(actual, Binario) or id(actual) in valores:
+                    continue
+                izq, der = self._valor(actual.izq, valores), self._valor(actual.der, valores)
+                if izq is not None and der is not None:
+                    sub = actual
+                    break
+                if der is None and isinstance(actual.der, Nodo): pila.append(actual.der)
+                if izq is None and isinstance(actual.izq, Nodo): pila.append(actual.izq)
+            if sub is None:
+                return nodo
+            valores[id(sub)] = (sub, self._reducir_binario(sub, izq, der))
+        return self._valor(nodo, valores)
+
+
+def operando(i):
+    return "X" if i % 2 == 0 else f"{i % 7 + 1}UI"
+
+
+def cadena(n):
+    partes = [operando(0)]
+    for i in range(1, n):
+        partes.append(f" {OPERADORES[i % len(OPERADORES)]} {operando(i)}")
+    return "".join(partes)
+
+
+def balanceada(n):
+    # Se arma de abajo hacia arriba, juntando de a pares
+    nivel = [operando(i) for i in range(n)]
+    k = 0
+    while len(nivel) > 1:
+        siguiente = []
+        for i in range(0, len(nivel) - 1, 2):
+            siguiente.append(f"({nivel[i]} {OPERADORES[k % len(OPERADORES)]} {nivel[i + 1]})")
+            k += 1
+        if len(nivel) % 2:
+            siguiente.append(nivel[-1])
+        nivel = siguiente
+    return nivel[0]
+
+
+def analizar(Parser, expresion):
+    texto = f"PROG {{\n    uint X;\n    X := 1UI;\n    X := {expresion};\n    print(X);\n}}\n"
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+    return arbol
+
+
+def medir(generador, arbol):
+    gc.collect()
+    inicio = time.perf_counter()
+    wat = generador.generar(arbol)
+    return time.perf_counter() - inicio, wat
+
+
+def main():
+    argumentos = sys.argv[1:]
+    max_anterior = 10_000
+    if "--max-anterior" in argumentos:
+        i = argumentos.index("--max-anterior")
+        max_anterior = int(argumentos[i + 1])
+        del argumentos[i:i + 2]
+    lista = [int(a) for a in argumentos] or [1000, 10_000, 50_000]
+    Parser = cargar_analizador_sintactico()
+
+    print(f"{'':<12} {'operandos':>10} {'desde la raiz':>14} {'postorden':>10} {'mejora':>7}")
+    for forma, armar in (("cadena", cadena), ("balanceada", balanceada)):
+        for n in lista:
+            reiniciar()
+            arbol = analizar(Parser, armar(n))
+            t_nuevo, wat_nuevo = medir(GeneradorWasm(), arbol)
+            if n <= max_anterior:
+                t_anterior, wat_anterior = medir(ReduccionDesdeLaRaiz(), arbol)
+                assert wat_anterior == wat_nuevo, "el codigo generado cambio"
+                print(f"{forma:<12} {n:>10} {t_anterior:>13.2f}s {t_nuevo:>9.2f}s {t_anterior / t_nuevo:>6.0f}x")
+            else:
+                print(f"{forma:<12} {n:>10} {'-':>14} {t_nuevo:>9.2f}s {'':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Tokens en una lista de objetos Token (list(lexer.tokenize(...))) contra
+FlujoTokens (arreglos paralelos + valores internados), sobre una entrada de
+alrededor de 1M de tokens.
+
+Se mide la memoria que queda retenida por la representacion (tracemalloc,
+en una corrida aparte para no afectar los tiempos), el tiempo de armarla
+desde el lexer y el tiempo de parsearla con el parser generado
+(parse(iter(lista)) contra parse_flujo(flujo)). Antes se verifica con una
+entrada chica que ambos caminos den el mismo AST.
+
+Uso:
+    python benchmarks/bench_flujo.py [tokens]     (por defecto 1000000)
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from FlujoTokens import FlujoTokens
+from LexerManual import AnalisisLexicoManual
+from generar_parser import cargar_analizador_sintactico
+
+TOKENS_POR_SENTENCIA = 14
+
+
+def fuente(tokens):
+    partes = ["PROG {\n    uint X, Y;\n"]
+    for i in range(tokens // TOKENS_POR_SENTENCIA):
+        partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + Y;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def como_lista(texto):
+    return list(AnalisisLexicoManual().tokenize(texto))
+
+
+def como_flujo(texto):
+    return FlujoTokens.desde_tokens(AnalisisLexicoManual().tokenize(texto))
+
+
+def parsear_lista(Parser, tokens):
+    parser = Parser()
+    return parser.parse(iter(tokens)), parser
+
+
+def parsear_flujo(Parser, flujo):
+    parser = Parser()
+    return parser.parse_flujo(flujo), parser
+
+
+def memoria_retenida(funcion, *args):
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcion(*args)
+    retenido = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resultado
+    return retenido
+
+
+def tiempo(funcion, *args):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    Parser = cargar_analizador_sintactico()
+
+    chico = fuente(2000)
+    raiz_lista, _ = parsear_lista(Parser, como_lista(chico))
+    raiz_flujo, _ = parsear_flujo(Parser, como_flujo(chico))
+    assert repr(raiz_lista) == repr(raiz_flujo), "ASTs distintos"
+
+    texto = fuente(cantidad)
+    mem_lista = memoria_retenida(como_lista, texto)
+    mem_flujo = memoria_retenida(como_flujo, texto)
+    t_lista, lista = tiempo(como_lista, texto)
+    t_flujo, flujo = tiempo(como_flujo, texto)
+    assert len(lista) == len(flujo)
+    n = len(lista)
+
+    print(f"parser: {Parser.__module__}, {n} tokens, {len(flujo.valores)} valores distintos")
+    print(f"{'':<22} {'memoria MB':>11} {'bytes/token':>12} {'armado':>8} {'parseo':>8} {'Mtok/s parseo':>14}")
+    filas = (("lista de Token", mem_lista, t_lista, parsear_lista, lista),
+             ("FlujoTokens", mem_flujo, t_flujo, parsear_flujo, flujo))
+    for nombre, memoria, armado, parsear, tokens in filas:
+        duracion, (raiz, parser) = tiempo(parsear, Parser, tokens)
+        assert raiz is not None and not parser.errores()
+        print(f"{nombre:<22} {memoria / 1e6:>11.1f} {memoria / n:>12.1f} {armado:>7.2f}s {duracion:>7.2f}s "
+              f"{n / duracion / 1e6:>14.2f}")
+    print(f"(arreglos del flujo: {flujo.memoria() / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Generacion de codigo sobre un programa grande, con y sin copiar el arbol.
+
+GeneradorConCopia hace lo que hacia generar() antes: una copia profunda del
+arbol semantico (copy.deepcopy) y la generacion sobre la copia. GeneradorWasm
+genera sobre el arbol original y anota los valores de cada expresion en una
+tabla aparte. Se mide el tiempo y el pico de memoria (tracemalloc, en una
+segunda pasada) de cada uno. Antes se verifica que el WAT sea el mismo y que
+el arbol no cambie.
+
+Uso:
+    python benchmarks/bench_generador.py [sentencias]     (por defecto 50000)
+"""
+import copy
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico, ArbolSemantico
+from LexerManual import AnalisisLexicoManual
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+
+class GeneradorConCopia(GeneradorWasm):
+    def generar(self, arbol_semantico):
+        copia = ArbolSemantico(copy.deepcopy(arbol_semantico.raiz), arbol_semantico.diag)
+        return super().generar(copia)
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y;\n    uint F(uint P) {\n        return(P * 2UI + 1UI);\n    }\n"]
+    for i in range(n):
+        if i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X / (Y + 1UI)); }} else {{ Y := F(Y -> P) + X; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + F(X -> P);\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def medir(generador, arbol):
+    gc.collect()
+    inicio = time.perf_counter()
+    wat = generador.generar(arbol)
+    duracion = time.perf_counter() - inicio
+    del wat
+    gc.collect()
+    tracemalloc.start()
+    wat = generador.generar(arbol)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duracion, pico, wat
+
+
+def main():
+    sentencias = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lexer = AnalisisLexicoManual()
+    parser = cargar_analizador_sintactico()()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(fuente(sentencias)))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+    antes = arbol.to_dot()
+
+    print(f"{'':<24} {'tiempo':>8} {'pico de memoria':>16}")
+    salidas = []
+    for nombre, generador in (("copia + generacion", GeneradorConCopia()), ("sin copia", GeneradorWasm())):
+        duracion, pico, wat = medir(generador, arbol)
+        salidas.append(wat)
+        print(f"{nombre:<24} {duracion:>7.2f}s {pico / 2**20:>13.1f} MB")
+    assert salidas[0] == salidas[1], "el codigo generado cambio"
+    assert arbol.to_dot() == antes, "la generacion modifico el arbol"
+
+
+if __name__ == "__main__":
+    main()
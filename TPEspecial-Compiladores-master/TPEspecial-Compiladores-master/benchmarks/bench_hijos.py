@@ -0,0 +1,100 @@
+"""
+Costo de recorrer los hijos de cada nodo: Nodo.hijos(), que arma una lista
+nueva en cada llamada, contra Nodo.iter_hijos(), que lee los campos de _HIJOS
+sin armarla.
+
+Se recorre el mismo arbol completo con Recorrido.recorrer usando cada una
+(con hijos() la pasada crea y descarta una lista por nodo). Despues se miden
+las pasadas del compilador que usan iter_hijos: analisis semantico,
+imprimir_arbol y to_dot. Cada medicion se repite y se toma la mejor.
+
+Uso:
+    python benchmarks/bench_hijos.py [sentencias] [repeticiones]     (por defecto 50000 3)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico, Nodo
+from LexerManual import AnalisisLexicoManual
+from Recorrido import recorrer
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y;\n"]
+    for i in range(n):
+        if i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X); }} else {{ Y := Y - 1UI; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + Y;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def parsear(Parser, texto):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    return raiz, lexer.tabla_simbolos
+
+
+def con_listas(n):
+    return n.hijos() if isinstance(n, Nodo) else ()
+
+
+def sin_listas(n):
+    return n.iter_hijos() if isinstance(n, Nodo) else ()
+
+
+def contar(raiz, hijos):
+    cantidad = 0
+    def entrar(n, padre, nivel):
+        nonlocal cantidad
+        cantidad += 1
+    recorrer(raiz, hijos, entrar)
+    return cantidad
+
+
+def medir(funcion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    Parser = cargar_analizador_sintactico()
+    raiz, tabla = parsear(Parser, fuente(cantidad))
+
+    print(f"{'':<24} {'tiempo':>8}")
+    nodos = set()
+    for nombre, hijos in (("hijos() (listas)", con_listas), ("iter_hijos()", sin_listas)):
+        duracion, total = medir(lambda: contar(raiz, hijos), repeticiones)
+        nodos.add(total)
+        print(f"{nombre:<24} {duracion:>7.2f}s")
+    assert len(nodos) == 1, "recorridos distintos"
+
+    arbol = AnalisisSemantico(tabla).analizar_entrada(raiz)
+    for nombre, pasada in (("analisis semantico", lambda: AnalisisSemantico(tabla).analizar_entrada(raiz)),
+                           ("imprimir_arbol", arbol.imprimir_arbol),
+                           ("to_dot", arbol.to_dot)):
+        duracion, _ = medir(pasada, repeticiones)
+        print(f"{nombre:<24} {duracion:>7.2f}s")
+    print(f"({nodos.pop()} nodos)")
+
+
+if __name__ == "__main__":
+    main()
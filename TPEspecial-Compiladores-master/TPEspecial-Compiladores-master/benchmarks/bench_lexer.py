@@ -0,0 +1,88 @@
+"""
+Throughput (MB/s) del lexer de SLY (Lexer.py) contra el lexer manual
+(LexerManual.py) sobre un fuente sintetico de varios megabytes.
+
+Antes de medir se verifica que ambos produzcan los mismos tokens, la misma
+lista de errores y la misma tabla de simbolos.
+
+Uso:
+    python benchmarks/bench_lexer.py [megabytes]     (por defecto 4)
+"""
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Lexer import AnalisisLexico
+from LexerManual import AnalisisLexicoManual
+
+BLOQUE = '''    uint F{i}(cv uint A{i}, uint B{i}) {{
+        ## suma y resta
+           con comentario de dos lineas ##
+        A{i} := B{i} + {i}UI * (A{i} - 3UI);
+        if (A{i} >= B{i}) {{ print("mayor"); }} else {{ print(A{i}); }} endif;
+        return(A{i});
+    }}
+    uint X{i}, Y{i};
+    X{i}, Y{i} = 1UI, 2UI;
+    X{i} := F{i}(X{i} -> A{i}, trunc(1.5D+2) -> B{i});
+    do {{ Y{i} := Y{i} - 1UI; }} while (Y{i} > 0UI);
+'''
+
+
+def fuente(megabytes):
+    partes = ["PROGRAMA {\n"]
+    largo = 0
+    i = 0
+    while largo < megabytes * 1_000_000:
+        bloque = BLOQUE.format(i=i)
+        partes.append(bloque)
+        largo += len(bloque)
+        i += 1
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def tokenizar(Lexer, texto):
+    lexer = Lexer()
+    tokens = list(lexer.tokenize(texto))
+    return lexer, tokens
+
+
+def verificar(texto):
+    a, tokens_a = tokenizar(AnalisisLexico, texto)
+    b, tokens_b = tokenizar(AnalisisLexicoManual, texto)
+    clave = lambda t: (t.type, t.value, t.lineno, t.index, t.end)
+    assert list(map(clave, tokens_a)) == list(map(clave, tokens_b)), "tokens distintos"
+    assert a.errores == b.errores, "errores distintos"
+    assert str(a.tabla_simbolos) == str(b.tabla_simbolos), "tabla de simbolos distinta"
+    return len(tokens_a)
+
+
+def medir(Lexer, texto, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        tokenizar(Lexer, texto)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    texto = fuente(megabytes)
+    cantidad = verificar(texto)
+    mb = len(texto.encode('utf-8')) / 1e6
+    print(f"fuente: {mb:.1f} MB, {cantidad} tokens")
+    base = None
+    for nombre, Lexer in (("sly (Lexer.py)", AnalisisLexico), ("manual (LexerManual.py)", AnalisisLexicoManual)):
+        duracion = medir(Lexer, texto)
+        base = base or duracion
+        print(f"{nombre:<26} {duracion:>7.2f}s {mb / duracion:>8.2f} MB/s  x{base / duracion:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Escalado del parser con listas largas: sentencias, lista_ids, parametros,
+lista_expr_const y parametros_invocacion. El programa medido es
+
+    PROG {
+        uint V0, V1, ..., Vk;                 ## lista_ids ##
+        uint F(uint P0, ..., uint Pk) {       ## parametros ##
+            X := 1UI; ...                     ## k sentencias de funcion ##
+            return(X);
+        }
+        V0, ..., Vk = 1UI, ..., 1UI;          ## lista_ids / lista_expr_const ##
+        X := F(V0 -> P0, ..., Vk -> Pk);      ## parametros_invocacion ##
+        X := 1UI; ...                         ## n sentencias ##
+    }
+
+con k = n / 10. Los tokens se generan directamente (sin lexer, para medir
+solo el parser); con n chico se verifica que coincidan con los del lexer.
+Si el armado de listas es O(1) amortizado, el tiempo por sentencia se
+mantiene constante al crecer n.
+
+Uso:
+    python benchmarks/bench_listas.py [n1 n2 ...]     (por defecto 10000 100000 1000000)
+"""
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from generar_parser import cargar_analizador_sintactico
+from Nombres import internar, reiniciar
+
+
+class Tok:
+    __slots__ = ('type', 'value', 'lineno', 'index', 'end')
+
+    def __init__(self, tipo, valor):
+        self.type = tipo
+        self.value = valor
+        self.lineno = 1
+        self.index = 0
+        self.end = 0
+
+    def __repr__(self):
+        return f"Token(type={self.type!r}, value={self.value!r})"
+
+
+def _id(texto):
+    # Como el lexer: el valor de un ID es su Nombre internado
+    return ('ID', internar(texto))
+
+
+def _lista(n, elemento, sep=(',', ',')):
+    for i in range(n):
+        if i:
+            yield sep
+        yield from elemento(i)
+
+
+def programa(n):
+    # (tipo, valor) de cada token, en el orden en que los produciria el lexer
+    k = max(1, n // 10)
+    yield _id('PROG'); yield ('{', '{')
+
+    yield ('UINT', 'uint')
+    yield from _lista(k, lambda i: [_id(f'V{i}')])
+    yield (';', ';')
+
+    yield ('UINT', 'uint'); yield _id('F'); yield ('(', '(')
+    yield from _lista(k, lambda i: [('UINT', 'uint'), _id(f'P{i}')])
+    yield (')', ')'); yield ('{', '{')
+    for _ in range(k):
+        yield from (_id('X'), ('ASSIGN_PASCAL', ':='), ('UINT_CONST', 1), (';', ';'))
+    yield from (('RETURN', 'return'), ('(', '('), _id('X'), (')', ')'), (';', ';'))
+    yield ('}', '}')
+
+    yield from _lista(k, lambda i: [_id(f'V{i}')])
+    yield ('ASSIGN', '=')
+    yield from _lista(k, lambda i: [('UINT_CONST', 1)])
+    yield (';', ';')
+
+    yield from (_id('X'), ('ASSIGN_PASCAL', ':='), _id('F'), ('(', '('))
+    yield from _lista(k, lambda i: [_id(f'V{i}'), ('ARROW', '->'), _id(f'P{i}')])
+    yield (')', ')'); yield (';', ';')
+
+    for _ in range(n):
+        yield from (_id('X'), ('ASSIGN_PASCAL', ':='), ('UINT_CONST', 1), (';', ';'))
+    yield ('}', '}')
+
+
+def fuente(n):
+    # Mismo programa como texto, para contrastar con el lexer real
+    partes = []
+    for tipo, valor in programa(n):
+        partes.append(f"{valor}UI" if tipo == 'UINT_CONST' else str(valor))
+    return " ".join(partes)
+
+
+def verificar_tokens(n=50):
+    from Lexer import AnalisisLexico
+    del_lexer = [(t.type, t.value) for t in AnalisisLexico().tokenize(fuente(n))]
+    assert del_lexer == list(programa(n)), "los tokens sinteticos no coinciden con el lexer"
+
+
+def medir(Parser, n):
+    tokens = (Tok(tipo, valor) for tipo, valor in programa(n))
+    parser = Parser()
+    inicio = time.perf_counter()
+    raiz = parser.parse(tokens)
+    duracion = time.perf_counter() - inicio
+    assert not parser.errores(), parser.errores()[:3]
+    assert len(raiz.cuerpo.sentencias) == n + 4
+    return duracion
+
+
+def main():
+    tamanios = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    verificar_tokens()
+    Parser = cargar_analizador_sintactico()
+    print(f"parser: {Parser.__module__}")
+    print(f"{'sentencias':>12} {'tiempo':>10} {'us/sentencia':>14}")
+    for n in tamanios:
+        reiniciar()
+        duracion = medir(Parser, n)
+        print(f"{n:>12} {duracion:>9.2f}s {duracion / n * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Locales por funcion con y sin reuso de los auxiliares ($tN).
+
+Sin reuso cada valor intermedio tiene su propia local, asi que la cantidad de
+locales crece con el largo de la funcion. Con reusar_locales=True
+(LocalesWasm.reusar_temporales) los $tN del mismo tipo que no estan vivos a la
+vez comparten local. El programa tiene una funcion F chica y un main largo,
+con do-while anidados; se genera con un auxiliar por valor y en modo pila.
+
+Para cada caso se muestran las locales de cada funcion antes y despues, el
+tamanio del WAT y el tiempo de generacion (el reuso incluido).
+
+Uso:
+    python benchmarks/bench_locales.py [sentencias]     (por defecto 50000)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico
+from LexerManual import AnalisisLexicoManual
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y, Z;\n    uint F(uint P) {\n        uint L;\n"
+              "        L := P * 2UI + 1UI;\n        return(L / (P + 1UI) + L);\n    }\n"]
+    for i in range(n):
+        if i % 10 == 9:
+            partes.append(f"    Z := 0UI; do {{ X := X + Z * {i % 500}UI; do {{ Y := Y / 2UI; }} while (Y > 10UI); "
+                          f"Z := Z + 1UI; }} while (Z < 3UI);\n")
+        elif i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X / (Y + 1UI)); }} else {{ Y := F(Y -> P) + X; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) - Z / 3UI;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def main():
+    sentencias = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lexer = AnalisisLexicoManual()
+    parser = cargar_analizador_sintactico()()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(fuente(sentencias)))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+
+    print(f"{'':<24} {'funcion':<8} {'locales antes':>14} {'despues':>8} {'WAT':>10} {'tiempo':>8}")
+    for nombre, pila in (("un auxiliar por valor", False), ("pila", True)):
+        for reusar in (False, True):
+            generador = GeneradorWasm(pila=pila, reusar_locales=reusar)
+            gc.collect()
+            inicio = time.perf_counter()
+            wat = generador.generar(arbol)
+            duracion = time.perf_counter() - inicio
+            tamanio = f"{len(wat.encode()) / 2**20:>7.1f} MB"
+            caso = nombre + (" + reuso" if reusar else "")
+            if not reusar:
+                print(f"{caso:<24} {'':<8} {'':>14} {'':>8} {tamanio} {duracion:>7.2f}s")
+                continue
+            for i, (funcion, antes, despues) in enumerate(generador.reporte_locales):
+                fin = f"{tamanio} {duracion:>7.2f}s" if i == 0 else ""
+                print(f"{caso if i == 0 else '':<24} {funcion:<8} {antes:>14} {despues:>8} {fin}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Codigo generado con un auxiliar por operacion contra el modo pila.
+
+GeneradorWasm() guarda cada resultado intermedio (cada operacion, cada
+invocacion y cada hoja que se usa como valor) en un $tN nuevo con local.set y
+lo vuelve a leer con local.get. GeneradorWasm(pila=True) deja esos valores en
+la pila de operandos de Wasm y solo usa un $tN donde el valor se lee dos veces
+(divisor calculado, suma con control de overflow) o se calcula antes que el
+resto de la expresion (invocaciones adentro de una expresion, asignacion
+multiple).
+
+Para cada modo se cuentan las instrucciones y las locales declaradas, el
+tamanio del WAT y el tiempo de generacion.
+
+Uso:
+    python benchmarks/bench_pila.py [sentencias]     (por defecto 50000)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico
+from LexerManual import AnalisisLexicoManual
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y, Z;\n    uint F(uint P) {\n        return(P * 2UI + 1UI);\n    }\n"]
+    for i in range(n):
+        if i % 5 == 4:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X / (Y + 1UI)); }} else {{ Y := F(Y -> P) + X; }} endif;\n")
+        elif i % 5 == 3:
+            partes.append(f"    X, Y = {i % 500}UI, 3UI;\n")
+        elif i % 5 == 2:
+            partes.append(f"    Z := {i % 500}UI;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) - Z / 3UI;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def contar(wat):
+    instrucciones = locales = 0
+    for linea in wat.split("\n"):
+        linea = linea.strip()
+        if linea.startswith("(local "):
+            locales += 1
+        elif linea[:1].isalpha():
+            instrucciones += 1
+    return instrucciones, locales
+
+
+def main():
+    sentencias = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lexer = AnalisisLexicoManual()
+    parser = cargar_analizador_sintactico()()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(fuente(sentencias)))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    assert not arbol.diag, arbol.diag[:3]
+
+    print(f"{'':<22} {'instrucciones':>14} {'locales':>9} {'WAT':>10} {'tiempo':>8}")
+    for nombre, generador in (("un auxiliar por valor", GeneradorWasm()), ("pila", GeneradorWasm(pila=True))):
+        gc.collect()
+        inicio = time.perf_counter()
+        wat = generador.generar(arbol)
+        duracion = time.perf_counter() - inicio
+        instrucciones, locales = contar(wat)
+        print(f"{nombre:<22} {instrucciones:>14} {locales:>9} {len(wat.encode()) / 2**20:>7.1f} MB {duracion:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
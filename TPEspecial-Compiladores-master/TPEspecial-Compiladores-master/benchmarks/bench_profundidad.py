@@ -0,0 +1,105 @@
+"""
+Recorridos sobre arboles muy profundos, con el limite de recursion por
+defecto de Python (1000).
+
+Tres programas generados:
+  cadena        X := X + 1UI + X + 1UI + ... con N operandos: un arbol de
+                Binario de profundidad N
+  anidado       N if anidados, cada uno con una asignacion adentro
+  invocaciones  A := F(F(...F(A->X)...->X)->X) con N invocaciones anidadas
+                en los argumentos
+
+Sobre cada uno se mide el analisis semantico, to_dot y la busqueda de
+invocaciones del generador (_reducir_invocaciones).
+imprimir_arbol indenta cada linea segun el nivel, asi que su salida crece con
+el cuadrado de la profundidad; se mide sobre un arbol de profundidad 2000.
+En los tres programas tambien se genera el codigo completo, con un auxiliar
+por valor y con --pila.
+
+Uso:
+    python benchmarks/bench_profundidad.py [profundidad]     (por defecto 100000)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico
+from LexerManual import AnalisisLexicoManual
+from Nombres import reiniciar
+from Recorrido import ejecutar
+from generador_wasm import GeneradorWasm
+from generar_parser import cargar_analizador_sintactico
+
+
+def cadena(n):
+    operandos = " + ".join("X" if i % 2 == 0 else "1UI" for i in range(n))
+    return f"PROG {{\n    uint X;\n    X := {operandos};\n    print(X);\n}}\n"
+
+
+def anidado(n):
+    partes = ["PROG {\n    uint X;\n"]
+    partes.extend("    if (X < 100UI) {\n        X := X + 1UI;\n" for _ in range(n))
+    partes.extend("    } endif;\n" for _ in range(n))
+    partes.append("    print(X);\n}\n")
+    return "".join(partes)
+
+
+def invocaciones(n):
+    llamada = "F(" * n + "A" + "->X)" * n
+    return (f"PROG {{\n    uint A;\n    uint F(cv uint X) {{\n        return(X);\n    }}\n"
+            f"    A := {llamada};\n    print(A);\n}}\n")
+
+
+def parsear(Parser, texto):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    return raiz, lexer.tabla_simbolos
+
+
+def medir(nombre, funcion):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    print(f"  {nombre:<28} {time.perf_counter() - inicio:>7.2f}s")
+    return resultado
+
+
+def expresion_de_la_asignacion(raiz):
+    return next(s for s in raiz.cuerpo.sentencias if hasattr(s, "expr") and hasattr(s, "destino")).expr
+
+
+def main():
+    profundidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    Parser = cargar_analizador_sintactico()
+    print(f"limite de recursion: {sys.getrecursionlimit()}")
+
+    for nombre, generar_fuente in (("cadena", cadena), ("anidado", anidado), ("invocaciones", invocaciones)):
+        reiniciar()
+        print(f"{nombre} (profundidad {profundidad}):")
+        raiz, tabla = medir("parseo", lambda: parsear(Parser, generar_fuente(profundidad)))
+        arbol = medir("analisis semantico", lambda: AnalisisSemantico(tabla).analizar_entrada(raiz))
+        assert not arbol.diag, arbol.diag[:3]
+        medir("to_dot", arbol.to_dot)
+        if nombre == "cadena":
+            expresion = expresion_de_la_asignacion(raiz)
+            medir("_reducir_invocaciones", lambda: ejecutar(GeneradorWasm()._reducir_invocaciones, expresion, {}))
+        wat = medir("generacion completa", lambda: GeneradorWasm().generar(arbol))
+        if nombre == "anidado":
+            assert wat.count("\n    if") >= profundidad
+        if nombre == "invocaciones":
+            assert wat.count("call $") >= profundidad
+        medir("generacion completa (--pila)", lambda: GeneradorWasm(pila=True).generar(arbol))
+        raiz, tabla = parsear(Parser, generar_fuente(2000))
+        arbol = AnalisisSemantico(tabla).analizar_entrada(raiz)
+        medir("imprimir_arbol (prof. 2000)", arbol.imprimir_arbol)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput del analisis semantico en nodos por segundo.
+
+Compara el despacho por tabla (Visitante.metodo_para, una busqueda por clase
+de nodo) con el despacho anterior, que armaba "_v_" + nombre de la clase y
+hacia getattr en cada visita. Se mide sobre el arbol de objetos y sobre el
+AST en arena (ArenaAST), con un programa generado de expresiones,
+asignaciones e if. Cada variante se corre varias veces y se toma la mejor.
+
+Uso:
+    python benchmarks/bench_semantico.py [sentencias] [repeticiones]     (por defecto 50000 3)
+"""
+import gc
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from AnalisisSemantico import AnalisisSemantico, Nodo, Tipo
+from ArenaAST import Arena
+from LexerManual import AnalisisLexicoManual
+from generar_parser import cargar_analizador_sintactico
+
+
+class DespachoPorNombre(AnalisisSemantico):
+    # El despacho anterior: getattr con el nombre armado en cada visita
+    def _paso(self, n, amb):
+        if n is None:
+            return Tipo.UNKNOWN
+        if isinstance(n, list):
+            return self._visitar_lista(n, amb)
+        if not isinstance(n, Nodo):
+            return Tipo.UNKNOWN
+        metodo = getattr(self, f"_v_{n.__class__.__name__}", None)
+        if metodo:
+            return metodo(n, amb)
+        return self._visitar_hijos(n, amb)
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X, Y;\n"]
+    for i in range(n):
+        if i % 4 == 3:
+            partes.append(f"    if (X > {i % 500}UI) {{ print(X); }} else {{ Y := Y - 1UI; }} endif;\n")
+        else:
+            partes.append(f"    X := X + {i % 500}UI * (Y - 1UI) + Y;\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def parsear(Parser, texto):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    raiz = parser.parse(lexer.tokenize(texto))
+    assert raiz is not None and not parser.errores()
+    return raiz, lexer.tabla_simbolos
+
+
+def contar_nodos(raiz):
+    cantidad = 0
+    pendientes = [raiz]
+    while pendientes:
+        n = pendientes.pop()
+        if isinstance(n, Nodo):
+            cantidad += 1
+            pendientes.extend(n.hijos())
+    return cantidad
+
+
+def mejor_tiempo(Analizador, raiz, tabla, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        arbol = Analizador(tabla).analizar_entrada(raiz)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, arbol
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    Parser = cargar_analizador_sintactico()
+    raiz, tabla = parsear(Parser, fuente(cantidad))
+    nodos = contar_nodos(raiz)
+    arena = Arena.desde_arbol(raiz)
+
+    print(f"{nodos} nodos")
+    print(f"{'':<34} {'tiempo':>8} {'Mnodos/s':>9}")
+    diagnosticos = set()
+    for nombre_arbol, arbol in (("objetos", raiz), ("arena", arena)):
+        for nombre, Analizador in (("despacho por nombre", DespachoPorNombre), ("tabla por clase", AnalisisSemantico)):
+            duracion, resultado = mejor_tiempo(Analizador, arbol, tabla, repeticiones)
+            diagnosticos.add(tuple(str(d) for d in resultado.diag))
+            print(f"{nombre_arbol + ', ' + nombre:<34} {duracion:>7.2f}s {nodos / duracion / 1e6:>9.2f}")
+    assert len(diagnosticos) == 1, "diagnosticos distintos"
+
+
+if __name__ == "__main__":
+    main()
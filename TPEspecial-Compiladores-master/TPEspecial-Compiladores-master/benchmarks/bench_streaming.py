@@ -0,0 +1,79 @@
+"""
+Memoria del pipeline lexer -> parser: tokens en una lista (como antes en
+main.py) contra tokens pasados al parser a medida que se reconocen.
+
+Con tracemalloc se mide el pico de memoria y lo que queda retenido al
+terminar (el AST, la tabla de simbolos, ...). La diferencia es el costo
+transitorio del pipeline: con la lista crece con la cantidad de tokens, en
+modo streaming se mantiene constante.
+
+Uso:
+    python benchmarks/bench_streaming.py [n1 n2 ...]     (sentencias, por defecto 5000 20000 50000)
+"""
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Lexer import AnalisisLexico
+from Nombres import reiniciar
+from generar_parser import cargar_analizador_sintactico
+
+
+def fuente(n):
+    partes = ["PROG {\n    uint X;\n"]
+    for i in range(n):
+        partes.append(f"    X := X + {i % 1000}UI * (X - 1UI);\n")
+    partes.append("}\n")
+    return "".join(partes)
+
+
+def con_lista(Parser, texto):
+    lexer = AnalisisLexico()
+    tokens = list(lexer.tokenize(texto))
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    return parser.parse(iter(tokens)), parser, lexer
+
+
+def en_streaming(Parser, texto):
+    lexer = AnalisisLexico()
+    tokens = lexer.tokenize(texto)
+    primero = next(tokens)
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    return parser.parse(itertools.chain((primero,), tokens)), parser, lexer
+
+
+def medir(modo, Parser, texto):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = modo(Parser, texto)
+    duracion = time.perf_counter() - inicio
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    raiz, parser, lexer = resultado
+    assert raiz is not None and not parser.errores() and not lexer.errores
+    return duracion, pico, retenido
+
+
+def main():
+    tamanios = [int(x) for x in sys.argv[1:]] or [5_000, 20_000, 50_000]
+    Parser = cargar_analizador_sintactico()
+    print(f"parser: {Parser.__module__}")
+    print(f"{'sentencias':>10} {'modo':<10} {'tiempo':>8} {'pico MB':>9} {'retenido MB':>12} {'transitorio MB':>15}")
+    for n in tamanios:
+        reiniciar()
+        texto = fuente(n)
+        for nombre, modo in (("lista", con_lista), ("streaming", en_streaming)):
+            duracion, pico, retenido = medir(modo, Parser, texto)
+            print(f"{n:>10} {nombre:<10} {duracion:>7.2f}s {pico / 1e6:>9.1f} {retenido / 1e6:>12.1f} "
+                  f"{(pico - retenido) / 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
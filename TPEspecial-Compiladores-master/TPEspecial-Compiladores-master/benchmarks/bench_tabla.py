@@ -0,0 +1,141 @@
+"""
+Memoria y costo de actualizacion de la tabla de simbolos con millones de
+entradas: la tabla por columnas (TablaDeSimbolos) contra la anterior, con un
+diccionario de cinco claves por entrada (TablaDiccionarios, reproducida aca).
+
+Para cada una se hace lo mismo que el compilador con cada identificador: el
+lexer lo agrega, el analisis semantico lo renombra con el mangling (X ->
+X:PROG), le asigna tipo y uso; ademas se agrega una constante y su negativo
+cada cuatro identificadores. Se mide el tiempo de cada fase y la memoria que
+queda ocupada (tracemalloc). Los nombres se internan antes de medir. Antes se
+verifica que las dos tablas se impriman igual.
+
+Uso:
+    python benchmarks/bench_tabla.py [entradas]     (por defecto 1000000)
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Nombres import internar
+from TablaDeSimbolos import TablaDeSimbolos
+
+
+class TablaDiccionarios(TablaDeSimbolos):
+    def __init__(self):
+        self.simbolos = {}
+
+    def agregar(self, lexema, tipo, valor=None, linea=None):
+        if lexema not in self.simbolos:
+            self.simbolos[lexema] = {'lexema': lexema, 'tipo': tipo, 'valor': valor, 'linea': linea, 'uso': 'N/A'}
+        return self.simbolos[lexema]
+
+    def asignar_tipo(self, lexema, tipo):
+        tipo_str = self._to_tipo_str(tipo)
+        if lexema not in self.simbolos:
+            self.agregar(lexema, tipo_str)
+            return
+        self.simbolos[lexema]['tipo'] = tipo_str
+
+    def renombrar(self, clave_vieja, clave_nueva):
+        if clave_vieja in self.simbolos and clave_nueva not in self.simbolos:
+            entrada = self.simbolos.pop(clave_vieja)
+            entrada['lexema'] = clave_nueva
+            self.simbolos[clave_nueva] = entrada
+            return True
+        return False
+
+    def asignar_uso(self, lexema, uso_str):
+        if lexema in self.simbolos:
+            entrada = self.simbolos[lexema]
+            current_uso = entrada.get('uso', 'N/A')
+            if current_uso == 'N/A' or not current_uso:
+                entrada['uso'] = uso_str
+            elif uso_str not in current_uso.split('-'):
+                entrada['uso'] += f"-{uso_str}"
+
+    def agregar_negativo(self, lexema_original, linea=None):
+        lexema_negativo = f"-{lexema_original[0]}"
+        if lexema_negativo not in self.simbolos:
+            self.simbolos[lexema_negativo] = {'lexema': lexema_negativo, 'tipo': 'DFLOAT_CONST',
+                                              'valor': lexema_negativo, 'linea': linea, 'uso': 'constante'}
+        return self.simbolos[lexema_negativo]
+
+    def __str__(self):
+        s = "".join("{:<25} {:<15} {:<25} {:<35} {:<10}\n".format(
+            e['lexema'], e['tipo'], str(e['valor']) if e['valor'] is not None else "N/A",
+            e['uso'], str(e['linea']) if e['linea'] is not None else "N/A") for e in self.simbolos.values())
+        return s
+
+
+def nombres(n):
+    return [(internar(f"X{i}"), internar(f"X{i}:PROG")) for i in range(n)]
+
+
+def cargar(tabla, pares, medir):
+    with medir("agregar"):
+        for i, (nombre, _) in enumerate(pares):
+            tabla.agregar(nombre, "Identificador", linea=i)
+            if i % 4 == 0:
+                tabla.agregar(f"{i}.5", "DFLOAT_CONST", valor=f"{i}.5", linea=i)
+                tabla.agregar_negativo([f"{i}.5"], linea=i)
+    with medir("renombrar"):
+        for nombre, mangled in pares:
+            tabla.renombrar(nombre, mangled)
+    with medir("asignar_tipo/uso"):
+        for i, (_, mangled) in enumerate(pares):
+            tabla.asignar_tipo(mangled, "UINT")
+            tabla.asignar_uso(mangled, "nombre de variable")
+            tabla.asignar_uso(mangled, "parametro-cv" if i % 2 else "nombre de variable")
+
+
+def cronometro(tiempos):
+    @contextmanager
+    def fase(nombre):
+        inicio = time.perf_counter()
+        yield
+        tiempos[nombre] = time.perf_counter() - inicio
+    return fase
+
+
+def medir(Tabla, pares):
+    gc.collect()
+    tiempos = {}
+    tabla = Tabla()
+    cargar(tabla, pares, cronometro(tiempos))
+    gc.collect()
+    tracemalloc.start()
+    tabla = Tabla()
+    cargar(tabla, pares, cronometro({}))
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tiempos, memoria, len(tabla.simbolos)
+
+
+def main():
+    entradas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    chica = nombres(200)
+    vieja, nueva = TablaDiccionarios(), TablaDeSimbolos()
+    cargar(vieja, chica, cronometro({}))
+    cargar(nueva, chica, cronometro({}))
+    filas_nuevas = "".join(str(nueva).splitlines(keepends=True)[3:-1])
+    assert str(vieja) == filas_nuevas, "las tablas no se imprimen igual"
+
+    pares = nombres(entradas)
+    print(f"{'':<20} {'agregar':>9} {'renombrar':>10} {'tipo/uso':>9} {'memoria':>10} {'B/entrada':>10}")
+    for nombre, Tabla in (("diccionarios", TablaDiccionarios), ("columnas", TablaDeSimbolos)):
+        tiempos, memoria, total = medir(Tabla, pares)
+        print(f"{nombre:<20} {tiempos['agregar']:>8.2f}s {tiempos['renombrar']:>9.2f}s "
+              f"{tiempos['asignar_tipo/uso']:>8.2f}s {memoria / 2**20:>7.1f} MB {memoria / total:>10.0f}")
+    print(f"({total} entradas)")
+
+
+if __name__ == "__main__":
+    main()
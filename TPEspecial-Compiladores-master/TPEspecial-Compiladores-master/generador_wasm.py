@@ -1,18 +1,57 @@
-import copy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from BinarioWasm import FuncionWasm, codificar_modulo
+from LocalesWasm import reusar_temporales
+from Nombres import fijo
+from Visitante import Visitante
+from Recorrido import ejecutar, recorrer
 from AnalisisSemantico import (
     Nodo, Binario, Unario, Literal, Identificador, AuxiliarWasm, Tipo,
-    ArbolSemantico, Programa, Bloque, DeclVar, Asignacion, MultiAsignacion,
+    ArbolSemantico, Programa, Bloque, DeclVar, Asignacion,
     Si, DoWhile, Print, Return, Invocacion, Funcion, Parametro, IdCalificado, Lambda, Trunc
 )
 
-class GeneradorWasm:
-    def __init__(self):
+# Funciones que el modulo importa de "env" (run_wasm.js): nombre y tipos de los parametros.
+# Los nombres del generador estan en minusculas: no se confunden con un identificador del programa
+ABORT = fijo("abort")
+CONSOLE_LOG = {"i32": fijo("console_log_i32"), "f64": fijo("console_log_f64")}
+IMPORTS = (
+    (ABORT, ("i32",)),
+    (CONSOLE_LOG["i32"], ("i32",)),
+    (CONSOLE_LOG["f64"], ("f64",)),
+)
+
+# La funcion principal, la que se exporta
+MAIN = fijo("main")
+
+
+@dataclass(frozen=True)
+class ValorEnPila:
+    """
+    Resultado de una expresion que quedo en la pila de operandos de Wasm (modo pila).
+    No genera codigo: lo consume la instruccion que sigue (local.set, if, br_if, call...).
+    """
+    tipo: Tipo
+
+
+class GeneradorWasm(Visitante):
+    PREFIJO = "_s_"
+
+    def __init__(self, pila: bool = False, reusar_locales: bool = False):
+        # pila=True: los valores intermedios de las expresiones quedan en la pila de operandos
+        # en lugar de guardarse cada uno en un $tN (ver _emitir_en_pila)
+        self.pila = pila
+        # reusar_locales=True: los $tN que no estan vivos a la vez comparten local (LocalesWasm.py)
+        self.reusar_locales = reusar_locales
         self._reset()
 
     def _reset(self):
-        self._funciones_generadas = {}
-        self._globales = {}
+        self.reporte_locales = [] # (funcion, locales antes, locales despues) con reusar_locales
+        self._funciones_wasm = {} # las funciones del modulo (main al final): de aca salen el WAT y el binario
+        self._globales = {} # nombre -> tipo wasm
         self._meta_funciones = {} #para semantica de cvr
+        self._auxiliares = {}
         self._contextos = [{
             "codigo": [],
             "locales": set(),
@@ -20,7 +59,8 @@ class GeneradorWasm:
             "variables_usuario": {},
             "funcion_actual": None,
             "contador_aux": 0,
-            "contador_bloques": 0
+            "contador_bloques": 0,
+            "control": {} # tipo wasm -> $tN de los controles de overflow y division por cero
         }]
 
     def _ctx(self):
@@ -34,7 +74,8 @@ class GeneradorWasm:
             "variables_usuario": self._ctx()["variables_usuario"].copy(),
             "funcion_actual": None,
             "contador_aux": self._ctx()["contador_aux"],
-            "contador_bloques": self._ctx()["contador_bloques"]
+            "contador_bloques": self._ctx()["contador_bloques"],
+            "control": {}
         })
 
     def _pop_context(self):
@@ -46,13 +87,33 @@ class GeneradorWasm:
         return None
 
     def _nueva_var_aux(self, tipo_wasm: str):
+        # Los auxiliares se identifican con su numero (el N de $tN)
         ctx = self._ctx()
-        nombre = f"$t{ctx['contador_aux']}"
+        nombre = ctx['contador_aux']
         ctx['contador_aux'] += 1
-        ctx['locales'].add(f"(local {nombre} {tipo_wasm})")
+        ctx['locales'].add((nombre, tipo_wasm))
         return nombre
     
-    def _asegurar_local(self, nombre_wasm: str, tipo_nodo: Tipo):
+    def _auxiliar_de_control(self, tipo_wasm: str):
+        # El $tN donde se guarda un valor solo para controlarlo (el resultado de una suma UINT,
+        # el divisor): se lee enseguida y no se vuelve a usar, asi que hay uno por tipo en cada
+        # contexto y todos los controles lo comparten
+        control = self._ctx()['control']
+        nombre = control.get(tipo_wasm)
+        if nombre is None:
+            nombre = control[tipo_wasm] = self._nueva_var_aux(tipo_wasm)
+        return nombre
+
+    def _auxiliar(self, nombre_aux: int, tipo: Tipo) -> AuxiliarWasm:
+        # Las variables $tN se reusan entre funciones y el generador nunca modifica
+        # un AuxiliarWasm: se comparte un nodo por (nombre, tipo)
+        clave = (nombre_aux, tipo)
+        nodo = self._auxiliares.get(clave)
+        if nodo is None:
+            nodo = self._auxiliares[clave] = AuxiliarWasm(nombre=nombre_aux, tipo=tipo)
+        return nodo
+
+    def _asegurar_local(self, nombre_wasm, tipo_nodo: Tipo):
         """
         Asegura que una variable este declarada en el ambito local actual.
         Si es global o parametro, no hace nada.
@@ -65,8 +126,16 @@ class GeneradorWasm:
             return
         
         tipo_wasm = self._get_tipo_wasm(tipo_nodo)
-        decl = f"(local {nombre_wasm} {tipo_wasm})"
-        ctx['locales'].add(decl)
+        ctx['locales'].add((nombre_wasm, tipo_wasm))
+
+    def _asignar_locales(self, nombre_funcion, ctx):
+        # Las declaraciones y el codigo con que se escribe la funcion, con los $tN ya reusados si
+        # se pidio
+        if not self.reusar_locales:
+            return ctx['locales'], ctx['codigo']
+        codigo, locales = reusar_temporales(ctx['codigo'], ctx['locales'])
+        self.reporte_locales.append((_wat(nombre_funcion), len(ctx['locales']), len(locales)))
+        return locales, codigo
 
     def _get_tipo_wasm(self, tipo_nodo: Tipo) -> str:
         if tipo_nodo == Tipo.UINT: return "i32"
@@ -88,50 +157,41 @@ class GeneradorWasm:
 
     '''
         Genera el ciclo principal junto con _procesar_bloque.
-        Hace una copia profunda del arbol porque la generacion de codigo ira modificando el arbol y no queremos perder el orginal
+        El arbol no se copia: la generacion no lo modifica (los valores ya calculados de cada
+        expresion van en una tabla aparte, ver _reducir_expresion_a_valor)
     '''
     def generar(self, arbol_semantico: ArbolSemantico):
         self._reset()
-        arbol_copiado = copy.deepcopy(arbol_semantico.raiz)
+        raiz = arbol_semantico.raiz
 
         # Aseguramos que sea la raiz del arbol. 
-        if isinstance(arbol_copiado, Programa) and isinstance(arbol_copiado.cuerpo, Bloque):
-            self._procesar_bloque(arbol_copiado.cuerpo)
+        if isinstance(raiz, Programa) and isinstance(raiz.cuerpo, Bloque):
+            self._procesar_bloque(raiz.cuerpo)
 
         # Obtiene el contexto actual del arbol
         main_ctx = self._ctx()
-        # Tomamos las declaraciones 
-        declaraciones_locales = "\n    ".join(sorted(list(main_ctx['locales'])))
-        # Tomamos el cuerpo del bloque main 
-        cuerpo_main = "\n    ".join(main_ctx['codigo'])
-        
-        imports = [
-            '(import "env" "abort" (func $abort (param i32)))',
-            '(import "env" "console_log_i32" (func $console_log_i32 (param i32)))',
-            '(import "env" "console_log_f64" (func $console_log_f64 (param f64)))'
-        ]
-        import_section = "\n  ".join(imports)
-        
-        # Toma los valores (codigo fuente generado) de las funciones generadas que contienen el codigo Wasm de cada funcion definida por el usuario
-        # Se pone en el modulo Wasm Final, antes de la funcion main, para que todas las funciones definidas por el usuario esten en el codigo wat generado.
-        funciones_generadas_str = "\n\n".join(self._funciones_generadas.values())
-        # Toma las globales generadas (si las hay)
-        globales_generados_str = "\n".join(self._globales.values())
-        # Retornamos un archivo en codigo Web Assembly 
-        return f"""(module
-  {import_section}
-
-{globales_generados_str}
-
-{funciones_generadas_str}
-
-  (func $main (result i32)
-    {declaraciones_locales}
-    {cuerpo_main}
-    i32.const 0
-  )
-  (export "main" (func $main))
-)"""
+        self._agregar_funcion(MAIN, [], "i32", main_ctx, [("i32.const", 0)])
+
+        # Retornamos un archivo en codigo Web Assembly, escrito desde las mismas funciones que
+        # codifica generar_binario
+        return _modulo_wat(self._globales, self._funciones_wasm.values())
+
+    def generar_binario(self) -> bytes:
+        '''
+            El modulo que armo el ultimo generar(), codificado directamente en binario (.wasm) con
+            BinarioWasm.codificar_modulo: las mismas funciones e instrucciones que el WAT.
+        '''
+        return codificar_modulo(IMPORTS, self._globales, list(self._funciones_wasm.values()), MAIN)
+
+    def _agregar_funcion(self, nombre, parametros, resultado, ctx, final=()):
+        # La funcion terminada pasa al modulo: las locales (con los $tN ya reusados si se pidio) en
+        # el orden del WAT, por nombre, y el codigo con las instrucciones de final al terminar
+        locales, codigo = self._asignar_locales(nombre, ctx)
+        locales = sorted(locales, key=lambda local: (_wat(local[0]), local[1]))
+        self._funciones_wasm[nombre] = FuncionWasm(nombre, parametros, resultado, locales, codigo + list(final))
+
+    def _declarar_global(self, nombre, tipo_wasm: str):
+        self._globales[nombre] = tipo_wasm
     '''
         Es quien comienza el procesamiento del arbol,
         puede recibir un bloque o una lista de sentencias. 
@@ -139,6 +199,17 @@ class GeneradorWasm:
         a dicha sentencia.
     '''
     def _procesar_bloque(self, bloque_o_lista):
+        # Los bloques anidados (if, do-while, funciones, lambdas) no se procesan con
+        # recursion: los metodos _s_ piden su bloque con `yield "bloque", b` y
+        # Recorrido.ejecutar lleva la pila
+        ejecutar(self._paso, "bloque", bloque_o_lista)
+
+    def _paso(self, pedido: str, nodo):
+        if pedido == "bloque":
+            return self._sentencias_del_bloque(nodo)
+        return self._procesar_sentencia(nodo)
+
+    def _sentencias_del_bloque(self, bloque_o_lista):
         sentencias_a_procesar = []
         if isinstance(bloque_o_lista, Bloque):
             sentencias_a_procesar = bloque_o_lista.sentencias
@@ -146,248 +217,266 @@ class GeneradorWasm:
             sentencias_a_procesar = bloque_o_lista
 
         for sentencia in sentencias_a_procesar:
-            self._procesar_sentencia(sentencia)
+            yield "sentencia", sentencia
 
     def _procesar_sentencia(self, sentencia: Nodo):
-        # Obtenemos el contexto actual de la funcion/bloque/sentencia.
-        ctx = self._ctx()
-        # Lista de instrucciones ( codigo Wasm ) que se esta generando, guardaremos lo que vamos generando. 
-        codigo = ctx['codigo']
-
         '''
-            Es un gran if/elif que decide que nodo es el actual del AST 
-            y genera el codigo wasm correspondiente
+            Decide que nodo es el actual del AST y genera el codigo wasm correspondiente.
+            Cada clase de sentencia tiene su metodo _s_NombreDeLaClase; metodo_para (Visitante)
+            lo resuelve una vez por clase. Lo que no es una sentencia conocida no genera codigo.
         '''
+        metodo = self.metodo_para(sentencia.__class__)
+        if metodo:
+            return metodo(self, sentencia)
 
-        '''
-            Por cada identificador declarado, lo agrega a contexto como variable local con su tipo
-            La idea es poder usar local.set $nombre y local.get $nombre en el codigo generado.
-        '''
-        if isinstance(sentencia, DeclVar):
-            for ident in sentencia.ids:
-                nombre_var = f"${ident.nombre}"
-                ctx['variables_usuario'][ident.nombre] = nombre_var
-                tipo_wasm = self._get_tipo_wasm(sentencia.tipo_decl)
-
-                # Si estamos en el contexto global (no hay padre), es una variable global
-                if self._ctx().get("funcion_actual") is None and len(self._contextos) == 1:
-                    self._globales[nombre_var] = f"(global {nombre_var} (mut {tipo_wasm}) ({tipo_wasm}.const 0))"
-                else: # Si no, es una variable local a la funcion
-                    ctx['locales'].add(f"(local {nombre_var} {tipo_wasm})")
-        
-        
-        elif isinstance(sentencia, (Asignacion, MultiAsignacion)):
-            '''
-                Maneja asignaciones y asingaciones multiples.
-                Obtiene la/s expresiones y el/los destinos. 
-                sigue....
-            '''
-            destinos = [sentencia.destino] if isinstance(sentencia, Asignacion) else sentencia.destinos
-            expresiones = [sentencia.expr] if isinstance(sentencia, Asignacion) else sentencia.expresiones
+    '''
+        Por cada identificador declarado, lo agrega a contexto como variable local con su tipo
+        La idea es poder usar local.set $nombre y local.get $nombre en el codigo generado.
+    '''
+    def _s_DeclVar(self, sentencia: DeclVar):
+        ctx = self._ctx()
+        for ident in sentencia.ids:
+            nombre_var = ident.nombre
+            ctx['variables_usuario'][ident.nombre] = nombre_var
+            tipo_wasm = self._get_tipo_wasm(sentencia.tipo_decl)
 
-            nodos_auxiliares = [self._reducir_expresion_a_valor(expr) for expr in expresiones]
-            for i, destino_ident in enumerate(destinos):
-                if i < len(nodos_auxiliares) and isinstance(destino_ident, (Identificador, IdCalificado)):
-                    nodo_aux = nodos_auxiliares[i]
-                    
-                    # Si el nodo auxiliar no es una variable temporal de wasm, significa que la expresion
-                    # no pudo ser resuelta a un valor (ej. AA.A). En este caso, no generamos codigo
-                    # para la asignacion para evitar errores de pila vacia.
-                    if not isinstance(nodo_aux, AuxiliarWasm):
-                        continue
-
-                    nombre_simple = ""
-                    if isinstance(destino_ident, Identificador):
-                        nombre_simple = destino_ident.nombre
-                    elif isinstance(destino_ident, IdCalificado):
-                        # Para la asignacion, el nombre relevante es el del atributo.
-                        nombre_simple = destino_ident.atributo.nombre
-
-                    nombre_var_wasm = self._get_nombre_variable_wasm(nombre_simple)
-
-                    if nombre_var_wasm:
-                        self._generar_codigo_hoja(nodo_aux)
-                        if nombre_var_wasm in self._globales:
-                            codigo.append(f"global.set {nombre_var_wasm}")
-                        else:
-                            # Aseguramos que la variable exista localmente si estamos asignando a una variable de un padre
-                            self._asegurar_local(nombre_var_wasm, destino_ident.tipo)
-                            codigo.append(f"local.set {nombre_var_wasm}")
-
-        elif isinstance(sentencia, Si):
-            nodo_cond_aux = self._reducir_expresion_a_valor(sentencia.condicion)
-            self._generar_codigo_hoja(nodo_cond_aux)
-            
-            codigo.append("if")
-            self._procesar_bloque(sentencia.entonces)
-            if sentencia.sino:
-                codigo.append("else")
-                self._procesar_bloque(sentencia.sino)
-            codigo.append("end")
-
-        elif isinstance(sentencia, DoWhile):
-            loop_id = ctx['contador_bloques']
-            ctx['contador_bloques'] += 1
-            codigo.append(f"(block $exit_loop_{loop_id}")
-            codigo.append(f"  (loop $loop_body_{loop_id}")
-            self._procesar_bloque(sentencia.cuerpo)
-            
-            nodo_cond_aux = self._reducir_expresion_a_valor(sentencia.condicion)
-            self._generar_codigo_hoja(nodo_cond_aux)
+            # Si estamos en el contexto global (no hay padre), es una variable global
+            if self._ctx().get("funcion_actual") is None and len(self._contextos) == 1:
+                self._declarar_global(nombre_var, tipo_wasm)
+            else: # Si no, es una variable local a la funcion
+                ctx['locales'].add((nombre_var, tipo_wasm))
 
-            codigo.append(f"    br_if $loop_body_{loop_id}")
-            codigo.append("  )")
-            codigo.append(")")
+    '''
+        Maneja asignaciones y asingaciones multiples.
+        Obtiene la/s expresiones y el/los destinos. 
+        sigue....
+    '''
+    def _s_Asignacion(self, sentencia: Nodo):
+        codigo = self._ctx()['codigo']
+        destinos = [sentencia.destino] if isinstance(sentencia, Asignacion) else sentencia.destinos
+        expresiones = [sentencia.expr] if isinstance(sentencia, Asignacion) else sentencia.expresiones
 
-        elif isinstance(sentencia, Print):
-            nodo_aux = self._reducir_expresion_a_valor(sentencia.expr)
-            # Si el tipo es string, no genera nada ya que WASM no permite almacenar Strings
-            if getattr(nodo_aux, "tipo", None) == Tipo.STRING:
-                return  # No hacer nada para prints de cadenas
-            self._generar_codigo_hoja(nodo_aux)
-            tipo_expr = self._get_tipo_wasm(nodo_aux.tipo)
-            codigo.append(f"call $console_log_{tipo_expr}")
-
-        elif isinstance(sentencia, Funcion):
-            self._push_context()
-            ctx_func = self._ctx()
-            ctx_func['funcion_actual'] = sentencia
-            nombre_func_wasm = f"${sentencia.nombre}"
-            #Por_ref=True significa CVR (sin 'cv')
-            info_params = []
-
-            #CONTROL DE RECURSION: INICIO
-            #1. Se crea variable global de guardia para esta funcion. Es una suerte de bandera, de semaforo.
-            nombre_guardia = f"$bandera_de_recursion_{sentencia.nombre}"
-            self._globales[nombre_guardia] = f"(global {nombre_guardia} (mut i32) (i32.const 0))"
-            
-            # Guardamos el nombre del guardia en el contexto para usarlo en los Returns
-            ctx_func['bandera_de_recursion'] = nombre_guardia
-
-            # 2. Se genera codigo de verificacion al inicio de la funcion
-            # Si el guardia es 1, abortar (Error 3)
-            ctx_func['codigo'].append(f"global.get {nombre_guardia}")
-            ctx_func['codigo'].append("if")
-            ctx_func['codigo'].append("    i32.const 3")
-            ctx_func['codigo'].append("    call $abort")
-            ctx_func['codigo'].append("end")
-            
-            # Marcar que estamos dentro de la funcion (Setear guardia a 1)
-            ctx_func['codigo'].append("i32.const 1")
-            ctx_func['codigo'].append(f"global.set {nombre_guardia}")
-            #FIN CONTROL DE RECURSION
-
-            params_str_list = []
-            for p in sentencia.params:
-                nombre_param_wasm = f"${p.nombre}"
-                params_str_list.append(f"(param {nombre_param_wasm} {self._get_tipo_wasm(p.tipo)})")
-                ctx_func['variables_usuario'][p.nombre] = nombre_param_wasm
-                ctx_func['parametros'].add(nombre_param_wasm) # Registrar parametro
+        if self.pila and len(expresiones) > 1:
+            # Todos los valores se calculan antes de asignar el primero: cada uno va a un auxiliar
+            nodos_auxiliares = [self._a_auxiliar(self._reducir_expresion_a_valor(expr)) for expr in expresiones]
+        else:
+            nodos_auxiliares = [self._reducir_expresion_a_valor(expr) for expr in expresiones]
+        asignados = set()
+        for i, destino_ident in enumerate(destinos):
+            if i < len(nodos_auxiliares) and isinstance(destino_ident, (Identificador, IdCalificado)):
+                nodo_aux = nodos_auxiliares[i]
                 
-                # Si es por referencia (CVR), creamos una global para el valor de retorno
-                if p.por_ref:
-                    nombre_global_cvr = f"$cvr_{sentencia.nombre}_{p.nombre}"
-                    tipo_wasm = self._get_tipo_wasm(p.tipo)
-                    self._globales[nombre_global_cvr] = f"(global {nombre_global_cvr} (mut {tipo_wasm}) ({tipo_wasm}.const 0))"
-                    info_params.append((p.nombre, True, nombre_global_cvr))
-                else:
-                    info_params.append((p.nombre, False, None))
+                # Si la expresion no pudo ser resuelta a un valor (ej. AA.A), no generamos codigo
+                # para la asignacion para evitar errores de pila vacia.
+                if not self._tiene_valor(nodo_aux):
+                    continue
+
+                nombre_simple = None
+                if isinstance(destino_ident, Identificador):
+                    nombre_simple = destino_ident.nombre
+                elif isinstance(destino_ident, IdCalificado):
+                    # Para la asignacion, el nombre relevante es el del atributo.
+                    nombre_simple = destino_ident.atributo.nombre
+
+                nombre_var_wasm = self._get_nombre_variable_wasm(nombre_simple)
+
+                if nombre_var_wasm:
+                    asignados.add(i)
+                    self._generar_codigo_hoja(nodo_aux)
+                    if nombre_var_wasm in self._globales:
+                        codigo.append(("global.set", nombre_var_wasm))
+                    else:
+                        # Aseguramos que la variable exista localmente si estamos asignando a una variable de un padre
+                        self._asegurar_local(nombre_var_wasm, destino_ident.tipo)
+                        codigo.append(("local.set", nombre_var_wasm))
+
+        # En modo pila, el valor que no se asigno a nada se saca de la pila
+        for i, nodo_aux in enumerate(nodos_auxiliares):
+            if isinstance(nodo_aux, ValorEnPila) and i not in asignados:
+                codigo.append(("drop", None))
+
+    _s_MultiAsignacion = _s_Asignacion
+
+    def _s_Si(self, sentencia: Si):
+        codigo = self._ctx()['codigo']
+        nodo_cond_aux = self._reducir_expresion_a_valor(sentencia.condicion)
+        self._generar_codigo_hoja(nodo_cond_aux)
+        
+        codigo.append(("if", None))
+        yield "bloque", sentencia.entonces
+        if sentencia.sino:
+            codigo.append(("else", None))
+            yield "bloque", sentencia.sino
+        codigo.append(("end", None))
+
+    def _s_DoWhile(self, sentencia: DoWhile):
+        ctx = self._ctx()
+        codigo = ctx['codigo']
+        loop_id = ctx['contador_bloques']
+        ctx['contador_bloques'] += 1
+        codigo.append(("block", ("exit_loop", loop_id)))
+        codigo.append(("loop", ("loop_body", loop_id)))
+        yield "bloque", sentencia.cuerpo
+        
+        nodo_cond_aux = self._reducir_expresion_a_valor(sentencia.condicion)
+        self._generar_codigo_hoja(nodo_cond_aux)
 
-            self._meta_funciones[sentencia.nombre] = info_params
+        codigo.append(("br_if", ("loop_body", loop_id)))
+        codigo.append(("end", None))
+        codigo.append(("end", None))
 
-            params_str = " ".join(params_str_list)
-            result_str = f"(result {self._get_tipo_wasm(sentencia.retorno)})" if sentencia.retorno != Tipo.VOID else ""
-            
-            self._procesar_bloque(sentencia.cuerpo)
+    def _s_Print(self, sentencia: Print):
+        codigo = self._ctx()['codigo']
+        nodo_aux = self._reducir_expresion_a_valor(sentencia.expr)
+        # Si el tipo es string, no genera nada ya que WASM no permite almacenar Strings
+        if getattr(nodo_aux, "tipo", None) == Tipo.STRING:
+            return  # No hacer nada para prints de cadenas
+        self._generar_codigo_hoja(nodo_aux)
+        tipo_expr = self._get_tipo_wasm(nodo_aux.tipo)
+        codigo.append(("call", CONSOLE_LOG[tipo_expr]))
+
+    def _s_Funcion(self, sentencia: Funcion):
+        self._push_context()
+        ctx_func = self._ctx()
+        ctx_func['funcion_actual'] = sentencia
+        nombre_func_wasm = sentencia.nombre
+        #Por_ref=True significa CVR (sin 'cv')
+        info_params = []
+
+        #CONTROL DE RECURSION: INICIO
+        #1. Se crea variable global de guardia para esta funcion. Es una suerte de bandera, de semaforo.
+        nombre_guardia = ("bandera_de_recursion", sentencia.nombre)
+        self._declarar_global(nombre_guardia, "i32")
+        
+        # Guardamos el nombre del guardia en el contexto para usarlo en los Returns
+        ctx_func['bandera_de_recursion'] = nombre_guardia
+
+        # 2. Se genera codigo de verificacion al inicio de la funcion
+        # Si el guardia es 1, abortar (Error 3)
+        ctx_func['codigo'].append(("global.get", nombre_guardia))
+        ctx_func['codigo'].append(("if", None))
+        ctx_func['codigo'].append(("i32.const", 3))
+        ctx_func['codigo'].append(("call", ABORT))
+        ctx_func['codigo'].append(("end", None))
+        
+        # Marcar que estamos dentro de la funcion (Setear guardia a 1)
+        ctx_func['codigo'].append(("i32.const", 1))
+        ctx_func['codigo'].append(("global.set", nombre_guardia))
+        #FIN CONTROL DE RECURSION
+
+        parametros = []
+        for p in sentencia.params:
+            nombre_param_wasm = p.nombre
+            parametros.append((nombre_param_wasm, self._get_tipo_wasm(p.tipo)))
+            ctx_func['variables_usuario'][p.nombre] = nombre_param_wasm
+            ctx_func['parametros'].add(nombre_param_wasm) # Registrar parametro
             
-            # CONTROL DE RECURSION: HABILITAMOS RESET DEL GUARDIA
-            # Asegurar que el guardia se resetee al salir naturalmente de la funcion (sin return explicito)
-            ctx_func['codigo'].append("i32.const 0")
-            ctx_func['codigo'].append(f"global.set {nombre_guardia}")
+            # Si es por referencia (CVR), creamos una global para el valor de retorno
+            if p.por_ref:
+                nombre_global_cvr = ("cvr", sentencia.nombre, p.nombre)
+                tipo_wasm = self._get_tipo_wasm(p.tipo)
+                self._declarar_global(nombre_global_cvr, tipo_wasm)
+                info_params.append((p.nombre, True, nombre_global_cvr))
+            else:
+                info_params.append((p.nombre, False, None))
 
-            if sentencia.retorno != Tipo.VOID:
-                tipo_wasm = self._get_tipo_wasm(sentencia.retorno)
-                ctx_func['codigo'].append(f"{tipo_wasm}.const 0")
+        self._meta_funciones[sentencia.nombre] = info_params
+        resultado = self._get_tipo_wasm(sentencia.retorno) if sentencia.retorno != Tipo.VOID else None
+        
+        yield "bloque", sentencia.cuerpo
+        
+        # CONTROL DE RECURSION: HABILITAMOS RESET DEL GUARDIA
+        # Asegurar que el guardia se resetee al salir naturalmente de la funcion (sin return explicito)
+        ctx_func['codigo'].append(("i32.const", 0))
+        ctx_func['codigo'].append(("global.set", nombre_guardia))
 
-            locales_func_str = "\n    ".join(sorted(list(ctx_func['locales'])))
-            cuerpo_func_str = "\n    ".join(ctx_func['codigo'])
-            
-            self._funciones_generadas[nombre_func_wasm] = f"  (func {nombre_func_wasm} {params_str} {result_str}\n    {locales_func_str}\n    {cuerpo_func_str}\n  )"
-            
-            self._pop_context()
-
-        elif isinstance(sentencia, Invocacion):
-            nodo_aux = self._reducir_expresion_a_valor(sentencia)
-            if nodo_aux.tipo != Tipo.VOID:
-                self._generar_codigo_hoja(nodo_aux)
-                codigo.append("drop")
-
-        elif isinstance(sentencia, Return):
-            if sentencia.expr:
-                nodo_aux = self._reducir_expresion_a_valor(sentencia.expr)
-                self._generar_codigo_hoja(nodo_aux)
-            
-            func_actual = ctx.get('funcion_actual')
-            if func_actual and func_actual.nombre in self._meta_funciones:
-                for p_nombre, es_cvr, g_nombre in self._meta_funciones[func_actual.nombre]:
-                    if es_cvr:
-                        codigo.append(f"local.get ${p_nombre}")
-                        codigo.append(f"global.set {g_nombre}")
-
-            codigo.append("return")
+        if resultado is not None:
+            ctx_func['codigo'].append((f"{resultado}.const", 0))
+
+        self._agregar_funcion(nombre_func_wasm, parametros, resultado, ctx_func)
         
+        self._pop_context()
 
-        elif isinstance(sentencia, Lambda):
-            #Creamos un nuevo Ambito para la lambda.
-            self._push_context()
-            ctx_lambda = self._ctx()
-            #Se declara al parametro como si fuese una variable local del ambito.
-            param_nombre_py = sentencia.parametro.nombre
-            nombre_param_wasm = f"${param_nombre_py}"
-            ctx_lambda['variables_usuario'][param_nombre_py] = nombre_param_wasm
-            # Usamos el tipo del nodo Parametro
-            tipo_wasm = self._get_tipo_wasm(sentencia.parametro.tipo)
-            ctx_lambda['locales'].add(f"(local {nombre_param_wasm} {tipo_wasm})")
-            #El argumento se asigna al parametro
-            #Se genera en el contexto padre de la lambda.
-            nodo_arg_aux = self._reducir_expresion_a_valor(sentencia.argumento)
-            self._generar_codigo_hoja(nodo_arg_aux)
-            #La instruccion de asignacion va al codigo del contexto de la lambda.
-            ctx_lambda['codigo'].append(f"local.set {nombre_param_wasm}")
-            #Procesamos el cuerpo de la lambda dentro de su propio ambito.
-            self._procesar_bloque(sentencia.cuerpo)
-            #Finalizamos el ambito de la lambda, integrando su codigo y locales en el padre.
-            ctx_finalizado = self._pop_context()
-            ctx_padre = self._ctx()
-            #Agregamos las declaraciones de locales de la lambda al padre.
-            ctx_padre['locales'].update(ctx_finalizado['locales'])
-            # Agregamos el codigo generado por la lambda al padre
-            ctx_padre['codigo'].extend(ctx_finalizado['codigo'])
-
-    def _reemplazar_invocaciones(self, nodo: Nodo) -> Nodo:
-        if isinstance(nodo, Invocacion):
-            # Procesar esta invocacion y convertirla en auxiliar
-            return self._reducir_expresion_a_valor(nodo)
-
-        elif isinstance(nodo, Binario):
-            # Reemplazar invocaciones en ambos lados
-            nodo.izq = self._reemplazar_invocaciones(nodo.izq)
-            nodo.der = self._reemplazar_invocaciones(nodo.der)
-            return nodo
-
-        elif isinstance(nodo, Unario):
-            nodo.expr = self._reemplazar_invocaciones(nodo.expr)
-            return nodo
-
-        elif isinstance(nodo, Trunc):
-            nodo.expr = self._reemplazar_invocaciones(nodo.expr)
-            return nodo
+    def _s_Invocacion(self, sentencia: Invocacion):
+        codigo = self._ctx()['codigo']
+        nodo_aux = self._reducir_expresion_a_valor(sentencia)
+        if nodo_aux.tipo != Tipo.VOID:
+            self._generar_codigo_hoja(nodo_aux)
+            codigo.append(("drop", None))
 
-        else:
-            # Hojas (Literal, Identificador, AuxiliarWasm) se devuelven sin cambios
-            return nodo
+    def _s_Return(self, sentencia: Return):
+        ctx = self._ctx()
+        codigo = ctx['codigo']
+        if sentencia.expr:
+            nodo_aux = self._reducir_expresion_a_valor(sentencia.expr)
+            self._generar_codigo_hoja(nodo_aux)
+        
+        func_actual = ctx.get('funcion_actual')
+        if func_actual and func_actual.nombre in self._meta_funciones:
+            for p_nombre, es_cvr, g_nombre in self._meta_funciones[func_actual.nombre]:
+                if es_cvr:
+                    codigo.append(("local.get", p_nombre))
+                    codigo.append(("global.set", g_nombre))
+
+        codigo.append(("return", None))
+
+    def _s_Lambda(self, sentencia: Lambda):
+        #Creamos un nuevo Ambito para la lambda.
+        self._push_context()
+        ctx_lambda = self._ctx()
+        #Se declara al parametro como si fuese una variable local del ambito.
+        param_nombre_py = sentencia.parametro.nombre
+        nombre_param_wasm = param_nombre_py
+        ctx_lambda['variables_usuario'][param_nombre_py] = nombre_param_wasm
+        # Usamos el tipo del nodo Parametro
+        tipo_wasm = self._get_tipo_wasm(sentencia.parametro.tipo)
+        ctx_lambda['locales'].add((nombre_param_wasm, tipo_wasm))
+        #El argumento se asigna al parametro
+        #Se genera en el contexto padre de la lambda.
+        nodo_arg_aux = self._reducir_expresion_a_valor(sentencia.argumento)
+        self._generar_codigo_hoja(nodo_arg_aux)
+        #La instruccion de asignacion va al codigo del contexto de la lambda.
+        ctx_lambda['codigo'].append(("local.set", nombre_param_wasm))
+        #Procesamos el cuerpo de la lambda dentro de su propio ambito.
+        yield "bloque", sentencia.cuerpo
+        #Finalizamos el ambito de la lambda, integrando su codigo y locales en el padre.
+        ctx_finalizado = self._pop_context()
+        ctx_padre = self._ctx()
+        #Agregamos las declaraciones de locales de la lambda al padre.
+        ctx_padre['locales'].update(ctx_finalizado['locales'])
+        # Agregamos el codigo generado por la lambda al padre
+        ctx_padre['codigo'].extend(ctx_finalizado['codigo'])
+
+    def _reducir_invocaciones(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]):
+        '''
+            Calcula cada invocacion dentro de la expresion, de izquierda a derecha, y anota su auxiliar
+            en valores. Se baja por Binario, Unario y Trunc (con Recorrido.recorrer, sin recursion); las
+            hojas (Literal, Identificador, AuxiliarWasm) quedan sin cambios. Es un paso de
+            Recorrido.ejecutar: el valor de cada invocacion se pide con `yield`.
+        '''
+        invocaciones = []
+
+        def entrar(n: Nodo, padre: Nodo, nivel: int):
+            if not isinstance(n, Invocacion):
+                return True
+            invocaciones.append(n)
+            return False
+
+        recorrer(nodo, _operandos, entrar)
+        for invocacion in invocaciones:
+            # En modo pila el resultado se guarda igual en un auxiliar: se calcula antes que el resto
+            # de la expresion y se lee despues
+            aux = self._a_auxiliar((yield (invocacion,)))
+            if aux is not invocacion:  # una invocacion VOID no tiene valor: la expresion queda sin reducir
+                valores[id(invocacion)] = (invocacion, aux)
 
     def _reducir_expresion_a_valor(self, expresion: Nodo) -> Nodo:
+        # Las invocaciones dentro de la expresion y de sus argumentos (F(F(...)->X)->X) no se
+        # reducen con recursion: _valor_de_expresion pide cada una con `yield` y
+        # Recorrido.ejecutar lleva la pila
+        return ejecutar(self._valor_de_expresion, expresion)
+
+    def _valor_de_expresion(self, expresion: Nodo):
         # Si la expresion es un literal string, no se puede generar código para el.
         if isinstance(expresion, Literal) and getattr(expresion, "tipo", None) == Tipo.STRING:
             return expresion
@@ -395,11 +484,11 @@ class GeneradorWasm:
         # Caso especial: Invocacion debe procesarse primero
         if isinstance(expresion, Invocacion):
             for arg in expresion.argumentos:
-                nodo_arg_aux = self._reducir_expresion_a_valor(arg[0])
+                nodo_arg_aux = yield (arg[0],)
                 self._generar_codigo_hoja(nodo_arg_aux)
-            self._ctx()['codigo'].append(f"call ${expresion.nombre}")
+            self._ctx()['codigo'].append(("call", expresion.nombre))
 
-            # Verificamos si la funcion invocada tiene parametros CVR
+        # Verificamos si la funcion invocada tiene parametros CVR
             if expresion.nombre in self._meta_funciones:
                 info_params = self._meta_funciones[expresion.nombre]
                 # Iteramos sobre los argumentos pasados
@@ -412,181 +501,369 @@ class GeneradorWasm:
                             nombre_var_wasm = self._get_nombre_variable_wasm(arg_nodo.nombre)
                             if nombre_var_wasm:
                                 # Leemos de la global temporal CVR
-                                self._ctx()['codigo'].append(f"global.get {g_nombre}")       
+                                self._ctx()['codigo'].append(("global.get", g_nombre))       
                                 #Se verifica si es global o local antes de escribir
                                 if nombre_var_wasm in self._globales:
-                                    self._ctx()['codigo'].append(f"global.set {nombre_var_wasm}")
+                                    self._ctx()['codigo'].append(("global.set", nombre_var_wasm))
                                 else:
                                     # Asegurar local para CVR tambien
                                     self._asegurar_local(nombre_var_wasm, arg_nodo.tipo)
-                                    self._ctx()['codigo'].append(f"local.set {nombre_var_wasm}")
+                                    self._ctx()['codigo'].append(("local.set", nombre_var_wasm))
 
             if expresion.tipo != Tipo.VOID:
+                if self.pila:
+                    return ValorEnPila(expresion.tipo)
                 tipo_wasm = self._get_tipo_wasm(expresion.tipo)
                 nombre_aux = self._nueva_var_aux(tipo_wasm)
-                self._ctx()['codigo'].append(f"local.set {nombre_aux}")
-                return AuxiliarWasm(nombre=nombre_aux, tipo=expresion.tipo)
+                self._ctx()['codigo'].append(("local.set", nombre_aux))
+                return self._auxiliar(nombre_aux, expresion.tipo)
             else:
                 return expresion
 
+        # Lo ya calculado de la expresion (invocaciones y subexpresiones) se anota en una tabla
+        # aparte, id(nodo) -> (nodo, auxiliar), en lugar de reemplazar los nodos en el arbol.
+        # Guardar el nodo mantiene vivo su id() (y su vista, con --arena) mientras dura la tabla
+        valores: Dict[int, Tuple[Nodo, Nodo]] = {}
+
         # las invocaciones se convierten en auxiliares primero
-        expresion_preparada = self._reemplazar_invocaciones(expresion)
+        yield from self._reducir_invocaciones(expresion, valores)
+
+        if self.pila and self._se_emite_en_pila(expresion, valores):
+            return self._emitir_en_pila(expresion, valores)
 
         #se procesan las invocaciones ya convertidas a auxiliares
-        nodo_reducido = self._procesar_expresion_completa(expresion_preparada)
+        nodo_reducido = self._procesar_expresion_completa(expresion, valores)
 
         if not self._es_hoja(nodo_reducido): return nodo_reducido
 
-        if not isinstance(nodo_reducido, AuxiliarWasm):
-            self._generar_codigo_hoja(nodo_reducido)
-            tipo_wasm = self._get_tipo_wasm(nodo_reducido.tipo)
-            nombre_aux = self._nueva_var_aux(tipo_wasm)
-            self._ctx()['codigo'].append(f"local.set {nombre_aux}")
-            nodo_reducido = AuxiliarWasm(nombre=nombre_aux, tipo=nodo_reducido.tipo)
+        return self._a_auxiliar(nodo_reducido)
+
+    def _a_auxiliar(self, valor: Nodo) -> Nodo:
+        # Guarda en un $tN nuevo un valor que se va a leer mas tarde: una hoja o lo que quedo en
+        # la pila. Un auxiliar, o algo que no es un valor, queda como esta
+        if isinstance(valor, AuxiliarWasm) or not self._tiene_valor(valor):
+            return valor
+        self._generar_codigo_hoja(valor)
+        nombre_aux = self._nueva_var_aux(self._get_tipo_wasm(valor.tipo))
+        self._ctx()['codigo'].append(("local.set", nombre_aux))
+        return self._auxiliar(nombre_aux, valor.tipo)
+
+    def _tiene_valor(self, nodo) -> bool:
+        # Si lo que devolvio _reducir_expresion_a_valor se puede usar como valor
+        if isinstance(nodo, ValorEnPila):
+            return True
+        if isinstance(nodo, Literal) and getattr(nodo, "tipo", None) == Tipo.STRING:
+            return False
+        return self._es_hoja(nodo)
+
+    def _se_emite_en_pila(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]) -> bool:
+        # Solo se emite en la pila una expresion que se reduce completa: trunc afuera de todo,
+        # Binario y valores. Lo demas (Unario, trunc adentro, invocacion VOID) sigue por auxiliares
+        while isinstance(nodo, Trunc):
+            nodo = nodo.expr
+        pila = [nodo]
+        while pila:
+            actual = pila.pop()
+            if self._valor(actual, valores) is not None:
+                continue
+            if not isinstance(actual, Binario):
+                return False
+            pila.append(actual.der)
+            pila.append(actual.izq)
+        return True
+
+    def _emitir_en_pila(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]):
+        '''
+            Modo pila: emite la expresion en postorden dejando cada resultado intermedio en la pila
+            de operandos, que es donde lo toma el operador siguiente. Los valores de valores (las
+            invocaciones) y las hojas se leen donde se usan. Si la expresion es una hoja no se emite
+            nada y se devuelve la hoja; si no, un ValorEnPila.
+        '''
+        codigo = self._ctx()['codigo']
+        truncs = []
+        while isinstance(nodo, Trunc):
+            truncs.append(nodo)
+            nodo = nodo.expr
+
+        valor = self._valor(nodo, valores)
+        if valor is not None and not truncs:
+            return valor
+
+        pila = [(nodo, False)]
+        while pila:
+            actual, operandos_listos = pila.pop()
+            valor = self._valor(actual, valores)
+            if valor is not None:
+                self._generar_codigo_hoja(valor)
+            elif not operandos_listos:
+                pila.append((actual, True))
+                pila.append((actual.der, False))
+                pila.append((actual.izq, False))
+            else:
+                self._operar_en_pila(actual, valores)
+
+        for _ in truncs:
+            codigo.append(("i32.trunc_f64_u", None))
+        return ValorEnPila(truncs[0].tipo if truncs else nodo.tipo)
 
-        return nodo_reducido
+    def _operar_en_pila(self, binario: Binario, valores: Dict[int, Tuple[Nodo, Nodo]]):
+        # Con los dos operandos en la pila, aplica el operador. Solo se usa un $tN donde el valor
+        # se lee dos veces: el divisor calculado (para compararlo con 0) y la suma con control
+        # de overflow
+        codigo = self._ctx()['codigo']
+        if binario.op == '/':
+            tipo_divisor = self._get_tipo_wasm(binario.der.tipo)
+            divisor = self._valor(binario.der, valores)
+            if divisor is None:
+                divisor = self._auxiliar(self._auxiliar_de_control(tipo_divisor), binario.der.tipo)
+                codigo.append(("local.tee", divisor.nombre))
+            self._generar_codigo_hoja(divisor)
+            codigo.append((f"{tipo_divisor}.const", 0))
+            codigo.append((f"{tipo_divisor}.eq", None))
+            codigo.append(("if", None))
+            codigo.append(("i32.const", 1))
+            codigo.append(("call", ABORT))
+            codigo.append(("end", None))
+            codigo.append((self._get_op_instruccion('/', binario.tipo), None))
+
+        elif binario.op == '+' and binario.tipo == Tipo.UINT:
+            temp_check = self._auxiliar_de_control("i32")
+            codigo.append(("i32.add", None))
+            codigo.append(("local.tee", temp_check))
+            codigo.append(("local.get", temp_check))
+            codigo.append(("i32.const", 65535))
+            codigo.append(("i32.gt_u", None))
+            codigo.append(("if", None))
+            codigo.append(("i32.const", 2))
+            codigo.append(("call", ABORT))
+            codigo.append(("end", None))
+
+        else:
+            codigo.append((self._get_op_instruccion(binario.op, binario.tipo), None))
     
-    def _procesar_expresion_completa(self, nodo: Nodo) -> Nodo:
+    def _procesar_expresion_completa(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]) -> Nodo:
         codigo = self._ctx()['codigo']
-        
-        #Primero manejamos casos especiales como Trunc antes del bucle principal
-        if isinstance(nodo, Trunc):
-            #Procesamos la expresion interna (debe ser DFLOAT)
-            nodo_expr = self._procesar_expresion_completa(nodo.expr)
-            
+
+        #Primero manejamos casos especiales como Trunc: trunc(trunc(...)) se abre de afuera hacia
+        #adentro y se calcula de adentro hacia afuera
+        truncs = []
+        while isinstance(nodo, Trunc):
+            truncs.append(nodo)
+            nodo = nodo.expr
+
+        #Procesamos la expresion interna (debe ser DFLOAT si hay un trunc)
+        valor = self._reducir_binarios(nodo, valores)
+
+        for trunc in reversed(truncs):
             #Generamos el codigo para evaluar la expresion interna
-            self._generar_codigo_hoja(nodo_expr)
-            
+            self._generar_codigo_hoja(valor)
+
             #Generamos la instruccion de truncado de WASM
             #    i32.trunc_f64_u convierte f64 a i32 sin signo
-            codigo.append("i32.trunc_f64_u")
-            
+            codigo.append(("i32.trunc_f64_u", None))
+
             #Creamos una variable auxiliar para almacenar el resultado del trunc
-            tipo_wasm = self._get_tipo_wasm(nodo.tipo)  # Debe ser 'i32' para UINT
+            tipo_wasm = self._get_tipo_wasm(trunc.tipo)  # Debe ser 'i32' para UINT
             nombre_aux = self._nueva_var_aux(tipo_wasm)
-            codigo.append(f"local.set {nombre_aux}")
-            
-            #Devolvemos el nodo auxiliar que representa el resultado
-            return AuxiliarWasm(tipo=nodo.tipo, linea=nodo.linea, nombre=nombre_aux)
-        
-        # Bucle principal para reducir expresiones binarias
-        while not self._es_hoja(nodo):
-            pila = [(nodo, None)]
-            sub_arbol_a_reducir, padre_del_sub_arbol = None, None
-
-            while pila:
-                actual, padre = pila.pop()
-                if isinstance(actual, Binario) and self._es_hoja(actual.izq) and self._es_hoja(actual.der):
-                    sub_arbol_a_reducir, padre_del_sub_arbol = actual, padre
-                    break
-                elif isinstance(actual, Binario):
-                    if isinstance(actual.der, Nodo): pila.append((actual.der, actual))
-                    if isinstance(actual.izq, Nodo): pila.append((actual.izq, actual))
-
-            if not sub_arbol_a_reducir: break
-
-            if isinstance(sub_arbol_a_reducir, Binario) and sub_arbol_a_reducir.op == '/':
-                divisor_node = sub_arbol_a_reducir.der
-                self._generar_codigo_hoja(divisor_node)
-                tipo_divisor = self._get_tipo_wasm(divisor_node.tipo)
-                codigo.append(f"{tipo_divisor}.const 0")
-                codigo.append(f"{tipo_divisor}.eq")
-                codigo.append("if")
-                codigo.append("    i32.const 1")
-                codigo.append("    call $abort")
-                codigo.append("end")
-                self._generar_codigo_hoja(sub_arbol_a_reducir.izq)
-                self._generar_codigo_hoja(divisor_node)
-                instruccion = self._get_op_instruccion('/', sub_arbol_a_reducir.tipo)
-            
-            elif isinstance(sub_arbol_a_reducir, Binario) and sub_arbol_a_reducir.op == '+' and sub_arbol_a_reducir.tipo == Tipo.UINT:
-                # Generamos codigo para los operandos
-                self._generar_codigo_hoja(sub_arbol_a_reducir.izq)
-                self._generar_codigo_hoja(sub_arbol_a_reducir.der)
-                
-                # Realizamos la suma (i32.add)
-                codigo.append("i32.add")
-                
-                # Verificacion de Overflow (> 65535)
-                # Necesitamos verificar el resultado sin perderlo de la pila, ya que se debe asignar despues.
-                # Usamos una variable temporal auxiliar para la verificacion.
-                temp_check = self._nueva_var_aux("i32")
-                
-                # local.tee guarda el valor en la variable Y lo mantiene en el tope de la pila
-                codigo.append(f"local.tee {temp_check}")
-                
-                # Obtenemos el valor guardado para compararlo
-                codigo.append(f"local.get {temp_check}")
-                codigo.append("i32.const 65535")
-                codigo.append("i32.gt_u") # Comparamos si es mayor sin signo
-                
-                codigo.append("if")
-                codigo.append("    i32.const 2") # Usamos codigo 2 para indicar Overflow
-                codigo.append("    call $abort")
-                codigo.append("end")
-                
-                # No asignamos instruccion aqui porque ya hicimos el 'i32.add' manualmente
-                instruccion = None
+            codigo.append(("local.set", nombre_aux))
 
-            else:
-                self._generar_codigo_hoja(sub_arbol_a_reducir.izq)
-                self._generar_codigo_hoja(sub_arbol_a_reducir.der)
-                instruccion = self._get_op_instruccion(sub_arbol_a_reducir.op, sub_arbol_a_reducir.tipo)
-            
-            if instruccion: codigo.append(instruccion)
-            
-            tipo_wasm = self._get_tipo_wasm(sub_arbol_a_reducir.tipo)
-            nombre_aux = self._nueva_var_aux(tipo_wasm)
-            codigo.append(f"local.set {nombre_aux}")
-            nodo_aux = AuxiliarWasm(nombre=nombre_aux, tipo=sub_arbol_a_reducir.tipo)
+            #El nodo auxiliar representa el resultado
+            valor = self._auxiliar(nombre_aux, trunc.tipo)
+        return valor
 
-            if padre_del_sub_arbol is None: nodo = nodo_aux
-            elif padre_del_sub_arbol.izq is sub_arbol_a_reducir: padre_del_sub_arbol.izq = nodo_aux
-            elif padre_del_sub_arbol.der is sub_arbol_a_reducir: padre_del_sub_arbol.der = nodo_aux
-        
-        return nodo
+    def _reducir_binarios(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]) -> Nodo:
+        '''
+            Reduce los Binario de la expresion en una sola pasada en postorden (izquierda, derecha,
+            operador), con una pila explicita: cada Binario cuyos dos operandos tienen valor (hojas o
+            anotados en valores) se calcula y queda anotado con su auxiliar. Solo se baja por Binario;
+            un operando que no se puede reducir (Unario, trunc adentro de la expresion, invocacion
+            VOID) deja sin reducir a los Binario que lo contienen, pero no a sus hermanos.
+            Devuelve el auxiliar de la expresion, la hoja, o el nodo si quedo sin reducir.
+        '''
+        valor = self._valor(nodo, valores)
+        if valor is not None or not isinstance(nodo, Binario):
+            return valor if valor is not None else nodo
+
+        pila = [(nodo, False)]
+        while pila:
+            actual, operandos_listos = pila.pop()
+            if not operandos_listos:
+                pila.append((actual, True))
+                if isinstance(actual.der, Binario): pila.append((actual.der, False))
+                if isinstance(actual.izq, Binario): pila.append((actual.izq, False))
+                continue
+            izq, der = self._valor(actual.izq, valores), self._valor(actual.der, valores)
+            if izq is not None and der is not None:
+                valores[id(actual)] = (actual, self._reducir_binario(actual, izq, der))
+
+        valor = self._valor(nodo, valores)
+        return valor if valor is not None else nodo
+
+    def _reducir_binario(self, sub_arbol_a_reducir: Binario, izq: Nodo, der: Nodo) -> AuxiliarWasm:
+        # Calcula un Binario con operandos ya reducidos (izq, der) y lo guarda en un auxiliar
+        codigo = self._ctx()['codigo']
+        if sub_arbol_a_reducir.op == '/':
+            divisor_node = der
+            self._generar_codigo_hoja(divisor_node)
+            tipo_divisor = self._get_tipo_wasm(divisor_node.tipo)
+            codigo.append((f"{tipo_divisor}.const", 0))
+            codigo.append((f"{tipo_divisor}.eq", None))
+            codigo.append(("if", None))
+            codigo.append(("i32.const", 1))
+            codigo.append(("call", ABORT))
+            codigo.append(("end", None))
+            self._generar_codigo_hoja(izq)
+            self._generar_codigo_hoja(divisor_node)
+            instruccion = self._get_op_instruccion('/', sub_arbol_a_reducir.tipo)
+
+        elif sub_arbol_a_reducir.op == '+' and sub_arbol_a_reducir.tipo == Tipo.UINT:
+            # Generamos codigo para los operandos
+            self._generar_codigo_hoja(izq)
+            self._generar_codigo_hoja(der)
+
+            # Realizamos la suma (i32.add)
+            codigo.append(("i32.add", None))
+
+            # Verificacion de Overflow (> 65535)
+            # Necesitamos verificar el resultado sin perderlo de la pila, ya que se debe asignar despues.
+            # La verificacion usa el auxiliar de control del contexto (uno para todas las sumas).
+            temp_check = self._auxiliar_de_control("i32")
+
+            # local.tee guarda el valor en la variable Y lo mantiene en el tope de la pila
+            codigo.append(("local.tee", temp_check))
+
+            # Obtenemos el valor guardado para compararlo
+            codigo.append(("local.get", temp_check))
+            codigo.append(("i32.const", 65535))
+            codigo.append(("i32.gt_u", None)) # Comparamos si es mayor sin signo
+
+            codigo.append(("if", None))
+            codigo.append(("i32.const", 2)) # Usamos codigo 2 para indicar Overflow
+            codigo.append(("call", ABORT))
+            codigo.append(("end", None))
+
+            # No asignamos instruccion aqui porque ya hicimos el 'i32.add' manualmente
+            instruccion = None
+
+        else:
+            self._generar_codigo_hoja(izq)
+            self._generar_codigo_hoja(der)
+            instruccion = self._get_op_instruccion(sub_arbol_a_reducir.op, sub_arbol_a_reducir.tipo)
+
+        if instruccion: codigo.append((instruccion, None))
+
+        tipo_wasm = self._get_tipo_wasm(sub_arbol_a_reducir.tipo)
+        nombre_aux = self._nueva_var_aux(tipo_wasm)
+        codigo.append(("local.set", nombre_aux))
+        return self._auxiliar(nombre_aux, sub_arbol_a_reducir.tipo)
 
     def _es_hoja(self, nodo: Nodo) -> bool:
         return isinstance(nodo, (Literal, Identificador, AuxiliarWasm, IdCalificado))
 
-    def _get_nombre_variable_wasm(self, nombre_py: str) -> str:
+    def _valor(self, nodo: Nodo, valores: Dict[int, Tuple[Nodo, Nodo]]) -> Optional[Nodo]:
+        # Lo que representa al nodo en el codigo: su auxiliar si ya se calculo, el nodo si es
+        # una hoja, None si todavia falta calcularlo
+        anotado = valores.get(id(nodo))
+        if anotado is not None:
+            return anotado[1]
+        return nodo if self._es_hoja(nodo) else None
+
+    def _get_nombre_variable_wasm(self, nombre_py):
         return self._ctx()['variables_usuario'].get(nombre_py)
 
     def _generar_codigo_hoja(self, nodo_hoja: Nodo):
         codigo = self._ctx()['codigo']
+        if isinstance(nodo_hoja, ValorEnPila):
+            # Ya esta en la pila: no hay nada que leer
+            return
         if isinstance(nodo_hoja, Literal):
             # Ignorar literales string: no generar codigo Wasm
             if getattr(nodo_hoja, "tipo", None) == Tipo.STRING:
                 return
             tipo_wasm = self._get_tipo_wasm(nodo_hoja.tipo)
-            codigo.append(f"{tipo_wasm}.const {nodo_hoja.valor}")
+            codigo.append((f"{tipo_wasm}.const", nodo_hoja.valor))
         elif isinstance(nodo_hoja, AuxiliarWasm):
-            codigo.append(f"local.get {nodo_hoja.nombre}")
+            codigo.append(("local.get", nodo_hoja.nombre))
         elif isinstance(nodo_hoja, Identificador):
             nombre_var = self._get_nombre_variable_wasm(nodo_hoja.nombre)
             if nombre_var:
                 if nombre_var in self._globales:
-                    codigo.append(f"global.get {nombre_var}")
+                    codigo.append(("global.get", nombre_var))
                 else:
                     self._asegurar_local(nombre_var, nodo_hoja.tipo)
-                    codigo.append(f"local.get {nombre_var}")
+                    codigo.append(("local.get", nombre_var))
         elif isinstance(nodo_hoja, IdCalificado):
             #Se Permite acceso a locales (aunque sean de ámbitos padres) para evitar dejar la pila vacia.
             nombre_var = self._get_nombre_variable_wasm(nodo_hoja.atributo.nombre)
             if nombre_var:
                 if nombre_var in self._globales:
-                    codigo.append(f"global.get {nombre_var}")
+                    codigo.append(("global.get", nombre_var))
                 else:
                     # Intentamos acceder como local. 
                     # Si la variable pertenece a una funcion padre, Wasm puro
                     # fallara en validacion ("unknown local") a menos que se implementen closures,
                     # pero al menos generamos la instrucción para evitar el error de pila vacia.
                     self._asegurar_local(nombre_var, nodo_hoja.tipo)
-                    codigo.append(f"local.get {nombre_var}")
+                    codigo.append(("local.get", nombre_var))
             else:
                 # Fallback de seguridad por si no se encuentra la variable
                 print(f"Warning: Variable {nodo_hoja.atributo.nombre} no encontrada para generación.")
                 tipo_wasm = self._get_tipo_wasm(nodo_hoja.tipo)
-                codigo.append(f"{tipo_wasm}.const 0")
+                codigo.append((f"{tipo_wasm}.const", 0))
             # Si no es una global, no se genera codigo, lo que puede llevar a errores de pila vacia.
-            # Esto es una limitacion de diseño: no se puede acceder a locales de otras funciones.
\ No newline at end of file
+            # Esto es una limitacion de diseño: no se puede acceder a locales de otras funciones.
+
+
+def _wat(nombre) -> str:
+    # Nombre en el WAT: un Nombre es $NOMBRE, un auxiliar (su numero) es $tN y un nombre armado
+    # por el generador (tupla) es $parte1_parte2_...
+    if isinstance(nombre, tuple):
+        return "$" + "_".join(map(str, nombre))
+    if isinstance(nombre, int):
+        return f"$t{nombre}"
+    return f"${nombre}"
+
+
+def _modulo_wat(globales: Dict, funciones) -> str:
+    # El texto del modulo: imports, globales, las funciones (main al final) y el export de main
+    lineas = ["(module"]
+    lineas += [f'  (import "env" "{nombre}" (func {_wat(nombre)} (param {" ".join(parametros)})))'
+               for nombre, parametros in IMPORTS]
+    lineas.append("")
+    lineas += [f"  (global {_wat(nombre)} (mut {tipo}) ({tipo}.const 0))" for nombre, tipo in globales.items()]
+    for funcion in funciones:
+        lineas.append("")
+        lineas += _funcion_wat(funcion)
+    lineas.append(f'  (export "{MAIN}" (func {_wat(MAIN)}))')
+    lineas.append(")")
+    return "\n".join(lineas)
+
+
+def _funcion_wat(funcion: FuncionWasm) -> List[str]:
+    # Una funcion en WAT: la firma, las locales y una instruccion por linea. Los bloques no
+    # se indentan: con ifs anidados el texto creceria con el cuadrado de la profundidad
+    firma = [f"func {_wat(funcion.nombre)}"]
+    firma += [f"(param {_wat(nombre)} {tipo})" for nombre, tipo in funcion.parametros]
+    if funcion.resultado:
+        firma.append(f"(result {funcion.resultado})")
+    lineas = [f"  ({' '.join(firma)}"]
+    lineas += [f"    (local {_wat(nombre)} {tipo})" for nombre, tipo in funcion.locales]
+    for instruccion, inmediato in funcion.codigo:
+        if inmediato is None:
+            lineas.append("    " + instruccion)
+        elif instruccion in _CONSTANTES:
+            lineas.append(f"    {instruccion} {inmediato}")
+        else:
+            lineas.append(f"    {instruccion} {_wat(inmediato)}")
+    lineas.append("  )")
+    return lineas
+
+
+_CONSTANTES = ("i32.const", "f64.const")
+
+
+def _operandos(nodo: Nodo):
+    # Hijos por los que _reducir_invocaciones busca invocaciones
+    if isinstance(nodo, (Binario, Unario, Trunc)):
+        return nodo.iter_hijos()
+    return ()
@@ -0,0 +1,647 @@
+"""
+Paso de build del parser: toma la gramatica de AnalisisSintactico (Parser.py)
+y escribe parser_generado.py, un modulo autocontenido con las tablas LALR como
+literales, las acciones de las reglas copiadas tal cual y un driver LR propio.
+En ejecucion no se importa sly ni se procesa la gramatica con la metaclase.
+
+Uso:
+    python generar_parser.py
+
+main.py usa el modulo generado solo si su firma coincide con la de los fuentes
+de los que sale (ARCHIVOS_FIRMA); si falta o quedo desactualizado vuelve al
+parser de SLY.
+"""
+import ast
+import builtins
+import hashlib
+import inspect
+import os
+import sys
+import textwrap
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_GENERADO = os.path.join(DIRECTORIO, 'parser_generado.py')
+
+# Lo que determina el modulo generado: la gramatica y las acciones (Parser.py),
+# los tokens (Lexer.py, copiados como literal) y los modulos de los que las
+# acciones importan nodos y trazas
+ARCHIVOS_FIRMA = ('Parser.py', 'Lexer.py', 'AnalisisSemantico.py', 'Trazas.py')
+
+
+def firma_fuente():
+    h = hashlib.sha256()
+    for nombre in ARCHIVOS_FIRMA:
+        with open(os.path.join(DIRECTORIO, nombre), 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def cargar_analizador_sintactico():
+    # Devuelve la clase AnalisisSintactico del modulo generado si esta al dia,
+    # si no la de Parser.py (que construye el parser con sly).
+    try:
+        import parser_generado
+    except ImportError:
+        parser_generado = None
+    if parser_generado is not None and parser_generado.FIRMA_FUENTE == firma_fuente():
+        return parser_generado.AnalisisSintactico
+    if parser_generado is not None:
+        print("Aviso: parser_generado.py esta desactualizado, se usa el parser de SLY "
+              "(regenerar con 'python generar_parser.py').", file=sys.stderr)
+    from Parser import AnalisisSintactico
+    return AnalisisSintactico
+
+
+# ----------------------------------------------------------------------
+# Extraccion de codigo fuente
+# ----------------------------------------------------------------------
+
+def _fuente_funcion(func, nuevo_nombre=None):
+    # Codigo de la funcion sin decoradores, dedentado y opcionalmente renombrado
+    codigo = textwrap.dedent(inspect.getsource(func))
+    nodo = ast.parse(codigo).body[0]
+    lineas = codigo.splitlines()[nodo.lineno - 1:]
+    if nuevo_nombre is not None:
+        cabecera = f"def {func.__name__}("
+        if not lineas[0].startswith(cabecera):
+            raise RuntimeError(f"No se pudo renombrar {func.__qualname__}")
+        lineas[0] = f"def {nuevo_nombre}(" + lineas[0][len(cabecera):]
+    return "\n".join(lineas)
+
+
+def _nombres_globales(func, nombres):
+    # Todos los nombres que aparecen en la funcion (incluidas las anotaciones,
+    # que se evaluan al definirla)
+    arbol = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    nombres.update(n.id for n in ast.walk(arbol) if isinstance(n, ast.Name))
+    return nombres
+
+
+def _importaciones(funciones, modulo):
+    # Reproduce los imports de Parser.py que las funciones copiadas necesitan
+    nombres = set()
+    for func in funciones:
+        _nombres_globales(func, nombres)
+
+    # nombre local -> sentencia de import, segun los imports de Parser.py
+    importados = {}
+    for nodo in ast.parse(inspect.getsource(modulo)).body:
+        if isinstance(nodo, ast.Import):
+            for alias in nodo.names:
+                importados[alias.asname or alias.name] = (None, alias)
+        elif isinstance(nodo, ast.ImportFrom):
+            for alias in nodo.names:
+                importados[alias.asname or alias.name] = (nodo.module, alias)
+
+    modulos, desde = [], {}
+    for nombre in sorted(nombres):
+        if nombre in importados:
+            origen, alias = importados[nombre]
+            raiz = (origen or alias.name).split('.')[0]
+            if raiz in ('sly', 'Lexer'):
+                raise RuntimeError(f"Una accion usa '{nombre}' ({raiz}) y no se puede generar")
+            texto = alias.name if alias.asname is None else f"{alias.name} as {alias.asname}"
+            if origen is None:
+                modulos.append(f"import {texto}")
+            else:
+                desde.setdefault(origen, []).append(texto)
+        elif nombre in vars(modulo) and not hasattr(builtins, nombre):
+            raise RuntimeError(f"Una accion usa '{nombre}', definido en {modulo.__name__}")
+
+    lineas = list(modulos)
+    for mod, lista in sorted(desde.items()):
+        lineas.append(f"from {mod} import {', '.join(lista)}")
+    return lineas
+
+
+# ----------------------------------------------------------------------
+# Driver LR. Es el mismo algoritmo que sly.yacc.Parser.parse (incluida la
+# recuperacion de errores y la propagacion de lineno/index/end), pero con las
+# tablas indexadas por estado y sin el registro de posiciones por id(valor).
+# ----------------------------------------------------------------------
+
+DRIVER = '''
+ERROR_COUNT = 3     # Igual que sly: tokens a desplazar antes de salir del modo error
+
+
+class Simbolo:
+    __slots__ = ('type', 'value', 'lineno', 'index', 'end')
+
+    def __str__(self):
+        return self.type
+
+    def __repr__(self):
+        return str(self)
+
+
+class Produccion:
+    # Equivalente a sly.yacc.YaccProduction: el 'p' que reciben las acciones
+    __slots__ = ('_slice', '_namemap', '_stack')
+
+    def __init__(self, s, stack=None):
+        self._slice = s
+        self._namemap = {}
+        self._stack = stack
+
+    def __getitem__(self, n):
+        if n >= 0:
+            return self._slice[n].value
+        return self._stack[n].value
+
+    def __setitem__(self, n, v):
+        if n >= 0:
+            self._slice[n].value = v
+        else:
+            self._stack[n].value = v
+
+    def __len__(self):
+        return len(self._slice)
+
+    @property
+    def lineno(self):
+        for tok in self._slice:
+            lineno = getattr(tok, 'lineno', None)
+            if lineno:
+                return lineno
+        raise AttributeError('No line number found')
+
+    @property
+    def index(self):
+        for tok in self._slice:
+            index = getattr(tok, 'index', None)
+            if index is not None:
+                return index
+        raise AttributeError('No index attribute found')
+
+    @property
+    def end(self):
+        result = None
+        for tok in self._slice:
+            r = getattr(tok, 'end', None)
+            if r:
+                result = r
+        return result
+
+    def __getattr__(self, name):
+        i = self._namemap.get(name)
+        if i is None:
+            nameset = '{' + ', '.join(self._namemap) + '}'
+            raise AttributeError(f'No symbol {name}. Must be one of {nameset}.')
+        return self._slice[i].value
+
+    def __setattr__(self, name, value):
+        if name[:1] == '_':
+            super().__setattr__(name, value)
+        else:
+            raise AttributeError(f"Can't reassign the value of attribute {name!r}")
+
+
+
+class ProduccionFlujo(Produccion):
+    # El 'p' de _parse_flujo: los terminales desplazados estan en la pila como
+    # su posicion (int) en los arreglos del FlujoTokens
+    __slots__ = ('_flujo',)
+
+    def __init__(self, flujo, stack=None):
+        super().__init__(None, stack)
+        self._flujo = flujo
+
+    def __getitem__(self, n):
+        s = self._slice[n] if n >= 0 else self._stack[n]
+        if s.__class__ is int:
+            return self._flujo.valores[self._flujo.valor[s]]
+        return s.value
+
+    def __setitem__(self, n, v):
+        simbolos = self._slice if n >= 0 else self._stack
+        if simbolos[n].__class__ is int:
+            simbolos[n] = self._flujo.token(simbolos[n])
+        simbolos[n].value = v
+
+    @property
+    def lineno(self):
+        for s in self._slice:
+            lineno = self._flujo.linea[s] if s.__class__ is int else getattr(s, 'lineno', None)
+            if lineno:
+                return lineno
+        raise AttributeError('No line number found')
+
+    @property
+    def index(self):
+        for s in self._slice:
+            index = self._flujo.inicio[s] if s.__class__ is int else getattr(s, 'index', None)
+            if index is not None:
+                return index
+        raise AttributeError('No index attribute found')
+
+    @property
+    def end(self):
+        result = None
+        for s in self._slice:
+            if s.__class__ is int:
+                r = self._flujo.inicio[s] + self._flujo.largo[s]
+            else:
+                r = getattr(s, 'end', None)
+            if r:
+                result = r
+        return result
+
+    def __getattr__(self, name):
+        i = self._namemap.get(name)
+        if i is None:
+            nameset = '{' + ', '.join(self._namemap) + '}'
+            raise AttributeError(f'No symbol {name}. Must be one of {nameset}.')
+        s = self._slice[i]
+        if s.__class__ is int:
+            return self._flujo.valores[self._flujo.valor[s]]
+        return s.value
+
+
+class _DriverLR:
+    def errok(self):
+        self.errorok = True
+
+    def restart(self):
+        del self.statestack[:]
+        del self.symstack[:]
+        sym = Simbolo()
+        sym.type = '$end'
+        self.symstack.append(sym)
+        self.statestack.append(0)
+        self.state = 0
+
+    def parse(self, tokens):
+        lookahead = None
+        lookaheadstack = []
+        actions = _ACCIONES
+        goto = _GOTO
+        defaulted_states = _DEFAULTED
+        nombres = _NOMBRES
+        longitudes = _LONGITUDES
+        namemaps = _NAMEMAPS
+        funciones = _FUNCIONES
+        pslice = Produccion(None)
+        errorcount = 0
+
+        self.tokens = tokens
+        self.statestack = statestack = []
+        self.symstack = symstack = []
+        pslice._stack = symstack
+        self.restart()
+
+        errtoken = None
+        while True:
+            t = defaulted_states[self.state]
+            if t is None:
+                if not lookahead:
+                    if not lookaheadstack:
+                        lookahead = next(tokens, None)
+                    else:
+                        lookahead = lookaheadstack.pop()
+                    if not lookahead:
+                        lookahead = Simbolo()
+                        lookahead.type = '$end'
+                t = actions[self.state].get(lookahead.type)
+
+            if t is not None:
+                if t > 0:
+                    # shift
+                    statestack.append(t)
+                    self.state = t
+                    symstack.append(lookahead)
+                    lookahead = None
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # reduce
+                    n = -t
+                    pname = nombres[n]
+                    plen = longitudes[n]
+                    pslice._namemap = namemaps[n]
+                    pslice._slice = symstack[-plen:] if plen else []
+
+                    sym = Simbolo()
+                    sym.type = pname
+                    value = funciones[n](self, pslice)
+                    if value is pslice:
+                        value = (pname, *(s.value for s in pslice._slice))
+                    sym.value = value
+
+                    if plen:
+                        primero = symstack[-plen]
+                        sym.lineno = primero.lineno
+                        sym.index = primero.index
+                        sym.end = symstack[-1].end
+                        del symstack[-plen:]
+                        del statestack[-plen:]
+                    else:
+                        sym.lineno = None
+                        sym.index = None
+                        sym.end = None
+
+                    symstack.append(sym)
+                    self.state = goto[statestack[-1]][pname]
+                    statestack.append(self.state)
+                    continue
+
+                # accept
+                return getattr(symstack[-1], 'value', None)
+
+            # Error de sintaxis: misma recuperacion que sly
+            if errorcount == 0 or self.errorok:
+                errorcount = ERROR_COUNT
+                self.errorok = False
+                if lookahead.type == '$end':
+                    errtoken = None
+                else:
+                    errtoken = lookahead
+
+                tok = self.error(errtoken)
+                if tok:
+                    lookahead = tok
+                    self.errorok = True
+                    continue
+                else:
+                    if not errtoken:
+                        return
+            else:
+                errorcount = ERROR_COUNT
+
+            if len(statestack) <= 1 and lookahead.type != '$end':
+                lookahead = None
+                self.state = 0
+                del lookaheadstack[:]
+                continue
+
+            if lookahead.type == '$end':
+                return
+
+            if lookahead.type != 'error':
+                sym = symstack[-1]
+                if sym.type == 'error':
+                    lookahead = None
+                    continue
+
+                t = Simbolo()
+                t.type = 'error'
+                if hasattr(lookahead, 'lineno'):
+                    t.lineno = lookahead.lineno
+                if hasattr(lookahead, 'index'):
+                    t.index = lookahead.index
+                if hasattr(lookahead, 'end'):
+                    t.end = lookahead.end
+                t.value = lookahead
+                lookaheadstack.append(lookahead)
+                lookahead = t
+            else:
+                symstack.pop()
+                statestack.pop()
+                self.state = statestack[-1]
+
+    def _parse_flujo(self, flujo):
+        # Como parse, pero leyendo un FlujoTokens: el lookahead es la posicion
+        # del token en los arreglos y al desplazarlo se apila esa posicion, sin
+        # armar un Token. Solo la recuperacion de errores lo arma (flujo.token).
+        lookahead = None
+        lookaheadstack = []
+        actions = _ACCIONES
+        goto = _GOTO
+        defaulted_states = _DEFAULTED
+        nombres = _NOMBRES
+        longitudes = _LONGITUDES
+        namemaps = _NAMEMAPS
+        funciones = _FUNCIONES
+        tipos, tipo = flujo.tipos, flujo.tipo
+        linea, inicio, largo = flujo.linea, flujo.inicio, flujo.largo
+        cantidad = len(tipo)
+        posicion = 0
+        pslice = ProduccionFlujo(flujo)
+        errorcount = 0
+
+        self.tokens = flujo
+        self.statestack = statestack = []
+        self.symstack = symstack = []
+        pslice._stack = symstack
+        self.restart()
+
+        errtoken = None
+        while True:
+            t = defaulted_states[self.state]
+            if t is None:
+                if lookahead is None:
+                    if lookaheadstack:
+                        lookahead = lookaheadstack.pop()
+                    elif posicion < cantidad:
+                        lookahead = posicion
+                        posicion += 1
+                    else:
+                        lookahead = Simbolo()
+                        lookahead.type = '$end'
+                if lookahead.__class__ is int:
+                    t = actions[self.state].get(tipos[tipo[lookahead]])
+                else:
+                    t = actions[self.state].get(lookahead.type)
+
+            if t is not None:
+                if t > 0:
+                    # shift
+                    statestack.append(t)
+                    self.state = t
+                    symstack.append(lookahead)
+                    lookahead = None
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # reduce
+                    n = -t
+                    pname = nombres[n]
+                    plen = longitudes[n]
+                    pslice._namemap = namemaps[n]
+                    pslice._slice = symstack[-plen:] if plen else []
+
+                    sym = Simbolo()
+                    sym.type = pname
+                    value = funciones[n](self, pslice)
+                    if value is pslice:
+                        value = (pname, *(pslice[i] for i in range(plen)))
+                    sym.value = value
+
+                    if plen:
+                        primero = symstack[-plen]
+                        if primero.__class__ is int:
+                            sym.lineno = linea[primero]
+                            sym.index = inicio[primero]
+                        else:
+                            sym.lineno = primero.lineno
+                            sym.index = primero.index
+                        ultimo = symstack[-1]
+                        sym.end = inicio[ultimo] + largo[ultimo] if ultimo.__class__ is int else ultimo.end
+                        del symstack[-plen:]
+                        del statestack[-plen:]
+                    else:
+                        sym.lineno = None
+                        sym.index = None
+                        sym.end = None
+
+                    symstack.append(sym)
+                    self.state = goto[statestack[-1]][pname]
+                    statestack.append(self.state)
+                    continue
+
+                # accept
+                return getattr(symstack[-1], 'value', None)
+
+            # Error de sintaxis: misma recuperacion que parse, con el token armado
+            if lookahead.__class__ is int:
+                lookahead = flujo.token(lookahead)
+            if errorcount == 0 or self.errorok:
+                errorcount = ERROR_COUNT
+                self.errorok = False
+                if lookahead.type == '$end':
+                    errtoken = None
+                else:
+                    errtoken = lookahead
+
+                tok = self.error(errtoken)
+                if tok:
+                    lookahead = tok
+                    self.errorok = True
+                    continue
+                else:
+                    if not errtoken:
+                        return
+            else:
+                errorcount = ERROR_COUNT
+
+            if len(statestack) <= 1 and lookahead.type != '$end':
+                lookahead = None
+                self.state = 0
+                del lookaheadstack[:]
+                continue
+
+            if lookahead.type == '$end':
+                return
+
+            if lookahead.type != 'error':
+                sym = symstack[-1]
+                if sym.__class__ is not int and sym.type == 'error':
+                    lookahead = None
+                    continue
+
+                t = Simbolo()
+                t.type = 'error'
+                if hasattr(lookahead, 'lineno'):
+                    t.lineno = lookahead.lineno
+                if hasattr(lookahead, 'index'):
+                    t.index = lookahead.index
+                if hasattr(lookahead, 'end'):
+                    t.end = lookahead.end
+                t.value = lookahead
+                lookaheadstack.append(lookahead)
+                lookahead = t
+            else:
+                symstack.pop()
+                statestack.pop()
+                self.state = statestack[-1]
+'''
+
+
+# Metodos de Parser.py que el driver reemplaza con su propia version
+METODOS_DRIVER = {'_parse_flujo'}
+
+
+def _tabla_por_estado(tabla, estados, vacio):
+    return [tabla.get(estado, vacio) for estado in range(estados)]
+
+
+def generar():
+    sys.path.insert(0, DIRECTORIO)
+    import Parser
+    clase = Parser.AnalisisSintactico
+    gramatica = clase._grammar
+    lrtable = clase._lrtable
+    estados = len(lrtable.lr_action)
+    if sorted(lrtable.lr_action) != list(range(estados)):
+        raise RuntimeError("Los estados de la tabla LALR no son contiguos")
+
+    # Acciones de las reglas: una funcion por definicion (varias producciones
+    # pueden compartir la misma si tienen mas de un @_)
+    nombres_func = {}
+    funciones = []
+    for prod in gramatica.Productions[1:]:
+        if id(prod.func) not in nombres_func:
+            nombres_func[id(prod.func)] = f"_r{len(funciones) + 1}_{prod.func.__name__}"
+            funciones.append(prod.func)
+
+    # Metodos que no son reglas (__init__, registrar_error, error, ...), salvo
+    # los que reemplaza el driver
+    metodos = [v for k, v in vars(clase).items()
+               if inspect.isfunction(v) and not hasattr(v, 'rules') and k not in METODOS_DRIVER]
+
+    for prod in gramatica.Productions:
+        claves = set(prod.namemap)
+        if any(not (k in prod.prod or k.rstrip('0123456789') in prod.prod) for k in claves):
+            raise RuntimeError(f"La produccion {prod} usa alias EBNF, no soportado")
+
+    out = []
+    out.append("# Generado por generar_parser.py a partir de Parser.py. No editar a mano:")
+    out.append("# regenerar con 'python generar_parser.py' despues de cambiar la gramatica.")
+    out.append(f"FIRMA_FUENTE = {firma_fuente()!r}")
+    out.append("")
+    out.extend(_importaciones(funciones + metodos, Parser))
+    out.append("")
+    out.append("")
+    out.append("# Tablas LALR (indexadas por estado)")
+    out.append("_ACCIONES = [")
+    for fila in _tabla_por_estado(lrtable.lr_action, estados, {}):
+        out.append(f"    {fila!r},")
+    out.append("]")
+    out.append("_GOTO = [")
+    for fila in _tabla_por_estado(lrtable.lr_goto, estados, {}):
+        out.append(f"    {fila!r},")
+    out.append("]")
+    out.append(f"_DEFAULTED = {_tabla_por_estado(lrtable.defaulted_states, estados, None)!r}")
+    out.append("")
+    out.append("# Producciones (la 0 es S' -> inicio)")
+    out.append(f"_NOMBRES = {tuple(p.name for p in gramatica.Productions)!r}")
+    out.append(f"_LONGITUDES = {tuple(p.len for p in gramatica.Productions)!r}")
+    out.append("_NAMEMAPS = (")
+    for prod in gramatica.Productions:
+        mapa = {nombre: acceso.__defaults__[0] for nombre, acceso in prod.namemap.items()}
+        out.append(f"    {mapa!r},")
+    out.append(")")
+    out.append("")
+    out.append("")
+    out.append("# Acciones de las reglas, copiadas de Parser.py")
+    for func in funciones:
+        reglas = " | ".join(func.rules)
+        out.append(f"# {func.__name__} : {reglas}")
+        out.append(_fuente_funcion(func, nombres_func[id(func)]))
+        out.append("")
+        out.append("")
+    referencias = ", ".join(["None"] + [nombres_func[id(p.func)] for p in gramatica.Productions[1:]])
+    out.append(f"_FUNCIONES = ({referencias})")
+    out.append(DRIVER)
+    out.append("")
+    out.append("class AnalisisSintactico(_DriverLR):")
+    out.append(f"    tokens = {sorted(clase.tokens)!r}")
+    out.append(f"    start = {clase.start!r}")
+    for metodo in metodos:
+        out.append("")
+        out.append(textwrap.indent(_fuente_funcion(metodo), "    "))
+    out.append("")
+
+    codigo = "\n".join(out)
+    compile(codigo, RUTA_GENERADO, 'exec')
+    with open(RUTA_GENERADO, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    print(f"Generado {os.path.relpath(RUTA_GENERADO)}: {estados} estados, "
+          f"{len(gramatica.Productions) - 1} producciones, {len(funciones)} acciones")
+
+
+if __name__ == '__main__':
+    generar()
@@ -1,61 +1,112 @@
-from Lexer import AnalisisLexico
-from Parser import AnalisisSintactico
+from LexerManual import AnalisisLexicoManual
+from Fuente import ArchivoFuente
+from generar_parser import cargar_analizador_sintactico
 from AnalisisSemantico import Nodo
+from ArenaAST import Arena
+from TablaDeSimbolos import EXPORTADORES
+from Trazas import TRAZA, LEXICO, TABLA, DestinoTexto, DestinoJSONL, DestinoBufferCircular
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import itertools
 import sys
-import io, os
-
-def analizar_archivo(nombre_archivo):
-    errores_compilacion = []
-    tokens = []
-    resultado = None # AST
-    arbol_semantico = None
-    
-    # Lectura del archivo
+import os
+
+
+@dataclass
+class Opciones:
+    '''
+        Lo que se pide para una compilacion (las opciones de la linea de comandos, ver main).
+        Los valores por defecto son los de compilar sin opciones.
+    '''
+    lexer: str = "sly"              # "sly" o "manual" (clase_lexer)
+    arena: bool = False             # AST en arreglos (ArenaAST.py)
+    tabla: bool = False             # tabla de simbolos por consola
+    exportes: List[Tuple[str, str]] = field(default_factory=list)  # (formato, ruta) de la tabla
+    ast: bool = False               # arbol por consola
+    ast_dot: Optional[str] = None   # archivo DOT del arbol
+    limites_ast: Dict[str, Any] = field(default_factory=dict)  # de escribir_arbol/escribir_dot
+    pila: bool = False              # generacion con los valores intermedios en la pila
+    reusar_locales: bool = False    # reuso de las locales auxiliares
+
+    @classmethod
+    def desde_argumentos(cls, argumentos: argparse.Namespace) -> "Opciones":
+        exportes = [(formato, ruta) for formato, ruta in (("csv", argumentos.tabla_csv),
+                                                          ("jsonl", argumentos.tabla_jsonl),
+                                                          ("binario", argumentos.tabla_bin)) if ruta]
+        limites_ast = {"profundidad": argumentos.ast_profundidad, "max_nodos": argumentos.ast_nodos,
+                       "funcion": argumentos.ast_funcion}
+        return cls(lexer=argumentos.lexer, arena=argumentos.arena, tabla=argumentos.tabla, exportes=exportes,
+                   ast=argumentos.ast, ast_dot=argumentos.ast_dot, limites_ast=limites_ast,
+                   pila=argumentos.pila, reusar_locales=argumentos.reusar_locales)
+
+
+def analizar_archivo(nombre_archivo, opciones: Optional[Opciones] = None):
+    opciones = opciones or Opciones()
+    Lexer = clase_lexer(opciones.lexer)
+    # Lectura del archivo: si el lexer escanea bytes, el archivo se mapea en
+    # memoria en lugar de leerse y decodificarse completo
     try:
-        with open(nombre_archivo, 'r', encoding='utf-8') as f:
-            codigo_fuente = f.read()
+        fuente = ArchivoFuente(nombre_archivo, en_bytes=getattr(Lexer, 'entrada_bytes', False))
     except FileNotFoundError:
         print(f"Error: El archivo '{nombre_archivo}' no fue encontrado.")
         sys.exit(1)
 
+    # El fuente queda abierto hasta el final: las columnas de los errores se
+    # calculan sobre el (IndiceLineas del lexer)
+    with fuente:
+        _analizar_fuente(nombre_archivo, fuente, Lexer, opciones)
 
-    #PARTE 1. ANALISIS LEXICO 
 
-    lexer = AnalisisLexico()
-    try:
-        #Intentamos obtener tokens incluso si hay errores lexicos
-        tokens = list(lexer.tokenize(codigo_fuente))
-    except Exception as e:
-        errores_compilacion.append(f"Error Lexico Fatal: {e}")
+def _analizar_fuente(nombre_archivo, fuente, Lexer, opciones: Opciones):
+    errores_compilacion = []
+    resultado = None # AST
+    arbol_semantico = None
 
-    #Recolectamos errores reportados por el lexer
-    if hasattr(lexer, 'errores') and lexer.errores:
-        for err in lexer.errores:
-            errores_compilacion.append(f"Error Lexico: {err}")
+    #PARTE 1 y 2. ANALISIS LEXICO Y SINTACTICO
+    # Los tokens pasan del lexer al parser a medida que se reconocen, sin
+    # guardarlos en una lista: la memoria no crece con la cantidad de tokens.
 
+    lexer = Lexer()
+    errores_lexicos_fatales = []
+    tokens = _flujo_de_tokens(lexer.tokenize(fuente.contenido), errores_lexicos_fatales)
 
-    #PARTE 2. ANALISIS SINTACTICO 
-    # Solo intentamos parsear si obtuvimos tokens (aunque haya habido errores lexicos)
-    if tokens:
+    # Solo intentamos parsear si hay al menos un token (aunque haya errores lexicos)
+    primero = next(tokens, None)
+    parser = None
+    if primero is not None:
+        # parser_generado.py si esta al dia (sin sly), si no el de Parser.py
+        AnalisisSintactico = cargar_analizador_sintactico()
         parser = AnalisisSintactico()
         parser.set_tabla_simbolos(lexer.tabla_simbolos)
 
-        # Capturamos stdout para silenciar mensajes internos del parser
-        captured_output = io.StringIO()
-        sys_stdout_original = sys.stdout
-        sys.stdout = captured_output
-
+        # Las reglas reconocidas van a TRAZA (--traza/--traza-jsonl), no a stdout
         try:
-            resultado = parser.parse(iter(tokens))
+            resultado = parser.parse(itertools.chain((primero,), tokens))
         except Exception as e:
-            errores_compilacion.append(f"Error Sintactico Fatal: {e}")
+            errores_sintacticos_fatales = [f"Error Sintactico Fatal: {e}"]
+        else:
+            errores_sintacticos_fatales = []
+
+    # Si el parser se detuvo antes del final, terminamos de leer los tokens
+    # para que lexer.errores quede completo
+    for _ in tokens:
+        pass
+
+    #Recolectamos errores reportados por el lexer (mismo orden que antes: lexicos primero)
+    errores_compilacion.extend(errores_lexicos_fatales)
+    if hasattr(lexer, 'errores') and lexer.errores:
+        for err in lexer.errores:
+            errores_compilacion.append(f"Error Lexico: {err}")
 
-        sys.stdout = sys_stdout_original # Restauramos stdout
+    if parser is not None:
+        errores_compilacion.extend(errores_sintacticos_fatales)
 
         # Recolectar errores sintacticos
         if hasattr(parser, "errores") and parser.errores():
-            for mensaje, linea in parser.errores():
-                errores_compilacion.append(f"Error Sintactico (Linea {linea}): {mensaje}")
+            for mensaje, linea, index in parser.errores():
+                columna = lexer.indice.columna(index) if index is not None else 0
+                errores_compilacion.append(f"Error Sintactico ({_ubicacion(linea, columna)}): {mensaje}")
         
         if not isinstance(resultado, Nodo) and not errores_compilacion:
              # Si no hay arbol y no detectamos errores explicitos, marcamos error generico
@@ -65,6 +116,10 @@ def analizar_archivo(nombre_archivo):
     #PARTE 3. ANALISIS SEMANTICO 
     # Intentamos el analisis semantico SOLO si existe un arbol sintactico (resultado).
     if resultado is not None:
+        if opciones.arena and isinstance(resultado, Nodo):
+            # El AST pasa a la arena (ArenaAST.py); el semantico y el generador
+            # trabajan sobre las vistas y el arbol de objetos se libera
+            resultado = Arena.desde_arbol(resultado)
         try:
             from AnalisisSemantico import AnalisisSemantico
             sem = AnalisisSemantico(lexer.tabla_simbolos)
@@ -74,16 +129,17 @@ def analizar_archivo(nombre_archivo):
             if arbol_semantico and arbol_semantico.diag:
                 print("\n=== DIAGNOSTICOS SEMANTICOS ===")
                 for d in arbol_semantico.diag:
+                    d.resolver_columna(lexer.indice)
                     severidad = getattr(d, 'severidad', 'ERROR')
-                    linea = getattr(d, 'linea', '?')
+                    ubicacion = _ubicacion(getattr(d, 'linea', '?'), d.columna)
                     mensaje = str(d) # Usamos str(d) para obtener el mensaje completo
 
                     if severidad == 'WARNING':
                         # Solo imprimimos, NO agregamos a la lista de errores fatales
-                        print(f" Warning (Linea {linea}): {mensaje}")
+                        print(f" Warning ({ubicacion}): {mensaje}")
                     else:
                         # Es ERROR (o desconocido), lo agregamos para detener compilacion
-                        errores_compilacion.append(f"Error Semantico (Linea {linea}): {mensaje}")
+                        errores_compilacion.append(f"Error Semantico ({ubicacion}): {mensaje}")
 
         except ImportError as e:
             print(f"Error de configuracion: No se pudo importar AnalisisSemantico: {e}")
@@ -101,18 +157,31 @@ def analizar_archivo(nombre_archivo):
     # MOSTRAMOS RESULTADOS INTERMEDIOS (AST Y TABLA)
     # Lo hacemos ANTES de verificar si hay errores para poder ver el arbol recuperado
     
-    print(f"\n=== 2) REPRESENTACION INTERMEDIA (AST) ===")
-    if arbol_semantico:
-        print(arbol_semantico.imprimir_arbol())
-    elif resultado:
-        # Si fallo el semantico pero hay arbol sintactico crudo
-        print("(Arbol Sintactico sin procesar por Semantico)")
-        print(resultado)
-    else:
-        print("(No se pudo generar el AST)")
-
-    print("\n=== 3) TABLA DE SIMBOLOS ===")
-    print(lexer.tabla_simbolos)
+    # El arbol tambien se muestra solo si se pide (--ast, --ast-dot), linea por
+    # linea y con los limites de --ast-profundidad/--ast-nodos/--ast-funcion
+    limites_ast = opciones.limites_ast
+    if opciones.ast:
+        print(f"\n=== 2) REPRESENTACION INTERMEDIA (AST) ===")
+        if arbol_semantico:
+            arbol_semantico.escribir_arbol(sys.stdout, **limites_ast)
+        elif resultado:
+            # Si fallo el semantico pero hay arbol sintactico crudo
+            print("(Arbol Sintactico sin procesar por Semantico)")
+            print(resultado)
+        else:
+            print("(No se pudo generar el AST)")
+    if opciones.ast_dot and arbol_semantico:
+        with open(opciones.ast_dot, "w", encoding="utf-8") as archivo:
+            arbol_semantico.escribir_dot(archivo, **limites_ast)
+
+    # La tabla solo se arma si se pide (--tabla y --tabla-csv/jsonl/bin); se
+    # escribe fila por fila
+    if opciones.tabla:
+        print("\n=== 3) TABLA DE SIMBOLOS ===")
+        lexer.tabla_simbolos.exportar_texto(sys.stdout)
+        print()
+    for formato, ruta in opciones.exportes:
+        exportar_tabla(lexer.tabla_simbolos, formato, ruta)
 
     
 
@@ -130,12 +199,13 @@ def analizar_archivo(nombre_archivo):
     print("\n=== 4) CODIGO ASSEMBLER (WASM) ===")
     try:
         from generador_wasm import GeneradorWasm
+        from BinarioWasm import ErrorCodificacion, verificar_binario
         
         # Limpieza previa
         if os.path.exists("output.wat"): os.remove("output.wat")
         if os.path.exists("output.wasm"): os.remove("output.wasm")
         
-        generador = GeneradorWasm()
+        generador = GeneradorWasm(pila=opciones.pila, reusar_locales=opciones.reusar_locales)
         codigo_wat = generador.generar(arbol_semantico)
         
         output_filename = "output.wat"
@@ -143,21 +213,77 @@ def analizar_archivo(nombre_archivo):
             f.write(codigo_wat)
             
         print(f"✅ Archivo generado: '{output_filename}'")
+        if generador.reporte_locales:
+            print("Locales por funcion (antes -> despues):")
+            for funcion, antes, despues in generador.reporte_locales:
+                print(f"  {funcion}: {antes} -> {despues}")
         print("Contenido del archivo generado (primeras 20 lineas):")
         print("-" * 40)
         print("\n".join(codigo_wat.split('\n')[:20]))
         if len(codigo_wat.split('\n')) > 20:
             print("... (resto del archivo omitido) ...")
         print("-" * 40)
-        
+
+        # El binario se codifica directamente (BinarioWasm.py), sin pasar por wat2wasm
+        try:
+            binario = generador.generar_binario()
+        except ErrorCodificacion as e:
+            binario = None
+            print(f"⚠️ No se pudo generar 'output.wasm': {e}")
+        if binario is not None:
+            # Un modulo invalido no se guarda: node no lo podria cargar
+            errores_binario = verificar_binario(binario)
+            if errores_binario:
+                for err in errores_binario:
+                    print(f"❌ El modulo no es valido: {err}")
+                print("❌ No se genero 'output.wasm'.")
+                sys.exit(1)
+            with open("output.wasm", "wb") as f:
+                f.write(binario)
+            print(f"✅ Archivo generado: 'output.wasm' ({len(binario)} bytes)")
+
         print("\nInstrucciones para ejecutar:")
-        print(f"  1. wat2wasm {output_filename} -o output.wasm")
-        print(f"  2. node run_wasm.js output.wasm")
+        if binario is not None:
+            print("  node run_wasm.js output.wasm")
+        else:
+            print(f"  1. wat2wasm {output_filename} -o output.wasm")
+            print(f"  2. node run_wasm.js output.wasm")
 
     except Exception as e:
         print(f"❌ Error durante la generación de codigo: {e}")
 
 
+def clase_lexer(nombre):
+    # El lexer de sly se importa solo si se usa: con --lexer manual y
+    # parser_generado.py al dia no se carga sly
+    if nombre == "manual":
+        return AnalisisLexicoManual
+    from Lexer import AnalisisLexico
+    return AnalisisLexico
+
+
+def exportar_tabla(tabla_simbolos, formato, ruta):
+    if formato == "binario":
+        archivo = open(ruta, "wb")
+    else:
+        archivo = open(ruta, "w", encoding="utf-8", newline="")
+    with archivo:
+        EXPORTADORES[formato](tabla_simbolos, archivo)
+
+
+def _ubicacion(linea, columna):
+    return f"Linea {linea}, Columna {columna}" if columna else f"Linea {linea}"
+
+
+def _flujo_de_tokens(tokens, errores):
+    # Si el lexer falla a mitad de camino, el error queda como lexico y el
+    # parser ve el fin de la entrada.
+    try:
+        yield from tokens
+    except Exception as e:
+        errores.append(f"Error Lexico Fatal: {e}")
+
+
 def mostrar_errores(lista_errores):
     print("\n=== 1) ERRORES DE COMPILACION ===")
     for err in lista_errores:
@@ -165,11 +291,66 @@ def mostrar_errores(lista_errores):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <archivo_fuente.txt>")
-        sys.exit(1)
+    args = argparse.ArgumentParser(description="Compilador del TPE a WebAssembly")
+    args.add_argument("archivo", help="archivo fuente a compilar")
+    args.add_argument("--traza", metavar="ARCHIVO",
+                      help="escribe todos los eventos de traza (reglas reconocidas, avisos) como texto")
+    args.add_argument("--traza-jsonl", metavar="ARCHIVO",
+                      help="escribe todos los eventos de traza en formato JSON lines")
+    args.add_argument("--traza-ultimos", metavar="N", type=int,
+                      help="guarda los ultimos N eventos y los muestra al terminar")
+    args.add_argument("--lexer", choices=("sly", "manual"), default="sly",
+                      help="lexer a usar: el de sly (Lexer.py) o el escrito a mano (LexerManual.py)")
+    args.add_argument("--arena", action="store_true",
+                      help="guarda el AST en arreglos (ArenaAST.py) en lugar de un objeto por nodo")
+    args.add_argument("--tabla", action="store_true",
+                      help="muestra la tabla de simbolos por consola")
+    args.add_argument("--tabla-csv", metavar="ARCHIVO",
+                      help="escribe la tabla de simbolos en CSV")
+    args.add_argument("--tabla-jsonl", metavar="ARCHIVO",
+                      help="escribe la tabla de simbolos en formato JSON lines")
+    args.add_argument("--tabla-bin", metavar="ARCHIVO",
+                      help="escribe la tabla de simbolos en formato binario (TablaDeSimbolos.leer_binario)")
+    args.add_argument("--ast", action="store_true",
+                      help="muestra el arbol (AST) por consola")
+    args.add_argument("--ast-dot", metavar="ARCHIVO",
+                      help="escribe el arbol en formato DOT (Graphviz)")
+    args.add_argument("--ast-profundidad", metavar="N", type=int,
+                      help="muestra el arbol hasta N niveles debajo de la raiz")
+    args.add_argument("--ast-nodos", metavar="N", type=int,
+                      help="corta el arbol despues de N nodos")
+    args.add_argument("--ast-funcion", metavar="NOMBRE",
+                      help="muestra solo las funciones con ese nombre")
+    args.add_argument("--pila", action="store_true",
+                      help="genera el codigo dejando los valores intermedios en la pila de Wasm, sin un auxiliar por operacion")
+    args.add_argument("--reusar-locales", action="store_true",
+                      help="reusa las locales auxiliares que no estan vivas a la vez y muestra las locales por funcion")
+    opciones = args.parse_args()
+
+    # Los avisos del lexico y de la tabla de simbolos se siguen mostrando por consola
+    TRAZA.agregar_destino(DestinoTexto(sys.stdout), categorias=(LEXICO, TABLA))
+
+    archivos = []
+    if opciones.traza:
+        archivos.append(open(opciones.traza, "w", encoding="utf-8"))
+        TRAZA.agregar_destino(DestinoTexto(archivos[-1]))
+    if opciones.traza_jsonl:
+        archivos.append(open(opciones.traza_jsonl, "w", encoding="utf-8"))
+        TRAZA.agregar_destino(DestinoJSONL(archivos[-1]))
+    buffer = None
+    if opciones.traza_ultimos:
+        buffer = TRAZA.agregar_destino(DestinoBufferCircular(opciones.traza_ultimos))
 
-    analizar_archivo(sys.argv[1])
+    try:
+        analizar_archivo(opciones.archivo, Opciones.desde_argumentos(opciones))
+    finally:
+        for archivo in archivos:
+            archivo.close()
+
+    if buffer is not None:
+        print(f"\n=== TRAZA (ultimos {opciones.traza_ultimos} eventos) ===")
+        for evento in buffer.eventos:
+            print(evento.mensaje)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from Nombres import reiniciar
+
+
+@pytest.fixture(autouse=True)
+def _nombres_por_test():
+    # Cada test compila por su cuenta: los nombres que interno no pasan al siguiente
+    yield
+    reiniciar()
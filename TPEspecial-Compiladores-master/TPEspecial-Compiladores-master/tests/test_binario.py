@@ -0,0 +1,106 @@
+"""
+El .wasm de cada archivo de pruebas/ que compila sin errores (los que tienen
+errores quedan fuera de la lista de parametros), en los modos del generador
+(un auxiliar por valor, --pila y --reusar-locales): verificar_binario no
+encuentra errores y dos compilaciones dan los mismos bytes, tambien en
+procesos con distinta semilla de hash.
+"""
+import glob
+import hashlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+from AnalisisSemantico import AnalisisSemantico
+from BinarioWasm import BR_IF, FuncionWasm, codificar_modulo, verificar_binario
+from Fuente import ArchivoFuente
+from LexerManual import AnalisisLexicoManual
+from Nombres import reiniciar
+from Parser import AnalisisSintactico
+from generador_wasm import GeneradorWasm
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRUEBAS = sorted(glob.glob(os.path.join(RAIZ, 'pruebas', '**', '*.txt'), recursive=True))
+MODOS = {'auxiliares': {}, 'pila': {'pila': True}, 'reusar-locales': {'reusar_locales': True}}
+
+
+def compilar(ruta, modo):
+    # El binario de la ruta, o None si tiene errores (main no genera codigo). El parser es
+    # siempre el de sly: parser_generado.py no esta versionado, y test_flujo.py compara los dos
+    lexer = AnalisisLexicoManual()
+    parser = AnalisisSintactico()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    with ArchivoFuente(ruta, en_bytes=True) as fuente:
+        raiz = parser.parse(lexer.tokenize(fuente.contenido))
+    if lexer.errores or parser.errores() or raiz is None:
+        return None
+    arbol = AnalisisSemantico(lexer.tabla_simbolos).analizar_entrada(raiz)
+    if any(getattr(d, 'severidad', 'ERROR') != 'WARNING' for d in arbol.diag):
+        return None
+    generador = GeneradorWasm(**modo)
+    generador.generar(arbol)
+    return generador.generar_binario()
+
+
+def _compilables():
+    # Los errores son del lexer, el parser o el semantico: no dependen del modo
+    rutas = [ruta for ruta in PRUEBAS if compilar(ruta, {}) is not None]
+    reiniciar()
+    return rutas
+
+
+@pytest.mark.parametrize('modo', MODOS.values(), ids=list(MODOS))
+@pytest.mark.parametrize('ruta', _compilables(), ids=lambda ruta: os.path.relpath(ruta, RAIZ))
+def test_binario_valido_y_estable(ruta, modo):
+    binario = compilar(ruta, modo)
+    assert binario is not None
+    assert verificar_binario(binario) == []
+    assert compilar(ruta, modo) == binario
+
+
+def _resumen():
+    # sha256 de todos los binarios, para comparar entre procesos
+    resumen = hashlib.sha256()
+    for ruta in PRUEBAS:
+        for modo in MODOS.values():
+            resumen.update(compilar(ruta, modo) or b'-')
+    return resumen.hexdigest()
+
+
+def test_mismos_bytes_en_otro_proceso():
+    codigo = 'import sys; sys.path[:0] = sys.argv[1:]; import test_binario; print(test_binario._resumen())'
+    resumenes = set()
+    for semilla in ('1', '2'):
+        entorno = dict(os.environ, PYTHONHASHSEED=semilla)
+        salida = subprocess.run([sys.executable, '-c', codigo, RAIZ, os.path.dirname(__file__)],
+                                env=entorno, capture_output=True, text=True, check=True).stdout
+        resumenes.add(salida.split()[-1])
+    assert len(resumenes) == 1
+
+
+def _con_br_if(profundidad, resultado=None):
+    # Una funcion con `block; i32.const 0; br_if <profundidad>; end`: 1 es la etiqueta de la funcion.
+    # Si la funcion devuelve un i32, el br_if lo lleva y si no salta se descarta
+    if resultado:
+        codigo = [("block", "B"), ("i32.const", 7), ("i32.const", 0), ("br_if", "B"), ("drop", None),
+                  ("end", None), ("i32.const", 7)]
+    else:
+        codigo = [("block", "B"), ("i32.const", 0), ("br_if", "B"), ("end", None)]
+    binario = codificar_modulo([], {}, [FuncionWasm("f", resultado=resultado, codigo=codigo)], "f")
+    assert binario.count(bytes((BR_IF, 0))) == 1
+    return binario.replace(bytes((BR_IF, 0)), bytes((BR_IF, profundidad)))
+
+
+def test_br_if_a_la_etiqueta_de_la_funcion():
+    assert verificar_binario(_con_br_if(1)) == []
+    assert verificar_binario(_con_br_if(1, resultado="i32")) == []
+    assert verificar_binario(_con_br_if(2)) != []
+
+
+def test_nombre_que_no_es_utf8():
+    binario = codificar_modulo([("ab", ("i32",))], {}, [FuncionWasm("f")], "f")
+    assert binario.count(b"\x02ab") == 1
+    errores = verificar_binario(binario.replace(b"\x02ab", b"\x02\xff\xfe"))
+    assert len(errores) == 1 and "UTF-8" in errores[0]
@@ -0,0 +1,50 @@
+"""
+Parsear un FlujoTokens con parse_flujo da el mismo arbol y los mismos errores
+que parsear los tokens del lexer con parse, con el parser generado (que lee
+los arreglos directo) y con el de sly.
+"""
+import glob
+import os
+
+import pytest
+
+import generar_parser
+from FlujoTokens import FlujoTokens
+from Fuente import ArchivoFuente
+from LexerManual import AnalisisLexicoManual
+from Parser import AnalisisSintactico
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRUEBAS = sorted(glob.glob(os.path.join(RAIZ, 'pruebas', '**', '*.txt'), recursive=True))
+
+
+@pytest.fixture(scope='module')
+def parser_generado(tmp_path_factory):
+    # El modulo generado no esta versionado: se genera en un directorio aparte
+    ruta = tmp_path_factory.mktemp('generado') / 'parser_generado.py'
+    original = generar_parser.RUTA_GENERADO
+    generar_parser.RUTA_GENERADO = str(ruta)
+    try:
+        generar_parser.generar()
+    finally:
+        generar_parser.RUTA_GENERADO = original
+    espacio = {'__name__': 'parser_generado'}
+    exec(compile(ruta.read_text(encoding='utf-8'), str(ruta), 'exec'), espacio)
+    return espacio['AnalisisSintactico']
+
+
+def _parsear(Parser, ruta, flujo):
+    lexer = AnalisisLexicoManual()
+    parser = Parser()
+    parser.set_tabla_simbolos(lexer.tabla_simbolos)
+    with ArchivoFuente(ruta, en_bytes=True) as fuente:
+        tokens = lexer.tokenize(fuente.contenido)
+        raiz = parser.parse_flujo(FlujoTokens.desde_tokens(tokens)) if flujo else parser.parse(tokens)
+    return repr(raiz), parser.errores()
+
+
+@pytest.mark.parametrize('ruta', PRUEBAS, ids=lambda ruta: os.path.relpath(ruta, RAIZ))
+def test_parse_flujo_igual_que_parse(ruta, parser_generado):
+    esperado = _parsear(parser_generado, ruta, flujo=False)
+    assert _parsear(parser_generado, ruta, flujo=True) == esperado
+    assert _parsear(AnalisisSintactico, ruta, flujo=True) == esperado
@@ -0,0 +1,36 @@
+"""
+El lexer manual sobre el archivo mapeado (bytes, sin traduccion de saltos de
+linea) contra el de sly sobre el mismo archivo leido como texto.
+"""
+import glob
+import os
+
+import pytest
+
+from Fuente import ArchivoFuente
+from Lexer import AnalisisLexico
+from LexerManual import AnalisisLexicoManual
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRUEBAS = sorted(glob.glob(os.path.join(RAIZ, 'pruebas', '**', '*.txt'), recursive=True))
+
+
+def _tokens(Lexer, ruta):
+    lexer = Lexer()
+    with ArchivoFuente(ruta, en_bytes=getattr(Lexer, 'entrada_bytes', False)) as fuente:
+        tokens = [(t.type, str(t.value), t.lineno, lexer.indice.columna(t.index))
+                  for t in lexer.tokenize(fuente.contenido)]
+    return tokens, lexer.errores
+
+
+@pytest.mark.parametrize('ruta', PRUEBAS, ids=lambda ruta: os.path.relpath(ruta, RAIZ))
+def test_crlf_igual_que_sly(ruta, tmp_path):
+    with open(ruta, 'rb') as f:
+        lf = f.read().replace(b'\r\n', b'\n')
+    crlf = tmp_path / 'crlf.txt'
+    crlf.write_bytes(lf.replace(b'\n', b'\r\n'))
+
+    tokens, errores = _tokens(AnalisisLexicoManual, crlf)
+    assert not any('\r' in err for err in errores)
+    assert (tokens, errores) == _tokens(AnalisisLexico, crlf)
+    assert (tokens, errores) == _tokens(AnalisisLexicoManual, ruta)
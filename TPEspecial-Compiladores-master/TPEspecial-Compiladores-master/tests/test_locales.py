@@ -0,0 +1,48 @@
+"""
+reusar_temporales sobre listas de instrucciones armadas a mano: los rangos que
+se extienden hasta el final de un lazo, los $tN que se leen antes de
+escribirse y las locales de distinto tipo.
+"""
+from LocalesWasm import reusar_temporales
+
+
+def _set(n, tipo="i32"):
+    return [(f"{tipo}.const", 1), ("local.set", n)]
+
+
+def _get(n):
+    return [("local.get", n), ("drop", None)]
+
+
+def test_sin_lazo_se_reusa():
+    codigo = _set(0) + _get(0) + _set(1) + _get(1)
+    nuevo, locales = reusar_temporales(codigo, {(0, "i32"), (1, "i32")})
+    assert nuevo == _set(0) + _get(0) + _set(0) + _get(0)
+    assert locales == {(0, "i32")}
+
+
+def test_escrito_antes_del_lazo_y_leido_adentro():
+    # $t0 se vuelve a leer en cada vuelta: no puede compartir local con $t1, que se escribe
+    # adentro del lazo despues de la ultima lectura de $t0
+    codigo = (_set(0)
+              + [("loop", None)]
+              + _get(0) + _set(1) + _get(1)
+              + [("i32.const", 0), ("br_if", 0), ("end", None)])
+    locales = {(0, "i32"), (1, "i32")}
+    assert reusar_temporales(codigo, locales) == (codigo, locales)
+
+
+def test_leido_antes_de_escribirse_conserva_su_local():
+    # $t0 se lee antes de su primera escritura: queda con su propia local aunque $t1 ya
+    # termino, y $t2 no la ocupa
+    codigo = _set(1) + _get(1) + _get(0) + _set(0) + _get(0) + _set(2) + _get(2)
+    nuevo, locales = reusar_temporales(codigo, {(0, "i32"), (1, "i32"), (2, "i32")})
+    assert nuevo == _set(1) + _get(1) + _get(0) + _set(0) + _get(0) + _set(1) + _get(1)
+    assert locales == {(0, "i32"), (1, "i32")}
+
+
+def test_no_se_mezclan_tipos():
+    codigo = _set(0) + _get(0) + _set(1, "f64") + _get(1) + _set(2) + _get(2) + _set(3, "f64") + _get(3)
+    nuevo, locales = reusar_temporales(codigo, {(0, "i32"), (1, "f64"), (2, "i32"), (3, "f64")})
+    assert nuevo == _set(0) + _get(0) + _set(1, "f64") + _get(1) + _set(0) + _get(0) + _set(1, "f64") + _get(1)
+    assert locales == {(0, "i32"), (1, "f64")}
@@ -0,0 +1,30 @@
+"""
+reiniciar() olvida los nombres internados por las compilaciones, conserva los
+fijos del compilador y no cambia el texto de los nombres de antes.
+"""
+import Nombres
+from Nombres import internar, reiniciar
+from generador_wasm import ABORT, MAIN
+
+
+def test_reiniciar_conserva_los_fijos():
+    reiniciar()
+    fijos = len(Nombres._POR_TEXTO)
+    for i in range(100):
+        internar(f"X{i}")
+    assert len(Nombres._POR_TEXTO) == fijos + 100
+
+    reiniciar()
+    assert len(Nombres._POR_TEXTO) == fijos
+    assert internar("main") is MAIN and f"${MAIN}" == "$main"
+    assert internar("abort") is ABORT and str(ABORT) == "abort"
+    assert not internar("") and internar("").id == 0
+
+
+def test_nombres_de_antes_de_reiniciar():
+    viejo = internar("VIEJO")
+    reiniciar()
+    nuevos = [internar(f"N{i}") for i in range(10)]
+    assert str(viejo) == "VIEJO" and f"{viejo}" == "VIEJO"
+    assert viejo.id not in {n.id for n in nuevos}
+    assert internar("VIEJO") is not viejo and str(internar("VIEJO")) == "VIEJO"